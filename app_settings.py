@@ -0,0 +1,73 @@
+## \file app_settings.py
+## \brief Kullanıcı ayarları: açılışta yüklenecek modeller ve son açılan dosyalar.
+##
+## Ayarlar ~/.boxr_cad_settings.json dosyasında tutulur. "startup_models" değeri:
+##  - "default": uygulamayla gelen örnek model (digiMODE.obj) yüklenir (varsayılan)
+##  - "recent": son açılan dosyalar yüklenir
+##  - "none": açılışta hiçbir model yüklenmez (headless / kiosk kurulumları)
+## BOXR_CAD_NO_STARTUP_MODEL=1 ortam değişkeni ayardan bağımsız olarak açılış yüklemesini kapatır.
+
+import os
+import json
+import logging
+
+SETTINGS_PATH = os.path.join(os.path.expanduser("~"), ".boxr_cad_settings.json")
+NO_STARTUP_MODEL_ENV = "BOXR_CAD_NO_STARTUP_MODEL"
+MAX_RECENT_FILES = 10
+
+DEFAULT_SETTINGS = {
+    "startup_models": "default",
+    "recent_files": [],
+    "startup_recent_count": 3,
+}
+
+
+## \fn load_settings()
+#  \brief Ayar dosyasını okur; dosya yoksa veya bozuksa varsayılanları döndürür.
+def load_settings():
+    settings = dict(DEFAULT_SETTINGS)
+    if os.path.exists(SETTINGS_PATH):
+        try:
+            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+                settings.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ayar dosyası okunamadı, varsayılanlar kullanılıyor: {e}")
+    return settings
+
+
+## \fn save_settings(settings)
+#  \brief Ayarları diske yazar.
+def save_settings(settings):
+    try:
+        with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+            json.dump(settings, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"Ayar dosyası yazılamadı: {e}")
+
+
+## \fn add_recent_file(file_path)
+#  \brief Dosyayı son açılanlar listesinin başına ekler.
+def add_recent_file(file_path):
+    settings = load_settings()
+    file_path = os.path.abspath(file_path)
+    recent = [p for p in settings.get("recent_files", []) if p != file_path]
+    settings["recent_files"] = [file_path] + recent[:MAX_RECENT_FILES - 1]
+    save_settings(settings)
+
+
+## \fn startup_model_paths(default_model_path)
+#  \brief Açılışta arka planda yüklenecek, hâlâ var olan dosyaların listesini döndürür.
+#  \param default_model_path Uygulamayla gelen örnek modelin yolu
+def startup_model_paths(default_model_path):
+    if os.environ.get(NO_STARTUP_MODEL_ENV, "").strip() not in ("", "0"):
+        return []
+    settings = load_settings()
+    mode = settings.get("startup_models", "default")
+    if mode == "none":
+        return []
+    if mode == "recent":
+        count = int(settings.get("startup_recent_count", DEFAULT_SETTINGS["startup_recent_count"]))
+        paths = settings.get("recent_files", [])[:count]
+    else:
+        paths = [default_model_path]
+    return [p for p in paths if os.path.exists(p)]
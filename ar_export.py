@@ -0,0 +1,264 @@
+## \file ar_export.py
+## \brief Katman dosyalarını AR önizlemesi için GLB'ye dönüştüren, içerik özetine göre önbellekleyen yardımcılar.
+##
+## OBJ/STL dosyaları ve STEP/IGES tessellation'ı MeshStore üzerinden okunur ve GLB olarak
+## ~/.boxr_cad_cache/glb altına <içerik özeti>.glb adıyla yazılır. Aynı içerik tekrar
+## istendiğinde dönüşüm atlanır; sunucuya belleğe eşlenmiş (mmap) bir MemoryAsset verilir.
+##
+## Telefonlara tam çözünürlüklü model yerine önce küçük varyantlar gönderilir: konumları 16 bit
+## tamsayıya nicemlenmiş (KHR_mesh_quantization) tam çözünürlüklü bir GLB ve vertex kümeleme
+## ile seyreltilmiş 1-2 ayrıntı seviyesi (LOD). Varyantlar tam GLB'nin yanına
+## <içerik özeti>.<seviye>.glb adıyla yazılır; viewer.html kabadan inceye doğru modeli değiştirir.
+
+import os
+import logging
+import threading
+import json
+import struct
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from mesh_cache import file_content_hash
+from mesh_store import get_mesh_store
+from occ_mesh import cluster_decimate
+
+GLB_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".boxr_cad_cache", "glb")
+AR_SOURCE_EXTS = ('.obj', '.stl', '.step', '.stp', '.iges', '.igs', '.glb')
+# (seviye adı, vertex kümeleme ızgarasının en uzun eksendeki hücre sayısı; None = seyreltme yok)
+AR_LOD_LEVELS = (('lod0', None), ('lod1', 256), ('lod2', 64))
+URL_KEY_LENGTH = 16  # URL'lerde özetin kısaltılmış hali kullanılır; QR kodu sık olmasın
+LOD_MIN_REDUCTION = 0.5  # Bir seviye bir öncekinin en fazla bu oranı kadar yer kaplamıyorsa atlanır
+
+_lock = threading.Lock()
+_hashes = {}  # mutlak yol -> ((mtime_ns, boyut), içerik özeti)
+_assets = {}  # ETag (içerik özeti[.seviye]) -> MemoryAsset
+
+
+def _signature(file_path):
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+## \fn content_key(file_path)
+#  \brief Dosyanın içerik özetini döndürür; dosya değişmediyse tekrar hesaplanmaz.
+def content_key(file_path):
+    path = os.path.normcase(os.path.abspath(file_path))
+    signature = _signature(path)
+    with _lock:
+        entry = _hashes.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+    digest = file_content_hash(path)
+    with _lock:
+        _hashes[path] = (signature, digest)
+    return digest
+
+
+## \fn known_content_key(file_path)
+#  \brief content_key() daha önce hesaplandıysa ve dosya o zamandan beri değişmediyse özeti, aksi
+#         halde None döndürür. Dosyayı okumaz; arayüz iş parçacığında güvenle çağrılabilir.
+def known_content_key(file_path):
+    path = os.path.normcase(os.path.abspath(file_path))
+    try:
+        signature = _signature(path)
+    except OSError:
+        return None
+    with _lock:
+        entry = _hashes.get(path)
+    return entry[1] if entry is not None and entry[0] == signature else None
+
+
+## \fn cached_glb_path(file_path, key=None)
+#  \brief Dosyanın önbellekteki GLB karşılığının yolunu döndürür (dosya henüz olmayabilir).
+#  \param key Önceden bilinen içerik özeti (verilmezse content_key() ile hesaplanır)
+def cached_glb_path(file_path, key=None):
+    if file_path.lower().endswith('.glb'):
+        return file_path
+    return os.path.join(GLB_CACHE_DIR, f"{key or content_key(file_path)}.glb")
+
+
+## \fn export_glb(file_path)
+#  \brief Dosyayı gerekirse GLB'ye dönüştürür ve önbellekteki GLB'nin yolunu döndürür.
+#         Qt'ye dokunmaz; arka plan iş parçacığından çağrılabilir.
+def export_glb(file_path):
+    glb_path = cached_glb_path(file_path)
+    if os.path.exists(glb_path):
+        return glb_path
+    mesh = get_mesh_store().get(file_path)
+    os.makedirs(GLB_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{glb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(mesh.export(file_type='glb'))
+        os.replace(tmp_path, glb_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logging.info(f"AR için GLB oluşturuldu: {file_path} -> {glb_path}")
+    return glb_path
+
+
+def _memory_asset(glb_path, etag):
+    from ar_server import MemoryAsset
+    with _lock:
+        asset = _assets.get(etag)
+        if asset is None:
+            asset = MemoryAsset.from_file(glb_path, etag)
+            _assets[etag] = asset
+    return asset
+
+
+## \fn glb_asset(file_path)
+#  \brief Dosyanın GLB karşılığını belleğe eşlenmiş bir MemoryAsset olarak döndürür.
+#  \return (url yolu, MemoryAsset)
+def glb_asset(file_path):
+    glb_path = export_glb(file_path)
+    key = content_key(file_path)
+    return f"/models/{key[:URL_KEY_LENGTH]}.glb", _memory_asset(glb_path, key)
+
+
+def _pad4(data, fill=b"\0"):
+    return data + fill * (-len(data) % 4)
+
+
+## \fn write_quantized_glb(file_path, vertices, faces)
+#  \brief Konumları 16 bit tamsayıya nicemlenmiş (KHR_mesh_quantization), normalsiz bir GLB yazar.
+#         Nicemleme ölçeği ve ofseti düğüm dönüşümünde tutulur; görüntüleyici düz gölgeleme kullanır.
+#  \return Yazılan dosyanın boyutu (bayt)
+def write_quantized_glb(file_path, vertices, faces):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    lower = vertices.min(axis=0)
+    extent = vertices.max(axis=0) - lower
+    scale = np.where(extent > 0, extent / 65535.0, 1.0)
+    quantized = np.rint((vertices - lower) / scale).astype(np.uint16)
+    # Vertex öznitelik elemanları 4 bayta hizalı olmalı: VEC3 uint16 (6 bayt) 8 baytlık adımla yazılır
+    positions = np.zeros((len(quantized), 4), dtype='<u2')
+    positions[:, :3] = quantized
+    # İndeks değeri bileşen türünün en büyük değerine eşit olamaz
+    small_indices = len(vertices) < 0xFFFF
+    indices = _pad4(faces.astype('<u2' if small_indices else '<u4').tobytes())
+
+    binary = indices + positions.tobytes()
+    gltf = {
+        "asset": {"version": "2.0", "generator": "BOXR_CAD"},
+        "extensionsUsed": ["KHR_mesh_quantization"],
+        "extensionsRequired": ["KHR_mesh_quantization"],
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "translation": lower.tolist(), "scale": scale.tolist()}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 1}, "indices": 0, "material": 0}]}],
+        "materials": [{
+            "pbrMetallicRoughness": {"baseColorFactor": [0.8, 0.8, 0.8, 1.0], "metallicFactor": 0.0, "roughnessFactor": 0.8},
+            "doubleSided": True,
+        }],
+        "buffers": [{"byteLength": len(binary)}],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": faces.size * (2 if small_indices else 4), "target": 34963},
+            {"buffer": 0, "byteOffset": len(indices), "byteLength": positions.nbytes, "byteStride": 8, "target": 34962},
+        ],
+        "accessors": [
+            {"bufferView": 0, "componentType": 5123 if small_indices else 5125, "count": int(faces.size), "type": "SCALAR"},
+            {"bufferView": 1, "componentType": 5123, "count": len(quantized), "type": "VEC3",
+             "min": quantized.min(axis=0).tolist(), "max": quantized.max(axis=0).tolist()},
+        ],
+    }
+    json_chunk = _pad4(json.dumps(gltf, separators=(",", ":")).encode("utf-8"), b" ")
+    total = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(struct.pack("<4sII", b"glTF", 2, total))
+            f.write(struct.pack("<I4s", len(json_chunk), b"JSON"))
+            f.write(json_chunk)
+            f.write(struct.pack("<I4s", len(binary), b"BIN\0"))
+            f.write(binary)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return total
+
+
+def _level_paths(key, name):
+    """Seviyenin GLB yolu ve seviye boş çıktığında yazılan işaret dosyasının yolu."""
+    base = os.path.join(GLB_CACHE_DIR, f"{key}.{name}")
+    return f"{base}.glb", f"{base}.skip"
+
+
+## \fn export_ar_variants(file_path)
+#  \brief Nicemlenmiş ve seyreltilmiş GLB varyantlarını gerekirse üretir. Seyreltmede hiç üçgen
+#         kalmayan seviyeler için boş bir işaret dosyası yazılır; seviye bir daha denenmez.
+#  \return Kabadan inceye sıralı [(seviye adı, GLB yolu)]; boş ve çok az küçülen seviyeler atlanır
+def export_ar_variants(file_path):
+    key = content_key(file_path)
+    mesh = None
+    variants = []
+    for name, resolution in AR_LOD_LEVELS:
+        path, skip_path = _level_paths(key, name)
+        if os.path.exists(skip_path):
+            continue
+        if not os.path.exists(path):
+            if mesh is None:
+                mesh = get_mesh_store().get(file_path)
+            vertices, faces = mesh.vertices, mesh.faces
+            if resolution is not None:
+                vertices, faces = cluster_decimate(vertices, faces, resolution)
+            os.makedirs(GLB_CACHE_DIR, exist_ok=True)
+            if len(faces) == 0:
+                open(skip_path, "wb").close()  # Model ızgara hücresinden küçük
+                continue
+            write_quantized_glb(path, vertices, faces)
+        size = os.path.getsize(path)
+        if variants and size > variants[-1][2] * LOD_MIN_REDUCTION:
+            continue
+        variants.append((name, path, size))
+    return [(name, path) for name, path, _ in reversed(variants)]
+
+
+## \fn ar_assets(file_path)
+#  \brief Dosyanın AR için sunulacak tüm seviyelerini kabadan inceye sıralı döndürür;
+#         son eleman orijinal malzemeleri koruyan tam GLB'dir.
+#  \return [(url yolu, MemoryAsset)]
+def ar_assets(file_path):
+    key = content_key(file_path)
+    assets = [(f"/models/{key[:URL_KEY_LENGTH]}.{name}.glb", _memory_asset(path, f"{key}.{name}"))
+              for name, path in export_ar_variants(file_path)]
+    assets.append(glb_asset(file_path))
+    return assets
+
+
+## \fn ready_ar_assets(file_path)
+#  \brief Tüm seviyeler daha önce üretildiyse ar_assets() sonucunu, üretilmediyse None döndürür.
+#         Dönüşüm başlatmaz ve dosyanın özetini hesaplamaz (özet bu oturumda hesaplanmadıysa None);
+#         arayüz iş parçacığında hızlı yol olarak kullanılır.
+def ready_ar_assets(file_path):
+    key = known_content_key(file_path)
+    if key is None or not os.path.exists(cached_glb_path(file_path, key)):
+        return None
+    for name, _ in AR_LOD_LEVELS:
+        if not any(os.path.exists(path) for path in _level_paths(key, name)):
+            return None
+    return ar_assets(file_path)
+
+
+## \class GLBExportSignals
+#  \brief GLBExportWorker'ın ana iş parçacığına gönderdiği sinyaller.
+class GLBExportSignals(QObject):
+    finished = pyqtSignal(str, object)  # kaynak dosya, ar_assets() sonucu
+    failed = pyqtSignal(str, str)            # kaynak dosya, hata mesajı
+
+
+## \class GLBExportWorker
+#  \brief Bir katman dosyasını QThreadPool üzerinde GLB'ye ve AR varyantlarına dönüştürüp belleğe eşleyen işçi.
+class GLBExportWorker(QRunnable):
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = GLBExportSignals()
+
+    def run(self):
+        try:
+            self.signals.finished.emit(self.file_path, ar_assets(self.file_path))
+        except Exception as e:
+            logging.error(f"AR için GLB oluşturulamadı: {self.file_path} - {e}", exc_info=True)
+            self.signals.failed.emit(self.file_path, str(e))
@@ -1,19 +1,42 @@
-
-
 ## \file ar_server.py
-## \brief Komut satırından alınan 3D model için bir web sunucusu ve QR kod üreten betik.
+## \brief AR önizlemesi için çok iş parçacıklı model sunucusu ve QR kod penceresi.
+##
+## Sunucu her bağlantıyı ayrı bir iş parçacığında işler ve HTTP/1.1 keep-alive kullanır; böylece
+## aynı anda birden fazla tablet/telefon aynı modeli indirebilir ve takılan bir indirme diğerlerini
+## bekletmez. Byte aralığı (Range) istekleri, ETag / If-None-Match ile yeniden doğrulama ve gzip
+## kabul eden istemciler için önceden sıkıştırılıp önbelleğe alınmış GLB/glTF gövdeleri desteklenir.
+## Dosyalar diskten (sendfile) veya bellekteki / belleğe eşlenmiş (mmap) bir tampondan sunulabilir.
 
 import sys
 import os
-import http.server
-import socketserver
+import gzip
+import shutil
+import logging
 import threading
-import qrcode
 import socket
-from PyQt5.QtWidgets import QApplication, QDialog, QLabel, QVBoxLayout
+import mmap
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote, quote
+from PyQt5.QtWidgets import QApplication, QDialog, QLabel, QVBoxLayout, QPushButton
 from PyQt5.QtGui import QPixmap, QFont
 from PyQt5.QtCore import Qt
 
+DEFAULT_PORT = 8000
+AR_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".boxr_cad_cache", "ar")
+KEEP_ALIVE_TIMEOUT = 30  # Boştaki keep-alive bağlantısının kapatılacağı süre (saniye)
+
+CONTENT_TYPES = {
+    '.glb': 'model/gltf-binary',
+    '.gltf': 'model/gltf+json',
+    '.bin': 'application/octet-stream',
+    '.usdz': 'model/vnd.usdz+zip',
+    '.html': 'text/html; charset=utf-8',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+}
+GZIP_EXTS = ('.glb', '.gltf', '.bin')
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -38,91 +61,366 @@ def get_local_ip():
         s.close()
     return IP
 
+
+_gzip_lock = threading.Lock()
+
+
+## \fn gzip_variant(file_path, etag)
+## \brief Dosyanın gzip ile sıkıştırılmış kopyasını önbellekte bir kez üretir ve yolunu döndürür.
+## \param etag Dosyanın ETag değeri; içerik değiştiğinde yeni bir kopya üretilir
+def gzip_variant(file_path, etag):
+    name = f"{etag.strip(chr(34))}_{os.path.basename(file_path)}.gz"
+    gz_path = os.path.join(AR_CACHE_DIR, name)
+    if os.path.exists(gz_path):
+        return gz_path
+    # Aynı dosyayı isteyen birden fazla istemci tek bir sıkıştırmayı bekler
+    with _gzip_lock:
+        if not os.path.exists(gz_path):
+            os.makedirs(AR_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{gz_path}.{threading.get_ident()}.tmp"
+            with open(file_path, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(tmp_path, gz_path)
+    return gz_path
+
+
+## \class MemoryAsset
+## \brief Bellekteki veya belleğe eşlenmiş (mmap) bir dosya içeriğini sunulabilir hale getirir.
+class MemoryAsset:
+    ## \param data bytes, bytearray veya mmap nesnesi
+    ## \param name İçerik türünün uzantısından belirlendiği dosya adı (ör. "model.glb")
+    ## \param etag İçeriği tanımlayan değer (ör. içerik özeti)
+    def __init__(self, data, name, etag):
+        self.data = data
+        self.ext = os.path.splitext(name)[1].lower()
+        self.etag = f'"{etag}"'
+        self._gzipped = None
+        self._lock = threading.Lock()
+
+    ## \brief Dosyayı salt okunur olarak belleğe eşler.
+    @classmethod
+    def from_file(cls, file_path, etag):
+        with open(file_path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, os.path.basename(file_path), etag)
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    def gzipped(self):
+        """gzip ile sıkıştırılmış gövdeyi ilk istekte bir kez üretir."""
+        with self._lock:
+            if self._gzipped is None:
+                self._gzipped = gzip.compress(self.data, compresslevel=6)
+            return self._gzipped
+
+
+## \class ARRequestHandler
+## \brief GET/HEAD isteklerini keep-alive, Range, ETag ve gzip desteğiyle yanıtlar.
+class ARRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "BOXR-AR/1.0"
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def log_message(self, format, *args):
+        logging.info(f"AR sunucusu {self.address_string()} - {format % args}")
+
+    def _serve(self, send_body):
+        target = self.server.resolve(unquote(urlsplit(self.path).path))
+        if target is None:
+            self.send_error(404)
+            return
+        if isinstance(target, MemoryAsset):
+            size, etag, ext = target.size, target.etag, target.ext
+        else:
+            stat = os.stat(target)
+            size = stat.st_size
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            ext = os.path.splitext(target)[1].lower()
+
+        use_gzip = ext in GZIP_EXTS and 'gzip' in self.headers.get('Accept-Encoding', '') \
+            and self.headers.get('Range') is None
+        response_etag = etag[:-1] + '-gz"' if use_gzip else etag
+
+        if self._not_modified(response_etag):
+            self.send_response(304)
+            self.send_header('ETag', response_etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        # body: diskteki dosyanın yolu (str) veya bellekteki tampon
+        body = target.data if isinstance(target, MemoryAsset) else target
+        start, length, status = 0, size, 200
+        byte_range = self._requested_range(size, etag)
+        if byte_range == 'invalid':
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if byte_range is not None:
+            start, end = byte_range
+            length, status = end - start + 1, 206
+        elif use_gzip:
+            body = target.gzipped() if isinstance(target, MemoryAsset) else gzip_variant(target, etag)
+            length = len(body) if isinstance(target, MemoryAsset) else os.path.getsize(body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', CONTENT_TYPES.get(ext, 'application/octet-stream'))
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', response_etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Cache-Control', 'no-cache')  # Her açılışta ETag ile yeniden doğrula
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if ext in GZIP_EXTS:
+            self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip and status == 200:
+            self.send_header('Content-Encoding', 'gzip')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{start + length - 1}/{size}')
+        self.end_headers()
+        if send_body and length:
+            if isinstance(body, str):
+                self._send_file(body, start, length)
+            else:
+                self._send_buffer(body, start, length)
+
+    def _not_modified(self, etag):
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+    def _requested_range(self, size, etag):
+        """Tek bir 'bytes=' aralığını (start, end) olarak döndürür; aralık yoksa None."""
+        header = self.headers.get('Range')
+        if not header or not header.startswith('bytes=') or ',' in header:
+            return None  # Çoklu aralıklar desteklenmez; tüm dosya gönderilir
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() != etag:
+            return None  # Dosya değişmiş: tüm dosya gönderilir
+        start_text, _, end_text = header[len('bytes='):].strip().partition('-')
+        try:
+            if start_text:
+                start = int(start_text)
+                end = int(end_text) if end_text else size - 1
+            else:
+                start = max(size - int(end_text), 0)  # Son N bayt
+                end = size - 1
+        except ValueError:
+            return None
+        end = min(end, size - 1)
+        if start > end or start >= size:
+            return 'invalid'
+        return start, end
+
+    def _send_file(self, file_path, offset, length):
+        try:
+            with open(file_path, 'rb') as f:
+                self.wfile.flush()
+                self.connection.sendfile(f, offset, length)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # İstemci indirmeyi yarıda bıraktı
+
+
+    def _send_buffer(self, data, offset, length):
+        try:
+            with memoryview(data) as view:
+                self.wfile.write(view[offset:offset + length])
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+## \class ARHTTPServer
+## \brief Her bağlantıyı ayrı iş parçacığında işleyen HTTP sunucusu.
+##
+## Açıkça tanımlanan yollar (routes; dosya yolu veya MemoryAsset) ve isteğe bağlı bir kök dizin
+## sunulur. Kök dizinin dışına çıkan istekler reddedilir.
+class ARHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, root_dir=None, routes=None):
+        super().__init__(address, ARRequestHandler)
+        self.root_dir = os.path.abspath(root_dir) if root_dir else None
+        self.routes = dict(routes or {})
+
+    def resolve(self, url_path):
+        """URL yolunu sunulacak dosyanın yoluna veya MemoryAsset'e çevirir; bulunamazsa None döndürür."""
+        if url_path in self.routes:
+            target = self.routes[url_path]
+            if isinstance(target, str) and not os.path.isfile(target):
+                return None
+            return target
+        if self.root_dir is None:
+            return None
+        candidate = os.path.abspath(os.path.join(self.root_dir, url_path.lstrip('/')))
+        if os.path.commonpath([candidate, self.root_dir]) != self.root_dir or not os.path.isfile(candidate):
+            return None
+        return candidate
+
+
+## \class ARServer
+## \brief AR sunucusunu arka plan iş parçacığında başlatıp durduran denetleyici.
+class ARServer:
+    def __init__(self, root_dir=None, routes=None, port=DEFAULT_PORT):
+        self.root_dir = root_dir
+        self.routes = dict(routes or {})
+        self.routes.setdefault('/viewer.html', resource_path('viewer.html'))
+        self.port = port
+        self.httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{get_local_ip()}:{self.port}"
+
+    def viewer_url(self, model_url_path, lod_url_paths=()):
+        """viewer.html adresini döndürür. lod_url_paths kabadan inceye sıralı ayrıntı seviyeleridir;
+        görüntüleyici önce en kabasını yükler ve tam modele doğru değiştirir."""
+        url = f"{self.url}/viewer.html?model={quote(model_url_path)}"
+        if lod_url_paths:
+            url += f"&lods={quote(','.join(lod_url_paths))}"
+        return url
+
+    def is_running(self):
+        return self.httpd is not None
+
+    def set_root(self, root_dir):
+        """Sunulan kök dizini değiştirir; çalışan sunucu yeniden başlatılmaz."""
+        self.root_dir = root_dir
+        if self.httpd is not None:
+            self.httpd.root_dir = os.path.abspath(root_dir) if root_dir else None
+
+    def publish(self, url_path, target):
+        """Tek bir dosyayı (yol) veya bellekteki içeriği (MemoryAsset) verilen URL yolundan sunar."""
+        self.routes[url_path] = target
+        if self.httpd is not None:
+            self.httpd.routes[url_path] = target
+
+    def start(self, port_attempts=10):
+        """Sunucuyu arka plan iş parçacığında başlatır. Port doluysa sonraki portlar denenir."""
+        if self.httpd is not None:
+            return
+        first_port = self.port
+        for port in range(first_port, first_port + port_attempts):
+            try:
+                self.httpd = ARHTTPServer(('', port), self.root_dir, self.routes)
+                self.port = port
+                break
+            except OSError as e:
+                logging.warning(f"AR sunucusu {port} portunu açamadı: {e}")
+        else:
+            raise OSError(f"AR sunucusu için boş port bulunamadı ({first_port}-{first_port + port_attempts - 1}).")
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="ar-server", daemon=True)
+        self._thread.start()
+        logging.info(f"AR sunucusu {self.url} adresinde başlatıldı.")
+
+    def stop(self):
+        if self.httpd is None:
+            return
+        httpd, self.httpd = self.httpd, None
+        httpd.shutdown()
+        httpd.server_close()
+        logging.info("AR sunucusu durduruldu.")
+
+## \fn make_qr_pixmap(text)
+## \brief Metnin QR kodunu diske yazmadan QPixmap olarak üretir.
+def make_qr_pixmap(text):
+    import io
+    import qrcode
+    buffer = io.BytesIO()
+    qrcode.make(text).save(buffer, format="PNG")
+    pixmap = QPixmap()
+    pixmap.loadFromData(buffer.getvalue(), "PNG")
+    return pixmap
+
+
 ## \class QRCodeDialog
 ## \brief QR kodunu ve sunucu bilgilerini gösteren bir PyQt5 penceresi.
 class QRCodeDialog(QDialog):
     ## \brief QRCodeDialog kurucusu.
-    ## \param image_path Gösterilecek QR kod resminin yolu (str).
+    ## \param image QR kod resmi (QPixmap veya resim dosyası yolu).
     ## \param server_url Sunucunun web adresi (str).
     ## \param parent Ebeveyn QWidget (opsiyonel).
-    def __init__(self, image_path, server_url, parent=None):
+    ## \param server Pencere kapatıldığında durdurulacak ARServer (opsiyonel).
+    def __init__(self, image, server_url, parent=None, server=None):
         super().__init__(parent)
         self.setWindowTitle("AR Kodu - Telefonunuzla Tarayın")
         self.setMinimumSize(350, 400)
         self.setStyleSheet("background-color: #232836; color: #bfc7e6;")
 
         layout = QVBoxLayout(self)
-        
-        info_label = QLabel(f"Modeli görüntülemek için aşağıdaki QR kodu tarayın.\nSunucu adresi: {server_url}")
-        info_label.setAlignment(Qt.AlignCenter)
-        info_label.setWordWrap(True)
-        info_label.setFont(QFont("Arial", 11))
-        layout.addWidget(info_label)
-
-        qr_label = QLabel()
-        pixmap = QPixmap(image_path)
-        qr_label.setPixmap(pixmap.scaled(300, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        qr_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(qr_label)
 
-        self.httpd = None
+        self.info_label = QLabel()
+        self.info_label.setAlignment(Qt.AlignCenter)
+        self.info_label.setWordWrap(True)
+        self.info_label.setFont(QFont("Arial", 11))
+        layout.addWidget(self.info_label)
+
+        self.qr_label = QLabel()
+        self.qr_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.qr_label)
+
+        self.stop_btn = QPushButton("⏹ Sunucuyu Durdur")
+        self.stop_btn.setStyleSheet("background-color:#353b4a; color:#FFD600; border-radius:8px; padding:6px;")
+        self.stop_btn.clicked.connect(self.close)
+        layout.addWidget(self.stop_btn)
+
+        self.server = server
+        self.set_target(image, server_url)
+
+    ## \brief Gösterilen QR kodunu ve adresi günceller (aynı pencere yeni bir model için kullanılabilir).
+    def set_target(self, image, server_url):
+        self.info_label.setText(f"Modeli görüntülemek için aşağıdaki QR kodu tarayın.\nSunucu adresi: {server_url}")
+        pixmap = image if isinstance(image, QPixmap) else QPixmap(image)
+        self.qr_label.setPixmap(pixmap.scaled(300, 300, Qt.KeepAspectRatio, Qt.SmoothTransformation))
 
     ## \brief Pencere kapatıldığında web sunucusunu durdurur.
     ## \param event Kapatma olayı.
     def closeEvent(self, event):
-        if self.httpd:
-            print("Web sunucusu kapatılıyor...")
-            threading.Thread(target=self.httpd.shutdown).start()
+        if self.server:
+            logging.info("Web sunucusu kapatılıyor...")
+            # shutdown() sunucu döngüsünü bekler; arayüz donmasın diye ayrı iş parçacığında
+            threading.Thread(target=self.server.stop, daemon=True).start()
         event.accept()
 
-## \brief Betiğin ana giriş noktası.
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Hata: Lütfen bir model dosyası yolu belirtin.")
-        print("Kullanım: python ar_server.py <dosya_yolu>")
-        sys.exit(1)
 
-    model_path = sys.argv[1]
+## \fn run_standalone(model_path, port=DEFAULT_PORT)
+## \brief Modeli sunar ve QR kod penceresini kendi QApplication'ı ile gösterir (komut satırı kullanımı).
+def run_standalone(model_path, port=DEFAULT_PORT):
     if not os.path.exists(model_path):
+        logging.error(f"AR sunucusu için model dosyası bulunamadı: {model_path}")
         print(f"Hata: Belirtilen dosya bulunamadı: {model_path}")
         sys.exit(1)
 
-    file_dir = os.path.dirname(os.path.abspath(model_path))
-    model_filename = os.path.basename(model_path)
-    os.chdir(file_dir)
-
-    viewer_html_src = resource_path('viewer.html')
-    viewer_html_dest = os.path.join(file_dir, 'viewer.html')
-    if os.path.exists(viewer_html_src) and not os.path.exists(viewer_html_dest):
-        import shutil
-        shutil.copy(viewer_html_src, viewer_html_dest)
-
-    PORT = 8000
-    IP_ADDRESS = get_local_ip()
-    SERVER_URL = f"http://{IP_ADDRESS}:{PORT}"
-    VIEWER_URL = f"{SERVER_URL}/viewer.html?model={model_filename}"
-
-    Handler = http.server.SimpleHTTPRequestHandler
-    httpd = socketserver.TCPServer(('', PORT), Handler)
-    
-    print(f"Sunucu {SERVER_URL} adresinde başlatılıyor...")
-    server_thread = threading.Thread(target=httpd.serve_forever)
-    server_thread.daemon = True
-    server_thread.start()
-
-    qr_img_path = os.path.join(file_dir, "temp_qr_code.png")
-    qrcode.make(VIEWER_URL).save(qr_img_path)
-    print(f"QR kodu oluşturuldu: {qr_img_path}")
-
-    app = QApplication(sys.argv)
-    dialog = QRCodeDialog(qr_img_path, SERVER_URL)
-    dialog.httpd = httpd
+    # Model dizini kök olarak sunulur; .gltf dosyalarının .bin/doku dosyaları da erişilebilir olur
+    server = ARServer(root_dir=os.path.dirname(os.path.abspath(model_path)), port=port)
+    server.start()
+    viewer_url = server.viewer_url(os.path.basename(model_path))
+    print(f"Sunucu {server.url} adresinde başlatıldı.")
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    dialog = QRCodeDialog(make_qr_pixmap(viewer_url), server.url, server=server)
     dialog.show()
-    
     app.exec_()
 
-    if os.path.exists(qr_img_path):
-        os.remove(qr_img_path)
-    
-    print("Uygulama kapatıldı.")
+    server.stop()
+    print("AR sunucu uygulaması kapatıldı.")
 
+## \brief Betiğin ana giriş noktası.
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Hata: Lütfen bir model dosyası yolu belirtin.")
+        print("Kullanım: python ar_server.py <dosya_yolu>")
+        sys.exit(1)
+    run_standalone(sys.argv[1])
@@ -32,112 +32,319 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor, QPalette, QPixmap
 from cad_viewer import OCCModelWidget, create_progress_bar
-from OCC.Display.backend import load_backend
-load_backend("pyqt5")
-from OCC.Display.qtDisplay import qtViewer3d
-from OCC.Extend.DataExchange import read_stl_file
-from converter import obj_to_glb, stl_to_obj, obj_to_fbx, convert_to_glb, convert_to_fbx, convert_to_obj, convert_to_step, convert_to_ply, convert_to_gltf, convert_to_3mf, convert_to_dae, convert_step_to_stl, convert_step_to_obj, dosya_secici_ac, obj_to_stl
+from model_loader import BatchModelLoader, create_load_pool, SUPPORTED_EXTS
+from mesh_store import get_mesh_store
+from stl_writer import write_stl, write_shape_stl
+from app_settings import startup_model_paths, add_recent_file
+# OCC arka ucu cad_viewer içinde bir kez yüklenir. Dönüştürücü (ve trimesh) ilk kullanımda
+# _converter() ile içe aktarılır; açılış süresine eklenmez
+
+
+def _converter():
+    """converter modülünü ilk dönüşümde veya dosya seçiminde yükler."""
+    import converter
+    return converter
 
 ## \class MainWindow
 #  \brief Ana uygulama penceresi, 3 ana panel içerir.
 class MainWindow(QWidget):
     ## \brief MainWindow sınıfının kurucusu. Arayüzü başlatır.
-    def __init__(self):
+    #  \param load_startup_models False ise açılışta hiçbir model yüklenmez (headless / kiosk)
+    def __init__(self, load_startup_models=True):
         super().__init__()
         self.setWindowTitle("BOXR_CAD")  # Pencere başlığı
         self.setMinimumSize(1600, 900)   # Minimum pencere boyutu
         self.setStyleSheet("background-color: #181c24;")  # Arka plan rengi
         self.layers = []  # Katmanlar: [{name, visible, model_refs}]
+        self.load_pool = create_load_pool(self)  # CPU sayısı kadar model yükleme işçisi
+        self._batch_loaders = []  # Devam eden BatchModelLoader nesneleri
+        self._info_preloads = {}  # Bilgi paneli için arka planda yüklenen dosya yolu -> MeshPreloadWorker
+        self._info_panel_pending = None  # Panelde hızlı bilgisi gösterilen, tam ölçümü beklenen dosya
+        self._pending_layer_names = {}  # Dosya yolu -> yüklendiğinde kullanılacak katman adı
+        self.ar_server = None  # Uygulama içinde çalışan AR sunucusu (ar_server.ARServer)
+        self.ar_dialog = None  # AR QR kod penceresi
         self.setAcceptDrops(True)  # Sürükle-bırak aktif
         self.initUI()  # Arayüzü başlat
+        if load_startup_models:
+            # Açılış modelleri olay döngüsü başladıktan sonra arka planda yüklenir;
+            # pencere model ayrıştırılmasını beklemeden görünür
+            QTimer.singleShot(0, self.load_startup_models)
+
+    def load_startup_models(self):
+        """Ayarlara göre örnek modeli veya son açılan dosyaları arka planda yükler."""
+        default_obj = resource_path('digiMODE.obj')
+        paths = startup_model_paths(default_obj)
+        if not paths:
+            logging.info("Açılışta yüklenecek model yok.")
+            return
+        if default_obj in paths:
+            self._pending_layer_names[default_obj] = f"Katman {len(self.layers) + 1} (Varsayılan)"
+        self.katman_ekle_toplu(paths, remember=False)
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
                 if url.isLocalFile():
                     ext = os.path.splitext(url.toLocalFile())[1].lower()
-                    if ext in ['.obj', '.stl', '.step', '.stp', '.iges', '.igs']:
+                    if ext in SUPPORTED_EXTS:
                         event.acceptProposedAction()
                         return
         event.ignore()
 
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
+            dosya_yollari = []
+            hatalar = []
             for url in event.mimeData().urls():
                 if url.isLocalFile():
                     file_path = url.toLocalFile()
                     ext = os.path.splitext(file_path)[1].lower()
-                    if ext in ['.obj', '.stl', '.step', '.stp', '.iges', '.igs']:
-                        # Katman ekle fonksiyonunu çağır
-                        self.katman_ekle_dosya_yolu(file_path)
+                    if ext in SUPPORTED_EXTS:
+                        dosya_yollari.append(file_path)
                     else:
-                        from PyQt5.QtWidgets import QMessageBox
-                        QMessageBox.warning(self, "Uyarı", f"Desteklenmeyen dosya formatı: {file_path}")
+                        hatalar.append((file_path, "Desteklenmeyen dosya formatı"))
+            # Bırakılan tüm dosyalar tek bir toplu yüklemede eşzamanlı ayrıştırılır
+            self.katman_ekle_toplu(dosya_yollari, hatalar)
         event.acceptProposedAction()
 
     def katman_ekle_dosya_yolu(self, dosya_yolu):
         # Dosya yolu ile katman ekle
-        import logging
-        import logging
-        from PyQt5.QtCore import QTimer
         if not dosya_yolu:
             return 
+        self.katman_ekle_toplu([dosya_yolu])
+
+    def katman_ekle_toplu(self, dosya_yollari, hatalar=None, remember=True):
+        """Dosyaları arka plan havuzunda eşzamanlı ayrıştırır ve verilen sırayla katman olarak ekler.
+        Ayrıştırma ve tessellation işçilerde, sadece sahneye ekleme ana iş parçacığında yapılır.
+        remember True ise başarıyla yüklenen dosyalar son açılanlar listesine eklenir."""
+        hatalar = list(hatalar or [])
+        if not dosya_yollari:
+            self._report_load_failures(hatalar)
+            return
 
-        logging.info(f"Katman olarak dosya ekleniyor: {dosya_yolu}")
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(15)
-        
-        # Progress bar animasyonu için bir zamanlayıcı
-        self._progress_value = 15
-        timer = QTimer(self)
-        def animate_progress():
-            if self._progress_value < 90: # %90'a kadar animasyon yap
-                self._progress_value += 5
-                self.progress_bar.setValue(self._progress_value)
-            else:
-                timer.stop()
-        timer.timeout.connect(animate_progress)
-        timer.start(20)
+        logging.info(f"Katman olarak {len(dosya_yollari)} dosya ekleniyor: {dosya_yollari}")
+        loader = BatchModelLoader(dosya_yollari, pool=self.load_pool, parent=self)
+        loader.failures.extend(hatalar)
+        loader.progress.connect(self._on_model_load_progress)
+        loader.model_ready.connect(lambda _index, result, l=loader: self._on_model_loaded(l, result, remember))
+        loader.finished.connect(lambda failures, l=loader: self._on_batch_finished(l, failures))
+        self._batch_loaders.append(loader)
 
-        # Dosya uzantısına göre model yükleme
-        ext = os.path.splitext(dosya_yolu)[1].lower()
-        model_ref = None
+        self.progress_bar.setVisible(True)
+        self.cancel_load_btn.setVisible(True)
+        self._on_model_load_progress()
+        loader.start()
+
+    def cancel_model_loads(self):
+        """Devam eden tüm arka plan yüklemelerini iptal eder."""
+        for loader in self._batch_loaders:
+            loader.cancel()
+        for layer in self.layers:
+            if "worker" in layer:
+                layer["worker"].cancel()
+
+    def _on_model_load_progress(self, *args):
+        # Tüm etkin toplu yüklemeler tek bir progress bar'da birleştirilir
+        toplam = sum(loader.count() for loader in self._batch_loaders)
+        if not toplam:
+            return
+        yuzde = sum(loader.percent() * loader.count() for loader in self._batch_loaders) // toplam
+        biten = sum(loader.completed() for loader in self._batch_loaders)
+        self.progress_bar.setValue(yuzde)
+        self.progress_bar.setFormat(f"{biten}/{toplam} dosya yüklendi (%p%)")
 
+    def _on_model_loaded(self, loader, result, remember=True):
+        dosya_yolu = result["file_path"]
         try:
-            if ext in ['.step', '.stp', '.iges', '.igs']:
-                model_ref = self.occ_widget.add_step_iges_model(dosya_yolu)
-            elif ext in ['.obj', '.stl']:
-                # .obj dosyaları için geçici .stl oluşturma mantığı devam ediyor
-                stl_path = obj_to_stl(dosya_yolu) if ext == '.obj' else dosya_yolu
-                model_ref = self.occ_widget.add_model(stl_path, model_path=dosya_yolu)
-            
+            if result.get("kind") == 'assembly':
+                self.add_assembly_layer(result, self._pending_layer_names.pop(dosya_yolu, None))
+                if remember:
+                    add_recent_file(dosya_yolu)
+                return
+            model_ref = self.occ_widget.add_loaded_model(result)
             if model_ref is None:
                 raise ValueError("Model yüklenemedi veya desteklenmiyor.")
-
-            # Katman oluştur ve listeye ekle
-            layer_name = f"Katman {len(self.layers) + 1}"
-            layer = {"name": layer_name, "visible": True, "model_refs": [model_ref], "model_path": dosya_yolu}
-            self.layers.append(layer)
-
-            # Arayüzde katman listesini güncelle
-            item = QListWidgetItem(layer_name)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked)
-            self.layer_list.addItem(item)
-
+            self.add_layer(model_ref, dosya_yolu, self._pending_layer_names.pop(dosya_yolu, None))
             logging.info(f"Model başarıyla katman olarak yüklendi: {dosya_yolu}")
-
+            if remember:
+                add_recent_file(dosya_yolu)
         except Exception as e:
-            logging.error(f"Model yüklenirken hata oluştu: {dosya_yolu} - {e}")
-            QMessageBox.critical(self, "Yükleme Hatası", f"'{os.path.basename(dosya_yolu)}' yüklenirken bir hata oluştu.\n\nDetay: {e}")
-        
-        finally:
-            # İşlem tamamlansın veya hata versin, progress bar'ı tamamla ve gizle
-            timer.stop()
-            self.progress_bar.setValue(100)
-            QTimer.singleShot(500, lambda: self.progress_bar.setVisible(False))
+            loader.failures.append((dosya_yolu, str(e)))
+
+    def _on_batch_finished(self, loader, failures):
+        if loader in self._batch_loaders:
+            self._batch_loaders.remove(loader)
+        loader.deleteLater()
+        self._report_load_failures(failures)
+        # Bekleyen başka yükleme yoksa progress bar'ı tamamla ve gizle
+        if self._batch_loaders:
+            self._on_model_load_progress()
+            return
+        self.progress_bar.setValue(100)
+        self.cancel_load_btn.setVisible(False)
+        QTimer.singleShot(500, lambda: self.progress_bar.setVisible(False))
+        self.show_model_info_in_panel()
+
+    def _report_load_failures(self, failures):
+        """Yükleme hatalarını dosya başına ayrı pencere yerine tek bir raporda gösterir."""
+        if not failures:
+            return
+        for dosya_yolu, hata in failures:
+            logging.error(f"Model yüklenirken hata oluştu: {dosya_yolu} - {hata}")
+        if len(failures) == 1:
+            dosya_yolu, hata = failures[0]
+            QMessageBox.critical(self, "Yükleme Hatası", f"'{os.path.basename(dosya_yolu)}' yüklenirken bir hata oluştu.\n\nDetay: {hata}")
+            return
+        detay = "\n".join(f"• {os.path.basename(dosya_yolu)}: {hata}" for dosya_yolu, hata in failures)
+        QMessageBox.critical(self, "Yükleme Hatası", f"{len(failures)} dosya yüklenemedi.\n\n{detay}")
+
+    def _layer_row(self, layer):
+        """Katman sözlüğünün listedeki sırasını döndürür (yoksa -1). Sözlükler içerikle değil kimlikle aranır."""
+        return next((i for i, l in enumerate(self.layers) if l is layer), -1)
+
+    def remove_layer(self, idx):
+        """Katmanı listeden çıkarır; dosyayı kullanan başka katman kalmadıysa mesh'i bellekten atar.
+        Montaj katmanı silinince parça katmanları da silinir (modelleri montajın model_refs'indedir);
+        parça katmanı silinince parça montajdan çıkarılır."""
+        layer = self.layers.pop(idx)
+        self.layer_list.takeItem(idx)
+        removed = [layer]
+        if "worker" in layer:
+            layer["worker"].cancel()
+        for part_layer in layer.get("parts", []):
+            row = self._layer_row(part_layer)
+            if row >= 0:
+                self.layers.pop(row)
+                self.layer_list.takeItem(row)
+                removed.append(part_layer)
+        parent = layer.get("parent")
+        if parent is not None:
+            parent["parts"] = [p for p in parent["parts"] if p is not layer]
+            parent["model_refs"] = [r for r in parent["model_refs"] if r not in layer["model_refs"]]
+        for removed_layer in removed:
+            model_path = removed_layer.get("model_path")
+            if model_path and not any(l.get("model_path") == model_path for l in self.layers):
+                get_mesh_store().discard(model_path)
+                self.occ_widget.mesh_indices.pop(model_path, None)  # Montaj örneklerinin paylaştığı ölçüm indeksleri
+
+    def add_layer(self, model_ref, model_path, layer_name=None):
+        """Yeni bir katman oluşturur ve katman listesine ekler."""
+        if layer_name is None:
+            layer_name = f"Katman {len(self.layers) + 1}"
+        model_refs = [model_ref] if model_ref is not None else []
+        layer = {"name": layer_name, "visible": True, "model_refs": model_refs, "model_path": model_path}
+        self.layers.append(layer)
+
+        # Arayüzde katman listesini güncelle
+        item = QListWidgetItem(layer_name)
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+        item.setCheckState(Qt.Checked)
+        self.layer_list.addItem(item)
+        return layer
+
+    def add_assembly_layer(self, result, layer_name=None):
+        """STEP montajı için bir montaj katmanı oluşturur ve parçaları arka planda yüklemeye başlar.
+        Her parça hazır oldukça sahneye ve montajın altına ayrı bir katman olarak eklenir."""
+        from model_loader import AssemblyPartWorker
+        dosya_yolu = result["file_path"]
+        layer = self.add_layer(None, dosya_yolu, layer_name or os.path.basename(dosya_yolu))
+        layer["parts"] = []
+        worker = AssemblyPartWorker(dosya_yolu, result["parts"])
+        worker.signals.definition_ready.connect(
+            lambda definition, instances, l=layer: self._on_assembly_definition_ready(l, definition, instances))
+        worker.signals.progress.connect(lambda done, total, l=layer: self._on_assembly_progress(l, done, total))
+        worker.signals.finished.connect(lambda failures, l=layer: self._on_assembly_finished(l, failures))
+        layer["worker"] = worker
+        self.load_pool.start(worker)
+        logging.info(f"Montaj {len(result['parts'])} parça olarak yükleniyor: {dosya_yolu}")
+        return layer
+
+    def _on_assembly_definition_ready(self, layer, definition, instances):
+        """Bir parça tanımının tüm örneklerini paylaşılan tek sunumla sahneye, her örneği de montajın
+        altına (dosyadaki sırasıyla) ayrı bir parça katmanı olarak ekler."""
+        from functools import partial
+        from step_assembly import load_definition_brep, matrix_to_trsf
+        row = self._layer_row(layer)
+        if row < 0:
+            return  # Montaj katmanı yükleme sürerken silindi
+        mesh, brep_source = None, None
+        if definition["kind"] == 'mesh':
+            # Önbellekten açılan tanım sadece üçgenleme taşır; kesin B-rep gerektiğinde kaynaktan okunur
+            mesh = (definition["vertices"], definition["faces"])
+            brep_source = partial(load_definition_brep, layer["model_path"], instances[0]["definition"])
+        colors = [QColor.fromRgbF(*part["color"]) if part.get("color") else None for part in instances]
+        model_refs = self.occ_widget.add_shape_instances(
+            definition["shape"], [matrix_to_trsf(part["matrix"]) for part in instances], mesh=mesh, colors=colors,
+            brep_source=brep_source)
+
+        for part, model_ref in zip(instances, model_refs):
+            if not layer["visible"]:
+                self.occ_widget.set_model_visible(model_ref, False)
+            layer["model_refs"].append(model_ref)
+            part_layer = {"name": part["name"], "visible": layer["visible"], "model_refs": [model_ref],
+                          "model_path": definition["file_path"], "parent": layer, "index": part["index"]}
+            position = sum(1 for p in layer["parts"] if p["index"] < part["index"])
+            layer["parts"].insert(position, part_layer)
+            part_row = row + position + 1
+            self.layers.insert(part_row, part_layer)
+            item = QListWidgetItem(f"    ↳ {part['name']}")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if layer["visible"] else Qt.Unchecked)
+            self.layer_list.insertItem(part_row, item)
+
+    def _on_assembly_progress(self, layer, done, total):
+        row = self._layer_row(layer)
+        if row >= 0:
+            self.layer_list.item(row).setText(f"{layer['name']} ({done}/{total} parça)")
+
+    def _on_assembly_finished(self, layer, failures):
+        layer.pop("worker", None)
+        row = self._layer_row(layer)
+        if row < 0:
+            return
+        self.layer_list.item(row).setText(layer["name"])
+        logging.info(f"Montaj yüklendi: {layer['model_path']} ({len(layer['parts'])} parça)")
+        if failures:
+            self._report_load_failures([(f"{layer['model_path']} / {name}", hata) for name, hata in failures])
+        if self.layer_list.currentRow() == row:
             self.show_model_info_in_panel()
 
+    def _assembly_instances(self, layer):
+        """Montajın yüklü parçalarını [(tanım mesh'inin yolu, örnek referansı)] olarak döndürür."""
+        return [(part_layer["model_path"], part_layer["model_refs"][0])
+                for part_layer in layer["parts"] if part_layer["model_refs"]]
+
+    def _assembly_groups(self, layer):
+        """Montajın parçalarını tanım başına (vertices, faces, [örnek matrisleri]) olarak döndürür.
+        Matrisler örneklerin güncel dönüşümüdür; parça taşınmış veya döndürülmüşse o konum kullanılır."""
+        from picking import trsf_to_matrix
+        matrices = {}
+        for path, model_ref in self._assembly_instances(layer):
+            matrices.setdefault(path, []).append(trsf_to_matrix(model_ref.LocalTransformation())[:3].ravel())
+        groups = []
+        for path, instance_matrices in matrices.items():
+            mesh = get_mesh_store().get(path)
+            groups.append((mesh.vertices, mesh.faces, instance_matrices))
+        return groups
+
+    def _assembly_model_info(self, layer):
+        """get_model_info ile aynı anahtarlarla, tanım mesh'leri ve örnek konumlarından hesaplanan montaj bilgisi."""
+        from step_assembly import instance_stats
+        model_path = layer["model_path"]
+        stats = instance_stats(self._assembly_groups(layer))
+        info = {
+            'Dosya Adı': os.path.basename(model_path),
+            'Dosya Yolu': model_path,
+            'Format': os.path.splitext(model_path)[-1].upper(),
+            'Vertex Sayısı': stats["vertices"],
+            'Yüzey (Face) Sayısı': stats["faces"],
+            'Sınır Kutusu (X, Y, Z)': 'Hesaplanamadı',
+        }
+        if stats["extents"] is not None:
+            dims = [f"{d:.2f}" for d in stats["extents"]]
+            info['Sınır Kutusu (X, Y, Z)'] = f"{dims[0]} x {dims[1]} x {dims[2]}"
+        return info
+
     ## \brief Ana arayüz düzenini ve panelleri oluşturur.
     def initUI(self):
         splitter = QSplitter(Qt.Horizontal)
@@ -450,7 +657,7 @@ class MainWindow(QWidget):
         layout.addWidget(self.scroll_area)
 
         # --- BUTON FONKSİYONLARI ---
-        self.open_btn.clicked.connect(lambda: self.katman_ekle_dosya_yolu(dosya_secici_ac(parent=self)))
+        self.open_btn.clicked.connect(lambda: self.katman_ekle_dosya_yolu(_converter().dosya_secici_ac(parent=self)))
         self.convert_btn.clicked.connect(lambda: self.toggle_sub_menu(self.convert_sub_buttons))
         self.view_options_btn.clicked.connect(lambda: self.toggle_sub_menu(self.view_sub_buttons))
         model_info_btn.clicked.connect(self.show_model_info_in_panel)
@@ -512,7 +719,11 @@ class MainWindow(QWidget):
             return
 
         # Pass model path and the AIS reference to the widget
-        self.occ_widget.set_active_model_for_measurement(model_path, model_refs[0])
+        if "parts" in layer:
+            # Montajda tıklanan örnek, tanımın mesh'i ve örneğin güncel dönüşümüyle ölçülür
+            self.occ_widget.set_active_model_for_measurement(model_path, None, self._assembly_instances(layer))
+        else:
+            self.occ_widget.set_active_model_for_measurement(model_path, model_refs[0])
         self.occ_widget.active_measure = measure_type
         self.occ_widget.set_selection_mode(selection_mode)
         self.occ_widget.set_measure_mode(True)
@@ -598,7 +809,7 @@ class MainWindow(QWidget):
             return
 
         model_ref = model_refs[0]  # Katmandaki ilk model
-        model_shape = self.occ_widget.get_shape_from_ref(model_ref)
+        model_shape = self.occ_widget.get_brep_shape_from_ref(model_ref)
 
         if model_shape is None:
             QMessageBox.warning(self, "Uyarı", "Seçili katmanın geçerli bir modeli (shape) yok!")
@@ -608,9 +819,8 @@ class MainWindow(QWidget):
             from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Common
             from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeHalfSpace
             from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeFace
-            from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
-            from OCC.Core.StlAPI import StlAPI_Writer
             from OCC.Core.gp import gp_Pln, gp_Pnt, gp_Dir, gp_Vec
+            from occ_mesh import tessellate_shape
 
             # Düzlemi UI'dan al
             axis_btn = self.section_axis_group.checkedButton()
@@ -653,18 +863,21 @@ class MainWindow(QWidget):
             if not file_path:
                 return
 
-            # Mesh oluştur ve STL dosyasına yaz
-            mesh = BRepMesh_IncrementalMesh(cut_shape, 0.1, True)
-            mesh.Perform()
-            if not mesh.IsDone():
+            # Mesh oluştur ve STL dosyasına yaz (sapma kesitin boyutuna göre ölçeklenir)
+            try:
+                tessellate_shape(cut_shape, 'export')
+            except ValueError:
                  QMessageBox.warning(self, "Hata", "Kesitli model meshlenemedi.")
                  return
 
-            writer = StlAPI_Writer()
-            writer.SetASCIIMode(True) # ASCII formatında kaydet
-            if not writer.Write(cut_shape, file_path):
-                QMessageBox.critical(self, "Hata", f"Kesit dosyası yazılamadı: {file_path}")
+            # Üçgenlemeden doğrudan ikili STL yazılır; aynı diziler depoya eklendiğinden
+            # yeni katman dosyayı tekrar okumaz
+            try:
+                vertices, faces = write_shape_stl(cut_shape, file_path)
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(self, "Hata", f"Kesit dosyası yazılamadı: {file_path}\n{e}")
                 return
+            get_mesh_store().put(file_path, vertices, faces)
 
             # --- KESİTİ YENİ KATMAN OLARAK EKLE ---
             layer_name = f"Kesit - {os.path.basename(file_path)}"
@@ -735,11 +948,15 @@ class MainWindow(QWidget):
             return
 
         try:
-            import trimesh
             # Dosya adını koruyarak geçici bir STL oluştur
             temp_stl = os.path.join(tempfile.gettempdir(), f"boxr_cad_export_{os.path.basename(model_path)}.stl")
-            mesh = trimesh.load(model_path, force='mesh')
-            mesh.export(temp_stl, file_type='stl')
+            if "parts" in self.layers[idx]:
+                # Montajın birleşik mesh'i örneklerin güncel konumlarıyla sadece burada kurulur
+                from step_assembly import merge_instance_meshes
+                write_stl(temp_stl, *merge_instance_meshes(self._assembly_groups(self.layers[idx])))
+            else:
+                mesh = get_mesh_store().get(model_path)
+                write_stl(temp_stl, mesh.vertices, mesh.faces)
             
             subprocess.Popen([printer_path, temp_stl])
             
@@ -804,30 +1021,14 @@ class MainWindow(QWidget):
             self.progress_bar.setVisible(False)
             self.progress_bar.setStyleSheet('QProgressBar { background: #232836; color: #FFD600; border-radius: 8px; height: 22px; font-size: 15px; } QProgressBar::chunk { background: #FFD600; border-radius: 8px; }')
             vbox.addWidget(self.progress_bar)
-            # Varsayılan olarak digiMODE.obj dosyasını yükle
-            default_obj = resource_path('digiMODE.obj')
-            if os.path.exists(default_obj):
-                stl_path = obj_to_stl(default_obj)
-                model_ref = self.occ_widget.add_model(stl_path, model_path=default_obj)
-                # 1. katman olarak ekle
-                layer_name = "Katman 1 (Varsayılan)"
-                layer = {"name": layer_name, "visible": True, "model_refs": [model_ref], "model_path": default_obj}
-                self.layers.append(layer)
-                # Katman paneline ekle (layer_list kesinlikle sağ panelde oluşturulduktan sonra ekleniyor)
-                def add_first_layer_item():
-                    item = QListWidgetItem(layer_name)
-                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                    item.setCheckState(Qt.Checked)
-                    self.layer_list.addItem(item)
-                QTimer.singleShot(0, add_first_layer_item)
-                # Sağ panelde model bilgilerini göster
-                if hasattr(self, 'right_content_label'):
-                    info = self.occ_widget.get_model_info()
-                    html = "<div style='font-size:15px; color:#bfc7e6;'><b>Model Bilgileri:</b><br>"
-                    for k, v in info.items():
-                        html += f"<b>{k}:</b> {v}<br>"
-                    html += "</div>"
-                    self.right_content_label.setText(html)
+            # Arka planda süren yüklemeleri iptal butonu
+            self.cancel_load_btn = QPushButton("❌ Yüklemeyi İptal Et")
+            self.cancel_load_btn.setStyleSheet('background-color:#353b4a; color:#FFD600; border-radius:8px; padding:4px;')
+            self.cancel_load_btn.setVisible(False)
+            self.cancel_load_btn.clicked.connect(self.cancel_model_loads)
+            vbox.addWidget(self.cancel_load_btn)
+            # Varsayılan model (digiMODE.obj) veya son açılan dosyalar load_startup_models
+            # ile olay döngüsü başladıktan sonra arka planda yüklenir
             # Mesafe ölçümü tamamlandığında sonucu sağ panelde göster
             self.occ_widget.mesafe_olcum_tamamlandi.connect(self.mesafe_sonuc_goster)
         except Exception as e:
@@ -931,11 +1132,8 @@ class MainWindow(QWidget):
             # Model varsa 3D görünümden kaldır
             for ref in self.layers[idx]["model_refs"]:
                 if hasattr(self.occ_widget, 'display'):
-                    self.occ_widget.display.Context.Remove(ref, True)
-            if hasattr(self.occ_widget, 'display'):
-                self.occ_widget.display.Context.UpdateCurrentViewer()
-            self.layers.pop(idx)
-            self.layer_list.takeItem(idx)
+                    self.occ_widget.remove_model(ref)
+            self.remove_layer(idx)
         self.delete_layer_btn.clicked.connect(secili_katmani_sil)
 
         # Üst ve alt layoutları ayıran çizgi
@@ -1053,6 +1251,11 @@ class MainWindow(QWidget):
             self.layers[idx]["visible"] = visible
             for ref in self.layers[idx]["model_refs"]:
                 self.occ_widget.set_model_visible(ref, visible)
+            # Montaj katmanı gizlenince/gösterilince parça katmanlarının işaretleri de güncellenir
+            for part_layer in self.layers[idx].get("parts", []):
+                part_row = self._layer_row(part_layer)
+                if part_row >= 0:
+                    self.layer_list.item(part_row).setCheckState(Qt.Checked if visible else Qt.Unchecked)
         self.layer_list.itemChanged.connect(on_layer_check)
         self.layer_list.currentItemChanged.connect(self.show_model_info_in_panel)  # Bu satırı ekle
         # Katmanlar kutusunda sağ tık menüsü ile katman silme
@@ -1068,10 +1271,8 @@ class MainWindow(QWidget):
             if action == sil_action:
                 # Katmanı ve modellerini kaldır
                 for ref in self.layers[idx]["model_refs"]:
-                    self.occ_widget.display.Context.Remove(ref, True)
-                self.occ_widget.display.Context.UpdateCurrentViewer()
-                self.layers.pop(idx)
-                self.layer_list.takeItem(idx)
+                    self.occ_widget.remove_model(ref)
+                self.remove_layer(idx)
         self.layer_list.customContextMenuRequested.connect(katman_context_menu)
 
         
@@ -1505,27 +1706,101 @@ class MainWindow(QWidget):
 
         return self.right_frame
 
-    # MainWindow'un metodu olarak ekle:
     def show_ar_preview(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "AR Önizlemesi için Model Seç", "", "3D Modeller (*.glb *.gltf)")
-        if file_path:
-            try:
-                command = [sys.executable]
-                if not getattr(sys, 'frozen', False):
-                    command.append("main.py")
-
-                command.extend(['--ar-server', file_path])
-                
-                # Hata ayıklama için log dosyaları oluştur
-                stdout_log = open('ar_server_stdout.log', 'w')
-                stderr_log = open('ar_server_stderr.log', 'w')
-
-                # Arka plan işlemini log dosyalarına yazacak şekilde başlat
-                subprocess.Popen(command, stdout=stdout_log, stderr=stderr_log)
+        """Seçili katmanı (yoksa dosya seçiciden seçilen modeli) AR sunucusundan sunar ve QR kodunu gösterir."""
+        idx = self.layer_list.currentRow()
+        file_path = self.layers[idx].get("model_path") if 0 <= idx < len(self.layers) else None
+        if not file_path:
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "AR Önizlemesi için Model Seç", "",
+                "3D Modeller (*.glb *.gltf *.obj *.stl *.step *.stp *.iges *.igs)")
+        if not file_path:
+            return
+        from ar_export import AR_SOURCE_EXTS, ready_ar_assets, GLBExportWorker
+        try:
+            if file_path.lower().endswith('.gltf'):
+                # .gltf dosyalarının .bin/doku dosyaları ayrı olduğundan model dizini kök olarak sunulur
+                self._ensure_ar_server(os.path.dirname(os.path.abspath(file_path)))
+                self._show_ar_qr(os.path.basename(file_path))
+                return
+            if not file_path.lower().endswith(AR_SOURCE_EXTS):
+                QMessageBox.warning(self, "Uyarı", "Bu dosya formatı AR önizlemesi için desteklenmiyor.")
+                return
+            ready = ready_ar_assets(file_path)
+            if ready is not None:
+                # Aynı içerik bu oturumda dönüştürüldü: dosya tekrar okunmaz, dönüşüm atlanır
+                self._publish_ar_model(file_path, ready)
+                return
+        except Exception as e:
+            logging.error(f"AR önizlemesi hazırlanırken hata: {e}")
+            QMessageBox.critical(self, "Hata", f"AR sunucusu başlatılırken bir hata oluştu: {e}")
+            return
 
-                QMessageBox.information(self, "AR Sunucusu Başlatıldı", "AR sunucusu arka planda başlatıldı. Bir sorun olursa lütfen ar_server_stderr.log dosyasını kontrol edin.")
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"AR sunucusu başlatılırken bir hata oluştu: {e}")
+        self.right_frame.setVisible(True)
+        self.right_content_label.setText(
+            f'<div style="color:#FFD600; font-size:16px;">AR için model hazırlanıyor: {os.path.basename(file_path)}</div>')
+        worker = GLBExportWorker(file_path)
+        worker.signals.finished.connect(self._publish_ar_model)
+        worker.signals.failed.connect(
+            lambda path, error: QMessageBox.critical(self, "Hata", f"'{os.path.basename(path)}' AR için dönüştürülemedi.\n\nDetay: {error}"))
+        self.load_pool.start(worker)
+
+    def _publish_ar_model(self, file_path, assets):
+        """Dönüştürülmüş GLB'yi ve ayrıntı seviyelerini sunucuda yayınlar, QR penceresini gösterir.
+        assets kabadan inceye sıralı [(url yolu, MemoryAsset)] listesidir; sonuncusu tam modeldir."""
+        try:
+            self._ensure_ar_server()
+            for url_path, asset in assets:
+                self.ar_server.publish(url_path, asset)
+            url_path = assets[-1][0]
+            self._show_ar_qr(url_path, [lod_url for lod_url, _ in assets[:-1]])
+            logging.info(f"AR önizlemesi yayınlandı: {file_path} -> {url_path} ({len(assets) - 1} LOD)")
+        except Exception as e:
+            logging.error(f"AR sunucusu başlatılırken hata: {e}")
+            QMessageBox.critical(self, "Hata", f"AR sunucusu başlatılırken bir hata oluştu: {e}")
+
+    def _ensure_ar_server(self, root_dir=None):
+        """Çalışan AR sunucusunu döndürür; QR penceresi kapalıysa yeni bir sunucu başlatır."""
+        from ar_server import ARServer
+        dialog_open = self.ar_dialog is not None and self.ar_dialog.isVisible()
+        if dialog_open and self.ar_server is not None and self.ar_server.is_running():
+            if root_dir is not None:
+                self.ar_server.set_root(root_dir)
+        else:
+            # Pencere kapatıldığında sunucu durdurulur; yeni önizleme yeni bir sunucu başlatır
+            self.ar_server = ARServer(root_dir=root_dir)
+            self.ar_server.start()
+        return self.ar_server
+
+    def _show_ar_qr(self, model_url_path, lod_url_paths=()):
+        """Model adresinin QR kodunu mevcut pencerede veya yeni bir alt pencerede gösterir."""
+        from ar_server import QRCodeDialog, make_qr_pixmap
+        viewer_url = self.ar_server.viewer_url(model_url_path, lod_url_paths)
+        qr_pixmap = make_qr_pixmap(viewer_url)
+        if self.ar_dialog is not None and self.ar_dialog.isVisible():
+            self.ar_dialog.server = self.ar_server
+            self.ar_dialog.set_target(qr_pixmap, self.ar_server.url)
+        else:
+            self.ar_dialog = QRCodeDialog(qr_pixmap, self.ar_server.url, parent=self, server=self.ar_server)
+        self.ar_dialog.show()
+        self.ar_dialog.raise_()
+        self.ar_dialog.activateWindow()
+        logging.info(f"AR önizlemesi: {viewer_url}")
+
+    def stop_ar_server(self):
+        """Uygulama içindeki AR sunucusunu ve QR penceresini kapatır."""
+        if self.ar_dialog is not None:
+            self.ar_dialog.server = None
+            self.ar_dialog.close()
+            self.ar_dialog = None
+        if self.ar_server is not None:
+            self.ar_server.stop()
+            self.ar_server = None
+
+    def closeEvent(self, event):
+        self.cancel_model_loads()
+        self.stop_ar_server()
+        super().closeEvent(event)
 
     def mesafe_olc(self):
         if hasattr(self, 'occ_widget'):
@@ -1666,7 +1941,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_glb(self, source_path=source_path)
+        result = _converter().convert_to_glb(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1679,7 +1954,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_fbx(self, source_path=source_path)
+        result = _converter().convert_to_fbx(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1692,7 +1967,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_obj(self, source_path=source_path)
+        result = _converter().convert_to_obj(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1701,11 +1976,19 @@ class MainWindow(QWidget):
         if idx < 0:
             QMessageBox.warning(self, "Uyarı", "Lütfen dönüştürme işlemi için bir katman seçin.")
             return
-        source_path = self.layers[idx].get("model_path")
+        layer = self.layers[idx]
+        if "parent" in layer:
+            # Montaj parçası tanımın STL'inden değil, kesin B-rep'inden (montajdaki konumunda) yazılır
+            shape = self.occ_widget.get_brep_shape_from_ref(layer["model_refs"][0]) if layer["model_refs"] else None
+            result = _converter().export_shape_to_step(self, shape, layer["name"])
+            if result:
+                self.show_comparison_results(result)
+            return
+        source_path = layer.get("model_path")
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_step(self, source_path=source_path)
+        result = _converter().convert_to_step(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1718,7 +2001,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_ply(self, source_path=source_path)
+        result = _converter().convert_to_ply(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1731,7 +2014,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_gltf(self, source_path=source_path)
+        result = _converter().convert_to_gltf(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1744,7 +2027,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_3mf(self, source_path=source_path)
+        result = _converter().convert_to_3mf(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1757,7 +2040,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_to_dae(self, source_path=source_path)
+        result = _converter().convert_to_dae(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1770,7 +2053,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_step_to_stl(self, source_path=source_path)
+        result = _converter().convert_step_to_stl(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1783,7 +2066,7 @@ class MainWindow(QWidget):
         if not source_path:
             QMessageBox.warning(self, "Hata", "Seçili katmana ait bir dosya yolu bulunamadı.")
             return
-        result = convert_step_to_obj(self, source_path=source_path)
+        result = _converter().convert_step_to_obj(self, source_path=source_path)
         if result:
             self.show_comparison_results(result)
 
@@ -1801,7 +2084,16 @@ class MainWindow(QWidget):
             self.right_content_label.setText("<div style='font-size:15px; color:red; text-align:center; padding-top:20px;'>Seçili katman için model bilgisi alınamadı.</div>")
             return
 
-        info = self.occ_widget.get_model_info(model_path)
+        self._info_panel_pending = None
+        if "parts" in layer:
+            # Montaj bilgisi tanımlar ve örnek konumlarından hesaplanır; birleşik mesh kurulmaz
+            info = self._assembly_model_info(layer)
+        elif model_path in get_mesh_store() or not os.path.exists(model_path):
+            info = self.occ_widget.get_model_info(model_path)
+        else:
+            # Tam mesh arka planda yüklenirken başlıktan okunan sayılar hemen gösterilir
+            info = self._quick_model_info(model_path)
+            self._preload_model_info(model_path)
 
         self.right_frame.setVisible(True)
         self.hide_log_download_button()
@@ -1826,11 +2118,54 @@ class MainWindow(QWidget):
         )
         self.right_content_label.setText(html)
 
+    def _quick_model_info(self, model_path):
+        """get_model_info ile aynı anahtarlarla, sadece dosya başlığından okunan bilgiyi döndürür.
+        Başlıkta bulunmayan değerler tam ölçüm gelene kadar '…' olarak gösterilir."""
+        from model_info import quick_stats
+        stats = quick_stats(model_path) or {}
+        pending = "…"
+        info = {
+            'Dosya Adı': os.path.basename(model_path),
+            'Dosya Yolu': model_path,
+            'Format': os.path.splitext(model_path)[-1].upper(),
+            'Vertex Sayısı': stats.get("vertices") if stats.get("vertices") is not None else pending,
+            'Yüzey (Face) Sayısı': stats.get("faces") if stats.get("faces") is not None else pending,
+            'Sınır Kutusu (X, Y, Z)': pending,
+        }
+        if stats.get("extents"):
+            dims = [f"{d:.2f}" for d in stats["extents"]]
+            info['Sınır Kutusu (X, Y, Z)'] = f"{dims[0]} x {dims[1]} x {dims[2]}"
+        return info
+
+    def _preload_model_info(self, model_path):
+        """Dosyanın mesh'ini arka planda depoya yükler; bittiğinde panel hâlâ bu dosyayı gösteriyorsa yeniler."""
+        from model_loader import MeshPreloadWorker
+        self._info_panel_pending = model_path
+        if model_path in self._info_preloads:
+            return
+        worker = MeshPreloadWorker(model_path)
+        worker.signals.finished.connect(self._on_model_info_preloaded)
+        worker.signals.failed.connect(self._on_model_info_preload_failed)
+        self._info_preloads[model_path] = worker
+        self.load_pool.start(worker)
+
+    def _on_model_info_preloaded(self, model_path):
+        self._info_preloads.pop(model_path, None)
+        if self._info_panel_pending == model_path:
+            self.show_model_info_in_panel()
+
+    def _on_model_info_preload_failed(self, model_path, error):
+        # Panelde başlık bilgisi kalır; katman tekrar seçilince yükleme yeniden denenir
+        self._info_preloads.pop(model_path, None)
+        if self._info_panel_pending == model_path:
+            self._info_panel_pending = None
+
     def show_comparison_results(self, result_data):
         if not result_data:
             return
 
         self.show_model_info_in_panel() # Önce güncel model bilgisini göster
+        self._info_panel_pending = None  # Karşılaştırma, arka planda gelen tam bilgiyle silinmesin
         html = self.right_content_label.text() # Sonra mevcut HTMLi al
 
         html += "<br><hr style='border-color: #353b4a;'>"
@@ -0,0 +1,167 @@
+## \file blender_worker.py
+## \brief FBX dışa aktarımı için arka planda açık tutulan Blender süreçleri havuzu.
+##
+## Her dönüşümde `blender -b` soğuk başlatmak saniyeler sürer. Buradaki işçiler Blender'ı bir kez
+## başlatır ve stdin üzerinden satır başına bir JSON iş alır; sonucu stdout'a işaretli bir satır
+## olarak yazar. Blender'ın kendi çıktıları işaretsiz satırlar olduğundan yok sayılır (debug log).
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import subprocess
+import itertools
+
+RESULT_MARKER = "BOXR_RESULT "
+JOB_TIMEOUT = 600  # Tek bir dışa aktarım için en fazla bekleme süresi (saniye)
+
+# Blender içinde çalışan döngü: her iş için sahneyi sıfırlar, GLB'yi içe ve FBX'i dışa aktarır
+_SERVER_SCRIPT = f"""
+import sys, json, bpy
+for line in sys.stdin:
+    line = line.strip()
+    if not line:
+        continue
+    job = json.loads(line)
+    try:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        bpy.ops.import_scene.gltf(filepath=job["input"])
+        bpy.ops.export_scene.fbx(filepath=job["output"])
+        result = {{"id": job["id"], "ok": True}}
+    except Exception as e:
+        result = {{"id": job["id"], "ok": False, "error": str(e)}}
+    sys.stdout.write({RESULT_MARKER!r} + json.dumps(result) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+## \class BlenderWorkerError
+#  \brief Blender işçisi başlatılamadığında veya bir iş başarısız olduğunda fırlatılır.
+class BlenderWorkerError(Exception):
+    pass
+
+
+## \class BlenderWorker
+#  \brief Tek bir arka plan Blender süreci. İşleri sırayla çalıştırır; aynı anda tek iş alır.
+class BlenderWorker:
+    _ids = itertools.count(1)
+
+    def __init__(self, blender_path):
+        self.blender_path = blender_path
+        self.process = None
+        self._results = queue.Queue()
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [self.blender_path, "-b", "--factory-startup", "--python-expr", _SERVER_SCRIPT],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace", bufsize=1,
+        )
+        self._results = queue.Queue()
+        threading.Thread(target=self._read_output, args=(self.process, self._results),
+                         name="blender-worker-output", daemon=True).start()
+        logging.info(f"Blender işçisi başlatıldı (pid {self.process.pid}).")
+
+    @staticmethod
+    def _read_output(process, results):
+        for line in process.stdout:
+            # Blender'ın satır sonu yazmadan bıraktığı çıktı işaretin önüne yapışabilir
+            start = line.find(RESULT_MARKER)
+            if start < 0:
+                logging.debug(f"Blender: {line.rstrip()}")
+                continue
+            if start > 0:
+                logging.debug(f"Blender: {line[:start]}")
+            try:
+                results.put(json.loads(line[start + len(RESULT_MARKER):]))
+            except ValueError:
+                logging.debug(f"Blender: {line.rstrip()}")
+        results.put(None)  # Süreç sonlandı
+
+    def export_fbx(self, glb_path, fbx_path, timeout=JOB_TIMEOUT):
+        """GLB dosyasını FBX olarak dışa aktarır. Başarısızlıkta BlenderWorkerError fırlatır."""
+        if not self.is_alive():
+            self.start()
+        job_id = next(self._ids)
+        deadline = time.monotonic() + timeout
+        try:
+            self.process.stdin.write(json.dumps({"id": job_id, "input": glb_path, "output": fbx_path}) + "\n")
+            self.process.stdin.flush()
+            while True:
+                result = self._results.get(timeout=max(0.0, deadline - time.monotonic()))
+                # Zaman aşımına uğramış önceki bir işin geç gelen sonucu bu işe verilmez
+                if result is None or result.get("id") == job_id:
+                    break
+                logging.debug(f"Blender işçisinden eski bir işin sonucu atlandı: {result}")
+        except (OSError, queue.Empty) as e:
+            self.stop()
+            raise BlenderWorkerError(f"Blender işçisi yanıt vermedi: {e}")
+        if result is None:
+            self.stop()
+            raise BlenderWorkerError("Blender işçisi beklenmedik şekilde kapandı.")
+        if not result.get("ok"):
+            raise BlenderWorkerError(result.get("error", "Bilinmeyen Blender hatası"))
+        return fbx_path
+
+    def stop(self):
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()  # Döngü stdin kapanınca biter
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+## \class BlenderWorkerPool
+#  \brief Sabit sayıda BlenderWorker'ı paylaştıran havuz. İşçiler ilk ihtiyaçta başlatılır.
+class BlenderWorkerPool:
+    def __init__(self, blender_path, size=None):
+        self.blender_path = blender_path
+        self.size = max(1, size or min(2, os.cpu_count() or 1))
+        self._idle = queue.Queue()
+        self._workers = [BlenderWorker(blender_path) for _ in range(self.size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def export_fbx(self, glb_path, fbx_path, timeout=JOB_TIMEOUT):
+        worker = self._idle.get()
+        try:
+            return worker.export_fbx(glb_path, fbx_path, timeout)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.stop()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+## \fn get_blender_pool(blender_path, size=None)
+#  \brief Verilen Blender yürütülebilir dosyası için süreç genelinde paylaşılan havuzu döndürür.
+#  \param size Havuzdaki Blender süreci sayısı (sadece ilk çağrıda dikkate alınır)
+def get_blender_pool(blender_path, size=None):
+    with _pools_lock:
+        pool = _pools.get(blender_path)
+        if pool is None:
+            pool = BlenderWorkerPool(blender_path, size)
+            _pools[blender_path] = pool
+        return pool
+
+
+@atexit.register
+def close_blender_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -3,11 +3,10 @@
 
 from PyQt5.QtWidgets import QFileDialog, QWidget, QVBoxLayout, QHBoxLayout, QSizePolicy, QFrame, QLabel, QProgressBar, QMessageBox
 from PyQt5.QtGui import QPainter, QPen, QColor, QLinearGradient, QBrush
-from PyQt5.QtCore import pyqtSignal
-import trimesh
-import tempfile
+from PyQt5.QtCore import pyqtSignal, QTimer
 import os
 import sys
+import logging
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -22,7 +21,9 @@ def resource_path(relative_path):
 from OCC.Display.backend import load_backend
 load_backend("pyqt5")  # OpenCASCADE'nin PyQt5 ile entegrasyonunu sağlar, 3D görüntüleme için gerekli
 from OCC.Display.qtDisplay import qtViewer3d
-from OCC.Extend.DataExchange import read_stl_file
+from occ_mesh import mesh_to_shape, mesh_to_brep, read_stl_shape
+from mesh_store import get_mesh_store
+# Ölçüm alt sistemi (trimesh, picking, mesh_adjacency) ilk ölçümde içe aktarılır
 from PyQt5.QtCore import Qt
 import numpy as np
 # Model taşıma için OCC importları
@@ -30,6 +31,12 @@ from OCC.Core.gp import gp_Trsf, gp_Vec
 from OCC.Core.AIS import AIS_Shape
 from OCC.Core.Quantity import Quantity_Color, Quantity_TOC_RGB
 
+FRAME_INTERVAL_MS = 16  # ~60 Hz; ardışık çizim istekleri bu aralıkta birleştirilir
+GRID_MAX_VISIBLE_LINES = 100  # Ekranda aynı anda görünecek en fazla minor grid çizgisi
+GRID_UNIT_SCALE = {'mm': 1.0, 'cm': 10.0, 'm': 1000.0, 'in': 25.4, 'inch': 25.4}
+LOD_MIN_FACES = 200_000     # Bundan az üçgenli mesh katmanları için gösterim LOD'u kurulmaz
+LOD_MOTION_FACES = 150_000  # Kamera hareket ederken katman başına gösterilecek en fazla üçgen
+LOD_IDLE_MS = 200           # Son kamera hareketinden bu kadar sonra tam çözünürlüğe dönülür
 
 
 ## \fn create_progress_bar()
@@ -96,14 +103,194 @@ class OCCModelWidget(QWidget):
         self._current_trsf = gp_Trsf()  # Modelin mevcut transformasyonu
         self.models = []  # Tüm model referansları (AIS_Shape)
         self.model_trsfs = {}  # Her model için dönüşüm matrisi
+        self.mesh_arrays = {}  # Mesh'ten kurulan modeller için (vertices, faces)
+        self.instance_shapes = {}  # Örnek (AIS_ConnectedInteractive) -> paylaşılan konumsuz şekil
+        self.brep_sources = {}  # Model -> kesin B-rep'i kaynaktan okuyan fonksiyon (önbellekten açılan CAD modelleri)
+        # Büyük mesh katmanları için kaba gösterim seviyeleri: model -> [(üçgen sayısı, AIS_Shape)] (inceden kabaya)
+        self.display_lods = {}
+        self._lod_workers = []
+        self._lod_swapped = []  # Kamera hareketi sırasında yerine kaba seviye gösterilen (model, kaba) çiftleri
+        self._lod_idle_timer = QTimer(self)
+        self._lod_idle_timer.setSingleShot(True)
+        self._lod_idle_timer.setInterval(LOD_IDLE_MS)
+        self._lod_idle_timer.timeout.connect(self._end_camera_motion)
+        self.mesh_indices = {}  # Katman -> {'mesh', 'bvh', 'adjacency', 'world'}; ilk ölçümde kurulur
+        # Dönüşüm ve görünüm değişiklikleri ekranı hemen çizmez; kare başına en fazla bir kez çizilir
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(FRAME_INTERVAL_MS)
+        self._redraw_timer.timeout.connect(self._flush_redraw)
         # For measurement
         self.measurement_model_path = None
         self.measurement_model_ref = None
+        self.measurement_instances = []  # Montaj ölçümünde [(tanım mesh'inin yolu, örnek referansı)]
+        self._measurement_index_key = None  # Montajda ölçülen örneğin tanımı; örnekler indeksleri paylaşır
 
-    def set_active_model_for_measurement(self, model_path, model_ref):
-        """Sets the model to be used for the next measurement operation."""
+    def request_redraw(self):
+        """Görünümü kirli olarak işaretler; çizim bir sonraki karede tek seferde yapılır.
+        Aynı karede gelen tüm istekler (ör. çok modelli katman işlemleri) tek çizimde birleşir."""
+        if not self._redraw_timer.isActive():
+            self._redraw_timer.start()
+
+    def _flush_redraw(self):
+        self.display.Context.UpdateCurrentViewer()
+
+    def _schedule_display_lods(self, model_ref, vertices, faces):
+        """Büyük mesh katmanı için kaba gösterim seviyelerini arka planda kurdurur."""
+        from PyQt5.QtCore import QThreadPool
+        from model_loader import DisplayLODWorker
+        worker = DisplayLODWorker(model_ref, vertices, faces)
+        worker.signals.finished.connect(lambda ref, levels, w=worker: self._on_display_lods_ready(w, ref, levels))
+        self._lod_workers.append(worker)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_display_lods_ready(self, worker, model_ref, levels):
+        if worker in self._lod_workers:
+            self._lod_workers.remove(worker)
+        if model_ref not in self.models or not levels:
+            return  # Model bu arada kaldırıldı
+        lods = []
+        for face_count, shape in levels:
+            coarse = AIS_Shape(shape)
+            # Renk, saydamlık ve tel kafes ayarları tam çözünürlüklü modelle ortak tutulur
+            coarse.SetAttributes(model_ref.Attributes())
+            coarse.SetDisplayMode(1)
+            lods.append((face_count, coarse))
+        self.display_lods[model_ref] = lods
+
+    def _invalidate_display_lods(self, model_ref):
+        """Ortak görünüm ayarları değiştiğinde kaba seviyelerin sunumu bir sonraki gösterimde yeniden kurulur."""
+        for _, coarse in self.display_lods.get(model_ref, ()):
+            coarse.SetToUpdate()
+
+    @staticmethod
+    def _motion_lod(lods):
+        """Hareket bütçesine sığan en ince seviyeyi, hiçbiri sığmıyorsa en kabasını döndürür."""
+        for face_count, coarse in lods:
+            if face_count <= LOD_MOTION_FACES:
+                return coarse
+        return lods[-1][1]
+
+    def _begin_camera_motion(self):
+        """Kamera hareketi başlarken görünür büyük katmanları kaba seviyeleriyle değiştirir."""
+        self._lod_idle_timer.stop()
+        if self._lod_swapped or not self.display_lods:
+            return
+        context = self.display.Context
+        for model_ref, lods in self.display_lods.items():
+            if not context.IsDisplayed(model_ref):
+                continue
+            coarse = self._motion_lod(lods)
+            coarse.SetLocalTransformation(model_ref.LocalTransformation())
+            context.Erase(model_ref, False)
+            context.Display(coarse, False)
+            context.Deactivate(coarse)  # Kaba seviye seçilemez; seçim ve ölçüm tam modelde yapılır
+            self._lod_swapped.append((model_ref, coarse))
+
+    def _end_camera_motion(self):
+        """Kamera durduğunda tam çözünürlüklü katmanları geri getirir."""
+        if not self._lod_swapped:
+            return
+        context = self.display.Context
+        for model_ref, coarse in self._lod_swapped:
+            context.Erase(coarse, False)
+            if model_ref in self.models:
+                context.Display(model_ref, False)
+        self._lod_swapped = []
+        self.request_redraw()
+
+    def set_active_model_for_measurement(self, model_path, model_ref, instances=None):
+        """Sets the model to be used for the next measurement operation.
+        Montajlarda instances [(tanım mesh'inin yolu, örnek referansı)] listesidir; tıklanan örnek ölçülür."""
         self.measurement_model_path = model_path
         self.measurement_model_ref = model_ref
+        self.measurement_instances = list(instances or [])
+        self._measurement_index_key = None
+
+    def _measurement_key(self):
+        if self._measurement_index_key is not None:
+            return self._measurement_index_key
+        return self.measurement_model_ref if self.measurement_model_ref is not None else self.measurement_model_path
+
+    def _pick_measurement_target(self, projector, x, y):
+        """Ölçülecek mesh'i, güncel dönüşümünü ve pikselden geçen ışının çarptığı üçgeni döndürür.
+        Montajda ışın her örneğe kendi güncel dönüşümüyle atılır ve kameraya en yakın çarpan örnek
+        seçilir; hiçbiri çarpılmazsa merkezi ekranda tıklamaya en yakın örnek alınır. Aynı tanımın
+        örnekleri BVH ve komşuluk indekslerini paylaşır.
+        \return (depodaki mesh, gp_Trsf, _ray_pick sonucu)"""
+        from picking import trsf_to_matrix, transform_points
+        if not self.measurement_instances:
+            base_mesh = get_mesh_store().get(self.measurement_model_path)
+            trsf = gp_Trsf()
+            if self.measurement_model_ref and hasattr(self.measurement_model_ref, 'LocalTransformation'):
+                trsf = self.measurement_model_ref.LocalTransformation()
+            return base_mesh, trsf, self._ray_pick(base_mesh, trsf, projector, x, y)
+        origin, _ = projector.ray(x, y)
+        best, best_distance = None, float('inf')
+        centers = []
+        for mesh_path, model_ref in self.measurement_instances:
+            base_mesh = get_mesh_store().get(mesh_path)
+            trsf = model_ref.LocalTransformation()
+            self._measurement_index_key = mesh_path
+            hit = self._ray_pick(base_mesh, trsf, projector, x, y)
+            matrix = trsf_to_matrix(trsf)
+            centers.append(transform_points(base_mesh.bounds.mean(axis=0)[None, :], matrix)[0])
+            if hit is not None:
+                distance = np.linalg.norm(transform_points(hit[1][None, :], matrix)[0] - origin)
+                if distance < best_distance:
+                    best, best_distance = (mesh_path, base_mesh, trsf, hit), distance
+        if best is None:
+            closest, _ = projector.nearest(np.asarray(centers), x, y)
+            mesh_path, model_ref = self.measurement_instances[closest or 0]
+            best = (mesh_path, get_mesh_store().get(mesh_path), model_ref.LocalTransformation(), None)
+        mesh_path, base_mesh, trsf, hit = best
+        self._measurement_index_key = mesh_path
+        return base_mesh, trsf, hit
+
+    def _get_layer_entry(self, base_mesh):
+        """Ölçülen katmanın indeks kaydını döndürür; katmanın mesh'i değiştiyse kaydı sıfırlar."""
+        key = self._measurement_key()
+        entry = self.mesh_indices.get(key)
+        if entry is None or entry['mesh'] is not base_mesh:
+            entry = {'mesh': base_mesh}
+            self.mesh_indices[key] = entry
+        return entry
+
+    def _get_layer_index(self, base_mesh, kind):
+        """Ölçülen katmanın BVH ('bvh') veya komşuluk ('adjacency') indeksini döndürür.
+        İndeksler ilk ölçümde kurulur ve katmanın mesh'i değişene kadar saklanır."""
+        entry = self._get_layer_entry(base_mesh)
+        if kind not in entry:
+            from picking import MeshBVH
+            from mesh_adjacency import MeshAdjacency
+            if kind == 'bvh':
+                entry[kind] = MeshBVH(base_mesh.vertices, base_mesh.faces)
+            else:
+                entry[kind] = MeshAdjacency(base_mesh.faces, len(base_mesh.vertices))
+        return entry[kind]
+
+    def _get_world_mesh(self, base_mesh, trsf):
+        """Katmanın dönüşümü uygulanmış mesh'ini döndürür; dönüşüm değişmediyse önbellektekini kullanır."""
+        import trimesh
+        from picking import trsf_to_matrix, transform_points
+        matrix = trsf_to_matrix(trsf)
+        entry = self._get_layer_entry(base_mesh)
+        cached = entry.get('world')
+        if cached is not None and np.array_equal(cached[0], matrix):
+            return cached[1]
+        world_mesh = trimesh.Trimesh(vertices=transform_points(base_mesh.vertices, matrix),
+                                     faces=base_mesh.faces, process=False)
+        entry['world'] = (matrix, world_mesh)
+        return world_mesh
+
+    def _ray_pick(self, base_mesh, trsf, projector, x, y):
+        """Pikselden geçen ışının katmanda çarptığı ilk üçgeni bulur.
+        BVH yerel koordinatlardadır; katmanın dönüşümü ışına uygulanır.
+        \return (üçgen indeksi, yerel çarpma noktası) veya None"""
+        from picking import trsf_to_matrix
+        bvh = self._get_layer_index(base_mesh, 'bvh')
+        origin, direction = projector.ray(x, y)
+        return bvh.intersect(origin, direction, trsf_to_matrix(trsf))
 
     def resizeEvent(self, event):
         margin_x = 30
@@ -118,6 +305,19 @@ class OCCModelWidget(QWidget):
 
     def eventFilter(self, obj, event):
         from PyQt5.QtCore import QEvent
+        # Büyük katmanlar kamera hareket ederken kaba gösterim seviyesine geçer, durunca tam çözünürlüğe döner
+        if obj == self.canvas and self.display_lods:
+            if event.type() == QEvent.Wheel or \
+                    (event.type() == QEvent.MouseMove and event.buttons() != Qt.NoButton):
+                self._begin_camera_motion()
+                if event.type() == QEvent.Wheel:
+                    self._lod_idle_timer.start()
+            elif event.type() == QEvent.MouseButtonRelease and self._lod_swapped:
+                self._lod_idle_timer.start()
+        # Yakınlaştırma/kaydırma sonrası grid yoğunluğu kamera uzaklığına göre güncellenir
+        if obj == self.canvas and getattr(self, '_box_grid_lines', None) and \
+                event.type() in (QEvent.Wheel, QEvent.MouseButtonRelease):
+            QTimer.singleShot(0, self._adapt_grid_density)
         # Sadece ölçüm modunda mouse eventlerini override et
         if obj == self.canvas and self.measure_mode:
             if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
@@ -125,76 +325,42 @@ class OCCModelWidget(QWidget):
                 x, y = pos.x(), pos.y()
                 if self.measurement_model_path and os.path.exists(self.measurement_model_path):
                     try:
-                        mesh = trimesh.load(self.measurement_model_path, force='mesh')
-                        
-                        # Get transformation and apply it to vertices
-                        trsf = gp_Trsf()
-                        if self.measurement_model_ref and hasattr(self.measurement_model_ref, 'LocalTransformation'):
-                            trsf = self.measurement_model_ref.LocalTransformation()
-                        
-                        from OCC.Core.gp import gp_Pnt
-                        transformed_vertices = []
-                        for v_np in mesh.vertices:
-                            p = gp_Pnt(float(v_np[0]), float(v_np[1]), float(v_np[2]))
-                            p.Transform(trsf)
-                            transformed_vertices.append(np.array([p.X(), p.Y(), p.Z()]))
-                        
-                        # Use a new mesh with transformed vertices for all calculations
-                        mesh.vertices = np.array(transformed_vertices)
+                        import trimesh
+                        from picking import ScreenProjector, edge_midpoints, face_centroids, nearest_corner, nearest_face_edge
+                        from mesh_adjacency import triangle_areas
+                        # Kamera matrisleri tıklama başına bir kez okunur. Önce ışın BVH'ye atılır;
+                        # ışın modeli ıskalarsa (ör. siluetin hemen dışı) ekranda en yakın noktaya bakılır.
+                        # Katmanın mesh'i depodan alınır (her tıklamada dosya tekrar okunmaz) ve
+                        # modelin güncel dönüşümü uygulanır
+                        projector = ScreenProjector(self.display.View, self.canvas.width(), self.canvas.height())
+                        base_mesh, trsf, hit = self._pick_measurement_target(projector, x, y)
 
+                        # Dönüşüm uygulanmış mesh katmanla birlikte saklanır; sadece dönüşüm
+                        # değiştiğinde tek bir matris çarpımıyla yeniden hesaplanır
+                        # (paylaşılan depo nesnesi değiştirilmez)
+                        mesh = self._get_world_mesh(base_mesh, trsf)
+                        local_vertices = np.asarray(base_mesh.vertices)
                         # Kenar Ölçüm
                         if hasattr(self, 'active_measure') and self.active_measure == 'edge':
-                            min_dist = float('inf')
-                            closest_v = None
-                            for v in mesh.vertices:
-                                if hasattr(self.display, 'View') and hasattr(self.display.View, 'Project'):
-                                    projected = self.display.View.Project(v[0], v[1], v[2])
-                                    px, py = projected[:2]
-                                    dist = (px - x) ** 2 + (py - y) ** 2
-                                    if dist < min_dist:
-                                        min_dist = dist
-                                        closest_v = v
-                                else:
-                                    closest_v = mesh.vertices[0]
-                                    break
-                            if closest_v is None:
-                                QMessageBox.warning(self, "Hata", "Yakın vertex bulunamadı.")
+                            if hit is not None:
+                                hit_face, hit_point = hit
+                                # trimesh kenar sırası: her yüz için (0,1), (1,2), (2,0)
+                                best_edge_idx = hit_face * 3 + nearest_face_edge(local_vertices, mesh.faces[hit_face], hit_point)
+                            else:
+                                best_edge_idx, _ = projector.nearest(edge_midpoints(mesh.vertices, mesh.edges), x, y)
+                            if best_edge_idx is None:
+                                QMessageBox.warning(self, "Hata", "Yakın kenar bulunamadı.")
                                 return True
-                            min_edge_dist = float('inf')
-                            best_edge = None
-                            best_edge_idx = None
-                            for idx, edge in enumerate(mesh.edges):
-                                v1 = mesh.vertices[edge[0]]
-                                v2 = mesh.vertices[edge[1]]
-                                mid = (v1 + v2) / 2
-                                if hasattr(self.display, 'View') and hasattr(self.display.View, 'Project'):
-                                    projected = self.display.View.Project(mid[0], mid[1], mid[2])
-                                    px, py = projected[:2]
-                                    dist = (px - x) ** 2 + (py - y) ** 2
-                                    if dist < min_edge_dist:
-                                        min_edge_dist = dist
-                                        best_edge = (v1, v2)
-                                        best_edge_idx = idx
-                                else:
-                                    best_edge = (v1, v2)
-                                    best_edge_idx = idx
-                                    break
+                            best_edge = (mesh.vertices[mesh.edges[best_edge_idx][0]], mesh.vertices[mesh.edges[best_edge_idx][1]])
                             if best_edge is not None:
                                 v1, v2 = best_edge
                                 uzunluk = np.linalg.norm(v1 - v2)
                                 midpoint = (v1 + v2) / 2
                                 direction = v2 - v1
-                                alanlar = []
-                                if hasattr(mesh, 'faces'):
-                                    for face in mesh.faces:
-                                        if mesh.edges[best_edge_idx][0] in face and mesh.edges[best_edge_idx][1] in face:
-                                            tri = mesh.vertices[face]
-                                            a = np.linalg.norm(tri[0] - tri[1])
-                                            b = np.linalg.norm(tri[1] - tri[2])
-                                            c = np.linalg.norm(tri[2] - tri[0])
-                                            s = (a + b + c) / 2
-                                            area = max(s * (s - a) * (s - b) * (s - c), 0)
-                                            alanlar.append(np.sqrt(area))
+                                # Kenara ait üçgenler komşuluk indeksinden okunur
+                                adjacency = self._get_layer_index(base_mesh, 'adjacency')
+                                edge_faces = adjacency.edge_faces[adjacency.edge_from_face_edge(best_edge_idx)]
+                                alanlar = list(triangle_areas(mesh.vertices, mesh.faces[edge_faces]))
                                 info = {
                                     'Uzunluk': uzunluk,
                                     'Başlangıç Noktası': f"({v1[0]:.2f}, {v1[1]:.2f}, {v1[2]:.2f})",
@@ -213,42 +379,21 @@ class OCCModelWidget(QWidget):
                                 return True
                         # Vertex Ölçüm
                         if hasattr(self, 'active_measure') and self.active_measure == 'vertex':
-                            min_dist = float('inf')
-                            closest_idx = None
-                            for idx, v in enumerate(mesh.vertices):
-                                if hasattr(self.display, 'View') and hasattr(self.display.View, 'Project'):
-                                    projected = self.display.View.Project(v[0], v[1], v[2])
-                                    px, py = projected[:2]
-                                    dist = (px - x) ** 2 + (py - y) ** 2
-                                    if dist < min_dist:
-                                        min_dist = dist
-                                        closest_idx = idx
-                                else:
-                                    closest_idx = 0
-                                    break
+                            if hit is not None:
+                                closest_idx = nearest_corner(local_vertices, mesh.faces[hit[0]], hit[1])
+                            else:
+                                closest_idx, _ = projector.nearest(mesh.vertices, x, y)
                             if closest_idx is None:
                                 QMessageBox.warning(self, "Hata", "Yakın vertex bulunamadı.")
                                 return True
                             v = mesh.vertices[closest_idx]
-                            edge_lengths = []
-                            valency = 0
-                            for edge in mesh.edges:
-                                if closest_idx in edge:
-                                    v1 = mesh.vertices[edge[0]]
-                                    v2 = mesh.vertices[edge[1]]
-                                    edge_lengths.append(np.linalg.norm(v1 - v2))
-                                    valency += 1
-                            face_areas = []
-                            if hasattr(mesh, 'faces'):
-                                for fidx, face in enumerate(mesh.faces):
-                                    if closest_idx in face:
-                                        tri = mesh.vertices[face]
-                                        a = np.linalg.norm(tri[0] - tri[1])
-                                        b = np.linalg.norm(tri[1] - tri[2])
-                                        c = np.linalg.norm(tri[2] - tri[0])
-                                        s = (a + b + c) / 2
-                                        area = max(s * (s - a) * (s - b) * (s - c), 0)
-                                        face_areas.append((fidx, np.sqrt(area)))
+                            # Bağlı kenar ve yüzler komşuluk indeksinden, derece kadar işle bulunur
+                            adjacency = self._get_layer_index(base_mesh, 'adjacency')
+                            bagli_kenarlar = adjacency.unique_edges[adjacency.vertex_edges[closest_idx]]
+                            edge_lengths = list(np.linalg.norm(mesh.vertices[bagli_kenarlar[:, 0]] - mesh.vertices[bagli_kenarlar[:, 1]], axis=1))
+                            valency = len(bagli_kenarlar)
+                            bagli_yuzler = adjacency.vertex_faces[closest_idx]
+                            face_areas = list(zip(bagli_yuzler.tolist(), triangle_areas(mesh.vertices, mesh.faces[bagli_yuzler])))
                             info = {
                                 'Koordinatlar': f"({v[0]:.2f}, {v[1]:.2f}, {v[2]:.2f})",
                                 'Vertex İndeksi': closest_idx,
@@ -264,21 +409,10 @@ class OCCModelWidget(QWidget):
                             return True
                         # Alan (Face) Ölçüm
                         if hasattr(self, 'active_measure') and self.active_measure == 'face':
-                            min_dist = float('inf')
-                            closest_face_idx = None
-                            for fidx, face in enumerate(mesh.faces):
-                                tri = mesh.vertices[face]
-                                centroid = np.mean(tri, axis=0)
-                                if hasattr(self.display, 'View') and hasattr(self.display.View, 'Project'):
-                                    projected = self.display.View.Project(centroid[0], centroid[1], centroid[2])
-                                    px, py = projected[:2]
-                                    dist = (px - x) ** 2 + (py - y) ** 2
-                                    if dist < min_dist:
-                                        min_dist = dist
-                                        closest_face_idx = fidx
-                                else:
-                                    closest_face_idx = 0
-                                    break
+                            if hit is not None:
+                                closest_face_idx = hit[0]
+                            else:
+                                closest_face_idx, _ = projector.nearest(face_centroids(mesh.vertices, mesh.faces), x, y)
                             if closest_face_idx is None:
                                 QMessageBox.warning(self, "Hata", "Yakın yüzey bulunamadı.")
                                 return True
@@ -314,13 +448,8 @@ class OCCModelWidget(QWidget):
                             max_edge = max(edge_lengths)
                             avg_edge = sum(edge_lengths) / len(edge_lengths)
                             aspect_ratio = max_edge / min_edge if min_edge > 0 else 0
-                            komsu_faces = []
-                            for fidx2, face2 in enumerate(mesh.faces):
-                                if fidx2 == closest_face_idx:
-                                    continue
-                                ortak = set(face) & set(face2)
-                                if len(ortak) >= 2:
-                                    komsu_faces.append(fidx2)
+                            # Kenar paylaşan komşu yüzler
+                            komsu_faces = self._get_layer_index(base_mesh, 'adjacency').face_faces[closest_face_idx].tolist()
                             info = {
                                 'Alan': area,
                                 'Çevre': cevre,
@@ -343,35 +472,15 @@ class OCCModelWidget(QWidget):
                             return True
                         # --- 2 Nokta Mesafe Ölçüm ---
                         if hasattr(self, 'active_measure') and self.active_measure == 'two_point':
-                            min_dist = float('inf')
-                            closest_idx = None
-                            transformed_vertices = []
-                            # Modelin dönüşümünü uygula
-                            trsf = None
-                            if hasattr(self, 'model_ais') and hasattr(self.model_ais, 'LocalTransformation'):
-                                trsf = self.model_ais.LocalTransformation()
-                            for idx, v in enumerate(mesh.vertices):
-                                v_occ = v
-                                if trsf is not None:
-                                    from OCC.Core.gp import gp_Pnt
-                                    p = gp_Pnt(float(v[0]), float(v[1]), float(v[2]))
-                                    p.Transform(trsf)
-                                    v_occ = np.array([p.X(), p.Y(), p.Z()])
-                                transformed_vertices.append(v_occ)
-                                if hasattr(self.display, 'View') and hasattr(self.display.View, 'Project'):
-                                    projected = self.display.View.Project(v_occ[0], v_occ[1], v_occ[2])
-                                    px, py = projected[:2]
-                                    dist = (px - x) ** 2 + (py - y) ** 2
-                                    if dist < min_dist:
-                                        min_dist = dist
-                                        closest_idx = idx
-                                else:
-                                    closest_idx = 0
-                                    break
+                            # mesh.vertices katmanın dönüşümü uygulanmış koordinatlardır
+                            if hit is not None:
+                                closest_idx = nearest_corner(local_vertices, mesh.faces[hit[0]], hit[1])
+                            else:
+                                closest_idx, _ = projector.nearest(mesh.vertices, x, y)
                             if closest_idx is None:
                                 QMessageBox.warning(self, "Hata", "Yakın vertex bulunamadı.")
                                 return True
-                            v = transformed_vertices[closest_idx]
+                            v = mesh.vertices[closest_idx]
                             # İlk seçimde önceki seçimi ve küreleri temizle
                             if not hasattr(self, 'selected_points') or len(self.selected_points) == 0:
                                 if hasattr(self, '_temp_spheres'):
@@ -427,85 +536,94 @@ class OCCModelWidget(QWidget):
         return super().eventFilter(obj, event)
 
     def show_box_grid(self, size=100, major_step=10, minor_step=1):
-        """Blender tarzı XY düzleminde grid çizer. Major/minor çizgiler ve renkli eksenler."""
-        from OCC.Core.gp import gp_Pnt, gp_Dir, gp_Lin
-        from OCC.Core.AIS import AIS_Line
-        from OCC.Core.Quantity import Quantity_Color, Quantity_TOC_RGB
-        from OCC.Core.Geom import Geom_Line
+        """Blender tarzı XY düzleminde grid çizer. Major/minor çizgiler ve renkli eksenler.
+        Her grup (minor, major, X ekseni, Y ekseni) tek bir kenar bileşiği (compound) olarak
+        çizilir ve seçime kapalıdır; çizgi yoğunluğu kamera uzaklığına göre ayarlanır."""
         if hasattr(self, '_box_grid_lines') and self._box_grid_lines:
             return  # Zaten çiziliyse tekrar çizme
-        self._box_grid_lines = []
-        # Minor grid (ince gri)
-        minor_color = Quantity_Color(0.4, 0.4, 0.4, Quantity_TOC_RGB)
-        for i in range(0, size+1, minor_step):
-            # Y ekseni boyunca (X sabit)
-            p1 = gp_Pnt(i, 0, 0)
-            p2 = gp_Pnt(i, size, 0)
-            direction = gp_Dir(p2.X() - p1.X(), p2.Y() - p1.Y(), p2.Z() - p1.Z())
-            geom_line = Geom_Line(gp_Lin(p1, direction))
-            line = AIS_Line(geom_line)
-            line.SetColor(minor_color)
-            line.SetWidth(1)
-            self.display.Context.Display(line, False)
-            self._box_grid_lines.append(line)
-            # X ekseni boyunca (Y sabit)
-            p3 = gp_Pnt(0, i, 0)
-            p4 = gp_Pnt(size, i, 0)
-            direction2 = gp_Dir(p4.X() - p3.X(), p4.Y() - p3.Y(), p4.Z() - p3.Z())
-            geom_line2 = Geom_Line(gp_Lin(p3, direction2))
-            line2 = AIS_Line(geom_line2)
-            line2.SetColor(minor_color)
-            line2.SetWidth(1)
-            self.display.Context.Display(line2, False)
-            self._box_grid_lines.append(line2)
-        # Major grid (kalın açık gri)
-        major_color = Quantity_Color(0.7, 0.7, 0.7, Quantity_TOC_RGB)
-        for i in range(0, size+1, major_step):
-            # Y ekseni boyunca (X sabit)
-            p1 = gp_Pnt(i, 0, 0)
-            p2 = gp_Pnt(i, size, 0)
-            direction = gp_Dir(p2.X() - p1.X(), p2.Y() - p1.Y(), p2.Z() - p1.Z())
-            geom_line = Geom_Line(gp_Lin(p1, direction))
-            line = AIS_Line(geom_line)
-            line.SetColor(major_color)
-            line.SetWidth(2)
-            self.display.Context.Display(line, False)
-            self._box_grid_lines.append(line)
-            # X ekseni boyunca (Y sabit)
-            p3 = gp_Pnt(0, i, 0)
-            p4 = gp_Pnt(size, i, 0)
-            direction2 = gp_Dir(p4.X() - p3.X(), p4.Y() - p3.Y(), p4.Z() - p3.Z())
-            geom_line2 = Geom_Line(gp_Lin(p3, direction2))
-            line2 = AIS_Line(geom_line2)
-            line2.SetColor(major_color)
-            line2.SetWidth(2)
-            self.display.Context.Display(line2, False)
-            self._box_grid_lines.append(line2)
-        # X ekseni (yeşil)
-        x_color = Quantity_Color(0.0, 1.0, 0.0, Quantity_TOC_RGB)
-        p1 = gp_Pnt(0, size//2, 0)
-        p2 = gp_Pnt(size, size//2, 0)
-        direction = gp_Dir(p2.X() - p1.X(), p2.Y() - p1.Y(), p2.Z() - p1.Z())
-        geom_line = Geom_Line(gp_Lin(p1, direction))
-        x_axis = AIS_Line(geom_line)
-        x_axis.SetColor(x_color)
-        x_axis.SetWidth(3)
-        self.display.Context.Display(x_axis, False)
-        self._box_grid_lines.append(x_axis)
-        # Y ekseni (kırmızı)
-        y_color = Quantity_Color(1.0, 0.0, 0.0, Quantity_TOC_RGB)
-        p3 = gp_Pnt(size//2, 0, 0)
-        p4 = gp_Pnt(size//2, size, 0)
-        direction2 = gp_Dir(p4.X() - p3.X(), p4.Y() - p3.Y(), p4.Z() - p3.Z())
-        geom_line2 = Geom_Line(gp_Lin(p3, direction2))
-        y_axis = AIS_Line(geom_line2)
-        y_axis.SetColor(y_color)
-        y_axis.SetWidth(3)
-        self.display.Context.Display(y_axis, False)
-        self._box_grid_lines.append(y_axis)
+        self._grid_size = size
+        # update_grid ile ayarlanmış aralık varsa korunur; yoksa varsayılan minor aralık kullanılır
+        if getattr(self, '_grid_spacing', None) is None:
+            self._grid_spacing = minor_step
+        self._grid_major_ratio = max(1, int(round(major_step / minor_step)))
+        self._build_box_grid(self._grid_density_level())
         # Model gridin üstünde kalsın
         self.center_model_on_grid(size)
 
+    def _grid_density_level(self):
+        """Görünen alana göre minor aralığın kaç kez 10 ile çarpılacağını hesaplar."""
+        try:
+            width, height = self.display.View.Size()
+        except Exception:
+            return 0
+        visible_lines = max(width, height) / self._grid_spacing
+        if visible_lines <= GRID_MAX_VISIBLE_LINES:
+            return 0
+        return int(np.ceil(np.log10(visible_lines / GRID_MAX_VISIBLE_LINES)))
+
+    def _build_box_grid(self, level):
+        from OCC.Core.gp import gp_Pnt
+        from OCC.Core.BRep import BRep_Builder
+        from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeEdge
+        from OCC.Core.TopoDS import TopoDS_Compound
+        from OCC.Core.Quantity import Quantity_Color, Quantity_TOC_RGB
+
+        size = self._grid_size
+        step = self._grid_spacing * 10 ** level
+        ratio = self._grid_major_ratio
+        positions = np.arange(0.0, size + step * 1e-6, step)
+        # Major çizgiler dünya koordinatında sabittir: seviye 0'daki major aralığın katları
+        major_step = self._grid_spacing * ratio
+        multiples = positions / major_step
+        is_major = np.isclose(multiples, np.round(multiples), rtol=0.0, atol=1e-6)
+
+        def segments_compound(segments):
+            builder = BRep_Builder()
+            compound = TopoDS_Compound()
+            builder.MakeCompound(compound)
+            for (x1, y1), (x2, y2) in segments:
+                builder.Add(compound, BRepBuilderAPI_MakeEdge(gp_Pnt(x1, y1, 0), gp_Pnt(x2, y2, 0)).Edge())
+            return compound
+
+        def grid_segments(values):
+            # Her konum için Y boyunca (X sabit) ve X boyunca (Y sabit) bir çizgi
+            return [segment for v in values for segment in (((v, 0), (v, size)), ((0, v), (size, v)))]
+
+        half = size / 2
+        groups = [
+            (grid_segments(positions[~is_major]), (0.4, 0.4, 0.4), 1),  # Minor grid (ince gri)
+            (grid_segments(positions[is_major]), (0.7, 0.7, 0.7), 2),   # Major grid (kalın açık gri)
+            ([((0, half), (size, half))], (0.0, 1.0, 0.0), 3),          # X ekseni (yeşil)
+            ([((half, 0), (half, size))], (1.0, 0.0, 0.0), 3),          # Y ekseni (kırmızı)
+        ]
+        self._box_grid_lines = []
+        for segments, (r, g, b), width in groups:
+            if not segments:
+                continue
+            grid_ais = AIS_Shape(segments_compound(segments))
+            grid_ais.SetColor(Quantity_Color(r, g, b, Quantity_TOC_RGB))
+            grid_ais.SetWidth(width)
+            self.display.Context.Display(grid_ais, False)
+            # Grid seçilemez; ölçüm ve seçim sırasında hesaba katılmaz
+            self.display.Context.Deactivate(grid_ais)
+            self._box_grid_lines.append(grid_ais)
+        self._grid_level = level
+        self.display.Context.UpdateCurrentViewer()
+
+    def _remove_box_grid(self):
+        for line in getattr(self, '_box_grid_lines', []):
+            self.display.Context.Remove(line, False)
+        self._box_grid_lines = []
+
+    def _adapt_grid_density(self):
+        """Kamera yakınlaştığında/uzaklaştığında grid yoğunluğu değiştiyse grid'i yeniden kurar."""
+        if not getattr(self, '_box_grid_lines', None):
+            return
+        level = self._grid_density_level()
+        if level != self._grid_level:
+            self._remove_box_grid()
+            self._build_box_grid(level)
+
     def center_model_on_grid(self, grid_size):
         """Modelin alt yüzeyini gridin üstüne (y=0) hizalar ve ortalar."""
         if not hasattr(self, 'model_refs') or not self.model_refs:
@@ -534,9 +652,7 @@ class OCCModelWidget(QWidget):
     def hide_box_grid(self):
         """Çizilmiş kutu grid çizgilerini sahneden kaldırır."""
         if hasattr(self, '_box_grid_lines'):
-            for line in self._box_grid_lines:
-                self.display.Context.Remove(line, True)
-            self._box_grid_lines = []
+            self._remove_box_grid()
             self.display.Context.UpdateCurrentViewer()
             self.display.Repaint()
 
@@ -545,6 +661,7 @@ class OCCModelWidget(QWidget):
     #  \param stl_path STL dosya yolu (str)
     #  \param model_path Orijinal model dosya yolu (str, opsiyonel)
     def yukle_ve_goster(self, stl_path, model_path=None):
+        from OCC.Extend.DataExchange import read_stl_file
         shape = read_stl_file(stl_path)
         self.display.EraseAll()
         # Modeli AIS_Shape olarak sakla (liste dönebilir!)
@@ -571,7 +688,7 @@ class OCCModelWidget(QWidget):
             info['Dosya Adı'] = os.path.basename(path_to_check)
             info['Dosya Yolu'] = path_to_check
             try:
-                mesh = trimesh.load(path_to_check, force='mesh')
+                mesh = get_mesh_store().get(path_to_check)
                 info['Vertex Sayısı'] = len(mesh.vertices)
                 info['Yüzey (Face) Sayısı'] = len(mesh.faces)
                 # Bounding box bilgisini daha okunabilir bir formatta ekle
@@ -587,8 +704,14 @@ class OCCModelWidget(QWidget):
             info['Bilgi'] = 'Geçerli bir model seçilmedi veya dosya bulunamadı.'
         return info
 
-    def add_model(self, stl_path, model_path=None):
-        shape = read_stl_file(stl_path)
+    ## \fn add_shape(self, shape, model_path=None, mesh=None)
+    #  \brief Önceden okunmuş (ve tessellate edilmiş) bir TopoDS_Shape'i sahneye ekler.
+    #         Arka plan yükleyicisinin ana iş parçacığında çalışan tek adımıdır.
+    #  \param shape Gösterilecek TopoDS_Shape
+    #  \param model_path Orijinal model dosya yolu (str, opsiyonel)
+    #  \param mesh Şekil bir mesh'ten kurulduysa (vertices, faces) dizileri (opsiyonel)
+    #  \return Eklenen AIS_Shape referansı
+    def add_shape(self, shape, model_path=None, mesh=None, brep_source=None):
         # Modeli AIS_Shape olarak ekle (liste dönebilir!)
         result = self.display.DisplayShape(shape, update=True)
         if isinstance(result, list):
@@ -597,43 +720,99 @@ class OCCModelWidget(QWidget):
             model_ref = result
         self.models.append(model_ref)
         self.model_trsfs[model_ref] = gp_Trsf()  # Yeni model için sıfır dönüşüm
+        if brep_source is not None:
+            self.brep_sources[model_ref] = brep_source
+        if mesh is not None:
+            self.mesh_arrays[model_ref] = mesh
+            if len(mesh[1]) >= LOD_MIN_FACES:
+                self._schedule_display_lods(model_ref, *mesh)
         self.display.Repaint()
         if model_path:
             self.model_path = model_path
         return model_ref
 
+    ## \fn add_shape_instances(self, shape, trsfs, mesh=None, colors=None, brep_source=None)
+    #  \brief Aynı şeklin birden çok kopyasını, tek bir sunumu paylaşan AIS_ConnectedInteractive
+    #         referansları olarak ekler. Üçgenleme ve grafik veri bir kez oluşturulur; her örnek sadece
+    #         kendi dönüşümünü taşır.
+    #  \param shape Konumsuz (tanım koordinatlarındaki) TopoDS_Shape
+    #  \param trsfs Her örnek için gp_Trsf
+    #  \param mesh Şekil bir mesh'ten kurulduysa tanım koordinatlarındaki (vertices, faces) (opsiyonel)
+    #  \param brep_source Şekil sadece üçgenleme taşıyorsa tanımın kesin B-rep'ini döndüren fonksiyon (opsiyonel)
+    #  \param colors Her örneğin rengi (QColor veya None, opsiyonel). Paylaşılan sunum ilk örneğin
+    #         rengini alır; farklı renkteki örneklere renk kendi referansları üzerinden verilir
+    #  \return Eklenen örnek referansları (trsfs ile aynı sırada)
+    def add_shape_instances(self, shape, trsfs, mesh=None, colors=None, brep_source=None):
+        from OCC.Core.AIS import AIS_Shape, AIS_ConnectedInteractive
+        colors = list(colors) if colors is not None else [None] * len(trsfs)
+        prototype = AIS_Shape(shape)
+        if colors and colors[0] is not None:
+            self.set_model_color(prototype, colors[0])
+        model_refs = []
+        for trsf, color in zip(trsfs, colors):
+            model_ref = AIS_ConnectedInteractive()
+            model_ref.Connect(prototype)
+            model_ref.SetLocalTransformation(trsf)
+            if color is not None and color != colors[0]:
+                self.set_model_color(model_ref, color)
+            self.display.Context.Display(model_ref, False)
+            self.models.append(model_ref)
+            self.model_trsfs[model_ref] = trsf
+            self.instance_shapes[model_ref] = shape
+            if mesh is not None:
+                self.mesh_arrays[model_ref] = mesh
+            if brep_source is not None:
+                self.brep_sources[model_ref] = brep_source
+            model_refs.append(model_ref)
+        self.request_redraw()
+        return model_refs
+
+    def add_loaded_model(self, result):
+        """model_loader.parse_model_file sonucunu sahneye ekler."""
+        mesh = (result["vertices"], result["faces"]) if result.get("kind") == 'mesh' else None
+        return self.add_shape(result["shape"], model_path=result["file_path"], mesh=mesh,
+                              brep_source=result.get("brep_source"))
+
+    def add_model(self, mesh_path, model_path=None):
+        # Mesh dosyası (STL/OBJ) doğrudan bellekte üçgenlemeye çevrilir; okunan mesh
+        # katman bilgisi ve ölçümler için depoda paylaşılır
+        mesh = get_mesh_store().get(mesh_path)
+        vertices, faces = np.asarray(mesh.vertices), np.asarray(mesh.faces)
+        shape = read_stl_shape(mesh_path) if mesh_path.lower().endswith('.stl') else mesh_to_shape(vertices, faces)
+        return self.add_shape(shape, model_path=model_path, mesh=(vertices, faces))
+
     def add_step_iges_model(self, file_path):
         """STEP veya IGES dosyasını okur ve sahneye ekler."""
-        from OCC.Extend.DataExchange import read_step_file, read_iges_file
-        shape = None
+        from model_loader import parse_model_file
         try:
-            if file_path.lower().endswith(('.step', '.stp')):
-                shape = read_step_file(file_path)
-            elif file_path.lower().endswith(('.iges', '.igs')):
-                shape = read_iges_file(file_path)
+            result = parse_model_file(file_path)
         except Exception as e:
             print(f"Hata: {file_path} dosyası okunamadı. {e}")
             return None
 
-        if shape is None:
-            return None
-
-        model_ref = self.display.DisplayShape(shape, update=True)
-        if isinstance(model_ref, list):
-            model_ref = model_ref[0]
+        return self.add_loaded_model(result) # Ana model yolunu da günceller
 
-        self.models.append(model_ref)
-        self.model_trsfs[model_ref] = gp_Trsf()
-        self.model_path = file_path # Ana model yolunu güncelle
-        self.display.Repaint()
-        return model_ref
+    def remove_model(self, model_ref):
+        """Modeli sahneden ve modele ait tüm önbelleklerden kaldırır."""
+        self.display.Context.Remove(model_ref, False)
+        self.request_redraw()
+        if model_ref in self.models:
+            self.models.remove(model_ref)
+        self.model_trsfs.pop(model_ref, None)
+        self.mesh_arrays.pop(model_ref, None)
+        self.mesh_indices.pop(model_ref, None)
+        self.instance_shapes.pop(model_ref, None)
+        self.brep_sources.pop(model_ref, None)
+        for _, coarse in self.display_lods.pop(model_ref, ()):
+            self.display.Context.Remove(coarse, False)
+        self._lod_swapped = [(ref, coarse) for ref, coarse in self._lod_swapped if ref is not model_ref]
 
     def set_model_visible(self, model_ref, visible):
         if visible:
-            self.display.Context.Display(model_ref, True)
+            self.display.Context.Display(model_ref, False)
         else:
-            self.display.Context.Erase(model_ref, True)
-        self.display.Repaint()
+            self.display.Context.Erase(model_ref, False)
+        self.request_redraw()
 
     def set_model_color(self, model_ref, color):
         # color: QColor nesnesi
@@ -645,16 +824,16 @@ class OCCModelWidget(QWidget):
             model_ref.SetColor(qcolor)
         elif hasattr(model_ref, 'Attributes'):
             model_ref.Attributes().SetColor(qcolor)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self._invalidate_display_lods(model_ref)
+        self.request_redraw()
 
     def set_model_transparency(self, model_ref, transparency):
         if hasattr(model_ref, 'SetTransparency'):
             model_ref.SetTransparency(transparency)
         elif hasattr(model_ref, 'Attributes'):
             model_ref.Attributes().SetTransparency(transparency)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self._invalidate_display_lods(model_ref)
+        self.request_redraw()
 
     def set_measure_mode(self, enabled=True):
         self.measure_mode = enabled
@@ -684,8 +863,7 @@ class OCCModelWidget(QWidget):
             current_trsf = model_ref.LocalTransformation()
             trsf.Multiply(current_trsf)
         model_ref.SetLocalTransformation(trsf)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self.request_redraw()
 
     def rotate_model_x(self, model_ref, angle_deg=15):
         """Modeli kendi merkezi etrafında X ekseninde angle_deg kadar döndür."""
@@ -700,8 +878,7 @@ class OCCModelWidget(QWidget):
             current_trsf = model_ref.LocalTransformation()
             trsf.Multiply(current_trsf)
         model_ref.SetLocalTransformation(trsf)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self.request_redraw()
 
     def rotate_model_y(self, model_ref, angle_deg=15):
         """Modeli kendi merkezi etrafında Y ekseninde angle_deg kadar döndür."""
@@ -716,8 +893,7 @@ class OCCModelWidget(QWidget):
             current_trsf = model_ref.LocalTransformation()
             trsf.Multiply(current_trsf)
         model_ref.SetLocalTransformation(trsf)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self.request_redraw()
 
     def rotate_model_z(self, model_ref, angle_deg=15):
         """Modeli kendi merkezi etrafında Z ekseninde angle_deg kadar döndür."""
@@ -732,8 +908,7 @@ class OCCModelWidget(QWidget):
             current_trsf = model_ref.LocalTransformation()
             trsf.Multiply(current_trsf)
         model_ref.SetLocalTransformation(trsf)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self.request_redraw()
 
     def move_model(self, model_ref, dx=0, dy=0, dz=0):
         from OCC.Core.gp import gp_Trsf, gp_Vec
@@ -751,8 +926,7 @@ class OCCModelWidget(QWidget):
         current_trsf.Multiply(move_trsf)
         model_ref.SetLocalTransformation(current_trsf)
         self.model_trsfs[model_ref] = current_trsf
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self.request_redraw()
 
     def apply_scale_to_model(self, model_ref, factor):
         from OCC.Core.gp import gp_Trsf, gp_Pnt
@@ -766,14 +940,21 @@ class OCCModelWidget(QWidget):
             current_trsf = model_ref.LocalTransformation()
             trsf.Multiply(current_trsf)
         model_ref.SetLocalTransformation(trsf)
-        self.display.Context.UpdateCurrentViewer()
-        self.display.Repaint()
+        self.request_redraw()
 
     def update_grid(self, spacing, unit):
-        # Eğer manuel grid çizimi varsa burada güncelle
-        # (Örneğin: grid çizgilerini silip yeni spacing ve birime göre tekrar çiz)
-        # Eğer OCC'nin GraduatedTrihedron'u kullanılıyorsa, bu fonksiyon placeholder olarak kalabilir
-        print(f"Grid güncellendi: aralık={spacing}, birim={unit}")
+        """Grid'in minor çizgi aralığını verilen birimde ayarlar ve grid görünüyorsa yeniden kurar.
+        :param spacing: Minor çizgi aralığı
+        :param unit: 'mm', 'cm', 'm' veya 'in' (model birimi mm kabul edilir)
+        """
+        scale = GRID_UNIT_SCALE.get(str(unit).lower())
+        if scale is None or spacing <= 0:
+            logging.warning(f"Geçersiz grid aralığı veya birimi, grid değiştirilmedi: {spacing} {unit}")
+            return
+        self._grid_spacing = spacing * scale
+        if getattr(self, '_box_grid_lines', None):
+            self._remove_box_grid()
+            self._build_box_grid(self._grid_density_level())
 
     def set_selection_mode(self, mode):
         # mode: 1=vertex, 2=edge, 4=face
@@ -791,9 +972,25 @@ class OCCModelWidget(QWidget):
         if not self.models:
             return
         for model_ref in self.models:
-            self.display.Context.SetDisplayMode(model_ref, display_mode, False)
+            if model_ref in self.mesh_arrays:
+                # Sadece üçgenleme taşıyan yüzlerin kenarı yoktur; tel kafes görünümü
+                # gölgeli modda üçgen kenarları çizilip iç dolgu kapatılarak elde edilir
+                self._set_mesh_wireframe(model_ref, mode != 'shaded')
+                self.display.Context.SetDisplayMode(model_ref, 1, False)
+            else:
+                self.display.Context.SetDisplayMode(model_ref, display_mode, False)
         self.display.Context.UpdateCurrentViewer()
 
+    def _set_mesh_wireframe(self, model_ref, enabled):
+        from OCC.Core.Aspect import Aspect_IS_EMPTY, Aspect_IS_SOLID
+        drawer = model_ref.Attributes()
+        drawer.SetupOwnShadingAspect()
+        aspect = drawer.ShadingAspect().Aspect()
+        aspect.SetDrawEdges(enabled)
+        aspect.SetInteriorStyle(Aspect_IS_EMPTY if enabled else Aspect_IS_SOLID)
+        self.display.Context.Redisplay(model_ref, False)
+        self._invalidate_display_lods(model_ref)
+
     def set_sky_background(self):
         try:
             from OCC.Core.Quantity import Quantity_Color, Quantity_TOC_RGB
@@ -806,10 +1003,41 @@ class OCCModelWidget(QWidget):
         """
         Retrieves the underlying TopoDS_Shape from an AIS_Shape reference.
         """
+        if model_ref in self.instance_shapes:
+            # Örnekler paylaşılan şekli dönüşümle gösterir; şekil örneğin güncel konumuna taşınır
+            # (yükleme konumu kullanıcı taşıdıysa/döndürdüyse o dönüşümle birleşmiş haldedir)
+            from OCC.Core.TopLoc import TopLoc_Location
+            return self.instance_shapes[model_ref].Moved(TopLoc_Location(model_ref.LocalTransformation()))
         if model_ref is not None and hasattr(model_ref, 'Shape'):
             return model_ref.Shape()
         return None
 
+    def get_brep_shape_from_ref(self, model_ref):
+        """Boolean işlemlerinde (ör. kesit) kullanılabilecek bir şekil döndürür.
+        Mesh modellerinin görüntü şekli sadece üçgenleme taşıdığından B-rep kabuğu burada kurulur;
+        tessellation önbelleğinden açılan CAD modellerinde (ve montaj parçalarında) ise önce kaynak
+        dosyadaki kesin B-rep okunur. Okunan şekil model için saklanır, dosya bir kez okunur."""
+        if model_ref in self.brep_sources:
+            try:
+                brep = self.brep_sources[model_ref]()
+            except Exception as e:
+                print(f"Modelin B-rep'i kaynaktan okunamadı, mesh kabuğu kullanılacak: {e}")
+                brep = None
+            if brep is not None:
+                self.brep_sources[model_ref] = lambda brep=brep: brep
+                if model_ref in self.instance_shapes:
+                    from OCC.Core.TopLoc import TopLoc_Location
+                    brep = brep.Moved(TopLoc_Location(model_ref.LocalTransformation()))
+                return brep
+        if model_ref in self.mesh_arrays:
+            vertices, faces = self.mesh_arrays[model_ref]
+            brep = mesh_to_brep(vertices, faces)
+            if model_ref in self.instance_shapes:
+                from OCC.Core.TopLoc import TopLoc_Location
+                brep = brep.Moved(TopLoc_Location(model_ref.LocalTransformation()))
+            return brep
+        return self.get_shape_from_ref(model_ref)
+
     def get_active_shape(self):
         """Yüklü modelin TopoDS_Shape nesnesini döndürür."""
         if hasattr(self, 'model_ais') and self.model_ais is not None and hasattr(self.model_ais, 'Shape'):
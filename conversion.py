@@ -0,0 +1,375 @@
+## \file conversion.py
+## \brief Arayüzden bağımsız dönüştürme çekirdeği ve toplu (paralel) dönüştürme.
+##
+## converter.py'deki arayüz fonksiyonları dosya seçimi ve mesaj kutularını yönetir, asıl dönüşümü
+## buradaki convert_file() yapar. Bu modül PyQt içe aktarmaz; komut satırından ve süreç havuzu
+## işçilerinden güvenle kullanılabilir (python main.py convert ...).
+
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from mesh_store import get_mesh_store
+from stl_writer import write_stl
+
+CONFIG_FILE = os.path.expanduser("~/.boxr_cad_config.json")
+QUALITY_PRESETS = ('preview', 'display', 'export')  # occ_mesh.TESSELLATION_PRESETS
+DEFAULT_QUALITY = 'export'
+
+MESH_SOURCE_EXTS = ('.obj', '.stl', '.ply', '.glb', '.gltf', '.off')
+CAD_SOURCE_EXTS = ('.step', '.stp', '.iges', '.igs')
+SOURCE_EXTS = MESH_SOURCE_EXTS + CAD_SOURCE_EXTS
+
+# Hedef format -> (kabul edilen kaynak uzantıları, trimesh export türü veya özel dönüştürücü adı)
+TARGET_FORMATS = {
+    'stl': (SOURCE_EXTS, 'stl'),
+    'obj': (SOURCE_EXTS, 'obj'),
+    'ply': (SOURCE_EXTS, 'ply'),
+    'glb': (SOURCE_EXTS, 'glb'),
+    'gltf': (SOURCE_EXTS, 'gltf'),
+    '3mf': (SOURCE_EXTS, '3mf'),
+    'dae': (SOURCE_EXTS, 'dae'),
+    'step': (('.obj', '.stl', '.iges', '.igs'), 'step'),
+    'fbx': (MESH_SOURCE_EXTS + CAD_SOURCE_EXTS, 'fbx'),
+}
+
+
+## \class ConversionError
+#  \brief Dönüşüm desteklenmediğinde veya başarısız olduğunda fırlatılır.
+class ConversionError(Exception):
+    pass
+
+
+def save_blender_path(path):
+    """Blender yolunu JSON yapilandirma dosyasına kaydeder."""
+    with open(CONFIG_FILE, "w") as f:
+        json.dump({"blender_path": path}, f)
+
+
+def load_blender_path():
+    """Kaydedilmis Blender yolunu JSON yapilandirma dosyasindan yükler."""
+    if not os.path.exists(CONFIG_FILE):
+        return None
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            config = json.load(f)
+            return config.get("blender_path")
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+def _read_mesh(file_path, use_store=True):
+    """Mesh'i MeshStore'dan veya (use_store=False ise) depoya koymadan doğrudan diskten okur."""
+    if use_store:
+        return get_mesh_store().get(file_path)
+    import trimesh
+    return trimesh.load(file_path, force='mesh')
+
+
+## \fn obj_to_fbx(obj_path, fbx_path, blender_path, use_store=True)
+#  \brief Mesh'i benzersiz bir geçici GLB'ye yazar ve havuzdaki kalıcı Blender işçisine FBX olarak
+#         dışa aktarır. Eşzamanlı dönüşümler kendi geçici dizinlerini kullanır.
+#  \return fbx_path veya başarısızlıkta None
+def obj_to_fbx(obj_path, fbx_path, blender_path, use_store=True):
+    from blender_worker import get_blender_pool, BlenderWorkerError
+    with tempfile.TemporaryDirectory(prefix="boxr_fbx_") as scratch_dir:
+        temp_glb = os.path.join(scratch_dir, "model.glb")
+        try:
+            mesh = _read_mesh(obj_path, use_store)
+            if len(mesh.faces) == 0:
+                raise ValueError("Dosya okunamadı veya boş.")
+            mesh.export(temp_glb, file_type='glb')
+        except Exception as e:
+            print(f"Ara dosya oluşturulurken hata: {e}")
+            return None
+        try:
+            get_blender_pool(blender_path).export_fbx(temp_glb, os.path.abspath(fbx_path))
+        except BlenderWorkerError as e:
+            print(f"Blender ile FBX'e dönüştürme hatası: {e}")
+            return None
+    if os.path.exists(fbx_path):
+        return fbx_path
+    print("FBX dosyası oluşmadı.")
+    return None
+
+
+def _to_step(source_path, target_path, use_store=True):
+    from OCC.Extend.DataExchange import write_step_file, read_stl_file, read_iges_file
+    ext = os.path.splitext(source_path)[1].lower()
+    if ext == '.obj':
+        # OCC OBJ okuyamaz: mesh benzersiz bir geçici STL üzerinden aktarılır
+        mesh = _read_mesh(source_path, use_store)
+        fd, temp_stl = tempfile.mkstemp(prefix="boxr_step_", suffix=".stl")
+        os.close(fd)
+        try:
+            write_stl(temp_stl, mesh.vertices, mesh.faces)
+            shape = read_stl_file(temp_stl)
+        finally:
+            os.remove(temp_stl)
+    elif ext == '.stl':
+        shape = read_stl_file(source_path)
+    else:
+        shape = read_iges_file(source_path)
+    if shape is None or shape.IsNull():
+        raise ConversionError("Dosya okunamadı veya boş.")
+    write_step_file(shape, target_path)
+
+
+def _to_fbx(source_path, target_path, blender_path, use_store=True):
+    if not blender_path:
+        raise ConversionError("FBX dönüşümü için Blender yolu gerekli (--blender veya kayıtlı ayar).")
+    if obj_to_fbx(source_path, target_path, blender_path, use_store) is None:
+        raise ConversionError("Blender ile FBX'e dönüştürme başarısız oldu.")
+
+
+## \fn check_conversion(source_path, target_format)
+#  \brief Kaynak dosyanın hedef formata dönüştürülüp dönüştürülemeyeceğini denetler.
+#  \return Küçük harfli hedef format
+def check_conversion(source_path, target_format):
+    target_format = target_format.lower().lstrip('.')
+    if target_format not in TARGET_FORMATS:
+        raise ConversionError(f"Desteklenmeyen hedef format: {target_format}")
+    ext = os.path.splitext(source_path)[1].lower()
+    if ext not in TARGET_FORMATS[target_format][0]:
+        raise ConversionError(f"{ext.upper()} dosyaları {target_format.upper()} formatına dönüştürülemez.")
+    if ext.lstrip('.') == target_format or (target_format == 'step' and ext in ('.step', '.stp')):
+        raise ConversionError(f"Dosya zaten {target_format.upper()} formatında.")
+    return target_format
+
+
+## \fn load_source_mesh(source_path, quality=DEFAULT_QUALITY, use_store=True)
+#  \brief Kaynak dosyanın mesh'ini döndürür. Mesh dosyaları MeshStore'dan, STEP/IGES ise istenen
+#         kalite ön ayarıyla tessellate edilerek (diskteki tessellation önbelleği üzerinden) okunur.
+#  \param use_store False ise mesh dosyaları depoya konmadan okunur. MeshStore kayıt silmez; toplu
+#         işlerde her dosya depoda kalsaydı işçi süreçlerinin belleği iş sayısıyla büyürdü
+#  \return trimesh.Trimesh
+def load_source_mesh(source_path, quality=DEFAULT_QUALITY, use_store=True):
+    if source_path.lower().endswith(CAD_SOURCE_EXTS):
+        import trimesh
+        from occ_mesh import load_cad_mesh_arrays
+        vertices, faces = load_cad_mesh_arrays(source_path, preset=quality)
+        return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+    return _read_mesh(source_path, use_store)
+
+
+def _temp_target(target_path):
+    """Hedefin yanında, uzantısı korunan benzersiz geçici yol; çıktı tamamlanınca hedefin yerine taşınır."""
+    base, ext = os.path.splitext(target_path)
+    return f"{base}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"
+
+
+## \fn convert_file(source_path, target_path, target_format=None, blender_path=None, quality=DEFAULT_QUALITY, use_store=True)
+#  \brief Tek bir dosyayı dönüştürür. Arayüz ve toplu dönüştürme aynı fonksiyonu kullanır.
+#  \param target_format Hedef format; verilmezse target_path uzantısından alınır
+#  \param blender_path FBX dönüşümü için Blender yolu (verilmezse kayıtlı ayar kullanılır)
+#  \param quality STEP/IGES kaynaklar için tessellation ön ayarı ('preview', 'display', 'export')
+#  \param use_store False ise kaynak mesh MeshStore'a konmaz (toplu dönüştürme işleri)
+#  \return target_path
+def convert_file(source_path, target_path, target_format=None, blender_path=None, quality=DEFAULT_QUALITY,
+                 use_store=True):
+    target_format = check_conversion(source_path, target_format or os.path.splitext(target_path)[1])
+    kind = TARGET_FORMATS[target_format][1]
+    # Çıktı önce geçici dosyaya yazılır: yarıda kesilen bir dönüşüm hedef adında kaynaktan yeni,
+    # eksik bir dosya bırakırsa toplu dönüştürme onu güncel sayıp bir daha üretmezdi
+    tmp_path = _temp_target(target_path)
+    try:
+        if kind == 'step':
+            _to_step(source_path, tmp_path, use_store)
+        elif kind == 'fbx':
+            _to_fbx(source_path, tmp_path, blender_path or load_blender_path(), use_store)
+        else:
+            mesh = load_source_mesh(source_path, quality, use_store)
+            if len(mesh.faces) == 0:
+                raise ConversionError("Dosya okunamadı veya boş.")
+            if kind == 'stl':
+                write_stl(tmp_path, mesh.vertices, mesh.faces)
+            else:
+                if kind == 'dae':
+                    try:
+                        import collada  # noqa: F401
+                    except ImportError:
+                        raise ConversionError("DAE formatına dönüştürmek için 'pycollada' kütüphanesi gereklidir.")
+                mesh.export(tmp_path, file_type=kind)
+        if not os.path.exists(tmp_path):
+            raise ConversionError("Hedef dosya oluşturulamadı.")
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return target_path
+
+
+## \fn collect_sources(inputs, recursive=True)
+#  \brief Glob desenlerini ve dizinleri desteklenen kaynak dosyalarına açar.
+#  \return [(kaynak yolu, çıktı dizinine göre göreli yol)] - tekrarlar ayıklanmış, sıralı
+def collect_sources(inputs, recursive=True):
+    found = {}
+    for item in inputs:
+        if os.path.isdir(item):
+            root = os.path.abspath(item)
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    if name.lower().endswith(SOURCE_EXTS):
+                        path = os.path.join(dirpath, name)
+                        found.setdefault(path, os.path.relpath(path, root))
+                if not recursive:
+                    break
+        else:
+            root = _glob_root(item)
+            for path in glob.glob(item, recursive=recursive):
+                if os.path.isfile(path) and path.lower().endswith(SOURCE_EXTS):
+                    path = os.path.abspath(path)
+                    found.setdefault(path, os.path.relpath(path, root) if root else os.path.basename(path))
+    return sorted(found.items())
+
+
+def _glob_root(pattern):
+    """Desenin joker karakter içermeyen baş kısmını (ör. 'parts/**/*.step' -> 'parts') mutlak yol olarak döndürür."""
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if glob.has_magic(part):
+            return os.path.abspath(os.sep.join(parts) or os.curdir)
+        parts.append(part)
+    return None  # Joker yok: tek bir dosya
+
+
+## \fn target_path_for(source_path, relative_path, target_format, output_dir=None)
+#  \brief Çıktı yolunu üretir: output_dir verilmezse kaynağın yanına, verilirse göreli yapı korunarak.
+def target_path_for(source_path, relative_path, target_format, output_dir=None):
+    if output_dir is None:
+        base = os.path.splitext(source_path)[0]
+    else:
+        base = os.path.join(output_dir, os.path.splitext(relative_path)[0])
+    return f"{base}.{target_format}"
+
+
+## \fn is_up_to_date(source_path, target_path)
+#  \brief Hedef dosya varsa, boş değilse ve kaynaktan daha yeniyse True döndürür.
+def is_up_to_date(source_path, target_path):
+    try:
+        target = os.stat(target_path)
+    except OSError:
+        return False
+    return target.st_size > 0 and target.st_mtime >= os.stat(source_path).st_mtime
+
+
+def _convert_job(source_path, target_path, target_format, blender_path, quality):
+    """Havuzda çalışan tek dönüşüm işi; hata fırlatmaz, sonuç sözlüğü döndürür."""
+    started = time.perf_counter()
+    result = {"source": source_path, "target": target_path}
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(target_path)), exist_ok=True)
+        convert_file(source_path, target_path, target_format, blender_path, quality, use_store=False)
+        result["status"] = "converted"
+    except Exception as e:
+        logging.error(f"Dönüştürme başarısız: {source_path} -> {target_path} - {e}")
+        result.update(status="failed", error=str(e))
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+## \fn batch_convert(inputs, target_format, output_dir=None, jobs=None, force=False, blender_path=None, progress=None, quality=DEFAULT_QUALITY)
+#  \brief Dosyaları süreç havuzunda paralel dönüştürür; güncel çıktıları atlar.
+#         FBX işleri iş parçacıklarıyla çalışır ve aynı kalıcı Blender işçi havuzunu paylaşır.
+#  \param inputs Glob desenleri ve/veya dizinler
+#  \param jobs Eşzamanlı süreç (FBX için Blender işçisi) sayısı (varsayılan: CPU sayısı)
+#  \param quality STEP/IGES kaynaklar için tessellation ön ayarı
+#  \param force True ise güncel çıktılar da yeniden üretilir
+#  \param progress progress(tamamlanan, toplam, sonuç) şeklinde çağrılan geri bildirim (opsiyonel)
+#  \return Özet sözlüğü: sayılar, süre ve dosya başına sonuçlar
+def batch_convert(inputs, target_format, output_dir=None, jobs=None, force=False, blender_path=None, progress=None,
+                  quality=DEFAULT_QUALITY):
+    started = time.perf_counter()
+    target_format = target_format.lower().lstrip('.')
+    if target_format not in TARGET_FORMATS:
+        raise ConversionError(f"Desteklenmeyen hedef format: {target_format}")
+
+    results = []
+    pending = []
+    for source_path, relative_path in collect_sources(inputs):
+        target_path = target_path_for(source_path, relative_path, target_format, output_dir)
+        try:
+            check_conversion(source_path, target_format)
+        except ConversionError as e:
+            results.append({"source": source_path, "target": target_path, "status": "unsupported", "error": str(e)})
+            continue
+        if not force and is_up_to_date(source_path, target_path):
+            results.append({"source": source_path, "target": target_path, "status": "skipped"})
+            continue
+        pending.append((source_path, target_path))
+
+    total = len(results) + len(pending)
+    if progress is not None:
+        for done, result in enumerate(results, start=1):
+            progress(done, total, result)
+    if pending:
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+        if target_format == 'fbx':
+            # Asıl iş Blender süreçlerinde yapılır: her Python süreci kendi Blender'ını başlatmasın
+            from blender_worker import get_blender_pool
+            blender_path = blender_path or load_blender_path()
+            if blender_path:
+                get_blender_pool(blender_path, size=jobs)
+            executor_class = ThreadPoolExecutor
+        else:
+            executor_class = ProcessPoolExecutor
+        with executor_class(max_workers=jobs) as executor:
+            futures = [executor.submit(_convert_job, source_path, target_path, target_format, blender_path, quality)
+                       for source_path, target_path in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if progress is not None:
+                    progress(len(results), total, result)
+
+    counts = {status: sum(1 for r in results if r["status"] == status)
+              for status in ("converted", "skipped", "failed", "unsupported")}
+    return {
+        "target_format": target_format,
+        "output_dir": output_dir,
+        "quality": quality,
+        "total": total,
+        **counts,
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": sorted(results, key=lambda r: r["source"]),
+    }
+
+
+## \fn convert_main(argv)
+#  \brief 'python main.py convert' komutu. Çıkış kodu: hata yoksa 0, en az bir dönüşüm başarısızsa 1.
+def convert_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py convert", description="3D model dosyalarını toplu dönüştürür.")
+    parser.add_argument("inputs", nargs="+", help="Dosyalar, glob desenleri ('parts/**/*.step') veya dizinler")
+    parser.add_argument("-t", "--to", required=True, choices=sorted(TARGET_FORMATS), help="Hedef format")
+    parser.add_argument("-o", "--output-dir", help="Çıktı dizini (varsayılan: kaynak dosyanın yanı)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Eşzamanlı süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--force", action="store_true", help="Güncel çıktıları da yeniden dönüştür")
+    parser.add_argument("--summary", help="JSON özetinin yazılacağı dosya (varsayılan: standart çıktı)")
+    parser.add_argument("--blender", help="FBX dönüşümü için Blender yürütülebilir dosyası")
+    parser.add_argument("-q", "--quality", choices=QUALITY_PRESETS, default=DEFAULT_QUALITY,
+                        help="STEP/IGES tessellation kalitesi (sapma model boyutuna göre ölçeklenir)")
+    args = parser.parse_args(argv)
+
+    def report(done, total, result):
+        line = f"[{done}/{total}] {result['status']:<11} {result['source']}"
+        if result.get("error"):
+            line += f" ({result['error']})"
+        print(line, file=sys.stderr)
+
+    summary = batch_convert(args.inputs, args.to, args.output_dir, args.jobs, args.force, args.blender,
+                            progress=report, quality=args.quality)
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    logging.info(f"Toplu dönüştürme: {summary['converted']} dönüştürüldü, {summary['skipped']} atlandı, "
+                 f"{summary['failed']} başarısız ({summary['seconds']} sn)")
+    return 1 if summary["failed"] else 0
@@ -5,14 +5,17 @@ import os
 import subprocess
 import tempfile
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
-import json
-
-CONFIG_FILE = os.path.expanduser("~/.boxr_cad_config.json")
+from mesh_store import get_mesh_store
+from stl_writer import write_stl
+# Arayüzden bağımsız dönüşüm çekirdeği; bu modül sadece dosya seçimi ve mesajları yönetir
+from conversion import convert_file, obj_to_fbx, load_blender_path, save_blender_path
 
 def get_mesh_properties(file_path):
-    """Trimesh kullanarak bir mesh dosyasının hacim ve yüzey alanı bilgilerini alır."""
+    """Trimesh kullanarak bir mesh dosyasının hacim ve yüzey alanı bilgilerini alır.
+    Dosya bir katmana aitse depodaki mesh (ve önbelleklenmiş hacim/alan) kullanılır."""
     try:
-        mesh = trimesh.load(file_path, force='mesh')
+        store = get_mesh_store()
+        mesh = store.get(file_path) if file_path in store else trimesh.load(file_path, force='mesh')
         return {
             "volume": mesh.volume,
             "area": mesh.area
@@ -21,22 +24,6 @@ def get_mesh_properties(file_path):
         print(f"Özellikler alınırken hata: {e}")
         return None
 
-def save_blender_path(path):
-    """Blender yolunu JSON yapilandirma dosyasına kaydeder."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump({"blender_path": path}, f)
-
-def load_blender_path():
-    """Kaydedilmis Blender yolunu JSON yapilandirma dosyasindan yükler."""
-    if not os.path.exists(CONFIG_FILE):
-        return None
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-            return config.get("blender_path")
-    except (json.JSONDecodeError, IOError):
-        return None
-
 def find_blender_executable():
     """Sistemde Blender'ı otomatik olarak bulmaya çalişir."""
     saved_path = load_blender_path()
@@ -79,65 +66,25 @@ def dosya_secici_ac(parent=None):
     return file_path or None
 
 def obj_to_stl(obj_path):
-    temp_dir = tempfile.gettempdir()
-    temp_stl = os.path.join(temp_dir, "temp_obj_conversion.stl")
-    mesh = trimesh.load(obj_path, force='mesh')
-    mesh.export(temp_stl, file_type='stl')
+    # Eşzamanlı yüklemeler birbirinin dosyasını ezmesin diye her çağrıda benzersiz geçici dosya
+    fd, temp_stl = tempfile.mkstemp(prefix="temp_obj_conversion_", suffix=".stl")
+    os.close(fd)
+    mesh = get_mesh_store().get(obj_path)
+    write_stl(temp_stl, mesh.vertices, mesh.faces)
     return temp_stl
 
 def obj_to_glb(obj_path):
-    mesh = trimesh.load(obj_path, force='mesh')
+    mesh = get_mesh_store().get(obj_path)
     glb_path = os.path.splitext(obj_path)[0] + ".glb"
     mesh.export(glb_path, file_type='glb')
     return glb_path
 
 def stl_to_obj(stl_path):
-    mesh = trimesh.load(stl_path, force='mesh')
+    mesh = get_mesh_store().get(stl_path)
     obj_path = os.path.splitext(stl_path)[0] + ".obj"
     mesh.export(obj_path, file_type='obj')
     return obj_path
 
-def obj_to_fbx(obj_path, fbx_path, blender_path):
-    temp_dir = tempfile.gettempdir()
-    temp_stl = os.path.join(temp_dir, "temp_obj2fbx.stl")
-    temp_glb = os.path.join(temp_dir, "temp_obj2fbx.glb")
-    try:
-        mesh = trimesh.load(obj_path, force='mesh')
-        mesh.export(temp_stl, file_type='stl')
-        mesh2 = trimesh.load(temp_stl, force='mesh')
-        mesh2.export(temp_glb, file_type='glb')
-    except Exception as e:
-        print(f"Ara dosya oluşturulurken hata: {e}")
-        for f in [temp_stl, temp_glb]:
-            if os.path.exists(f):
-                os.remove(f)
-        return None
-
-    blender_script = f"""
-import bpy
-
-bpy.ops.wm.read_factory_settings(use_empty=True)
-bpy.ops.import_scene.gltf(filepath=r'{temp_glb}')
-bpy.ops.export_scene.fbx(filepath=r'{fbx_path}')
-"""
-    temp_script = os.path.join(temp_dir, "temp_blender_script.py")
-    with open(temp_script, "w") as f:
-        f.write(blender_script)
-    try:
-        subprocess.run([blender_path, "-b", "-P", temp_script], check=True)
-        if os.path.exists(fbx_path):
-            return fbx_path
-        else:
-            print("FBX dosyası oluşmadı.")
-            return None
-    except Exception as e:
-        print(f"Blender ile FBX'e dönüştürme hatası: {e}")
-        return None
-    finally:
-        for f in [temp_stl, temp_glb, temp_script]:
-            if os.path.exists(f):
-                os.remove(f)
-
 def convert_to_glb(self, source_path=None):
     if source_path is None: source_path = dosya_secici_ac(parent=self)
     if not source_path: return None
@@ -151,11 +98,7 @@ def convert_to_glb(self, source_path=None):
     
     try:
         original_props = get_mesh_properties(source_path)
-        result_path = obj_to_glb(source_path)
-        if result_path != save_path:
-            import shutil
-            shutil.move(result_path, save_path)
-        
+        convert_file(source_path, save_path, 'glb')
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya GLB formatına dönüştürüldü:\n{save_path}")
         return {"original": original_props, "new": new_props, "conversion_type": "OBJ -> GLB"}
@@ -180,7 +123,7 @@ def convert_to_fbx(self, source_path=None):
             QMessageBox.critical(self, "Hata", "Blender yürütülebilir dosyası bulunamadı. Dönüştürme iptal edildi.")
             return None
 
-        result = obj_to_fbx(source_path, save_path, blender_path)
+        result = convert_file(source_path, save_path, 'fbx', blender_path)
         if result:
             QMessageBox.information(self, "Başarılı", f"Dosya FBX formatına dönüştürüldü:\n{save_path}")
             return {"comparison_unavailable": True, "conversion_type": "OBJ -> FBX"}
@@ -203,10 +146,7 @@ def convert_to_obj(self, source_path=None):
     
     try:
         original_props = get_mesh_properties(source_path)
-        result_path = stl_to_obj(source_path)
-        if result_path != save_path:
-            import shutil
-            shutil.move(result_path, save_path)
+        convert_file(source_path, save_path, 'obj')
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya OBJ formatına dönüştürüldü:\n{save_path}")
         return {"original": original_props, "new": new_props, "conversion_type": "STL -> OBJ"}
@@ -215,40 +155,22 @@ def convert_to_obj(self, source_path=None):
         return None
 
 def convert_to_step(self, source_path=None):
-    from OCC.Extend.DataExchange import write_step_file, read_stl_file, read_iges_file
     if source_path is None: source_path = dosya_secici_ac(parent=self)
     if not source_path: return None
     
     ext = os.path.splitext(source_path)[1].lower()
-    shape = None
+    if ext in ['.step', '.stp']:
+        QMessageBox.information(self, "Bilgi", "Seçilen dosya zaten bir STEP dosyası.")
+        return None
+    if ext not in ['.obj', '.stl', '.iges', '.igs']:
+        QMessageBox.warning(self, "Desteklenmeyen Format", "Bu dosya formatı STEP'e dönüştürülemez.")
+        return None
     try:
-        if ext in ['.obj', '.stl']:
-            if ext == '.obj':
-                import trimesh
-                mesh = trimesh.load(source_path, force='mesh')
-                temp_stl = os.path.splitext(source_path)[0] + "_temp.stl"
-                mesh.export(temp_stl, file_type='stl')
-                shape = read_stl_file(temp_stl)
-                os.remove(temp_stl)
-            else: # .stl
-                shape = read_stl_file(source_path)
-        elif ext in ['.iges', '.igs']:
-            shape = read_iges_file(source_path)
-        elif ext in ['.step', '.stp']:
-             QMessageBox.information(self, "Bilgi", "Seçilen dosya zaten bir STEP dosyası.")
-             return None
-        else:
-            QMessageBox.warning(self, "Desteklenmeyen Format", "Bu dosya formatı STEP'e dönüştürülemez.")
-            return None
-
-        if shape is None:
-            raise ValueError("Dosya okunamadı veya boş.")
-
         default_name = os.path.splitext(os.path.basename(source_path))[0] + ".step"
         save_path, _ = QFileDialog.getSaveFileName(self, "STEP Olarak Kaydet", default_name, "STEP Dosyası (*.step *.stp)")
         if not save_path: return None
 
-        write_step_file(shape, save_path)
+        convert_file(source_path, save_path, 'step')
         QMessageBox.information(self, "Başarılı", f"Dosya STEP formatına dönüştürüldü:\n{save_path}")
         # STEP dosyaları için Trimesh karşılaştırması yapılamaz
         return {"comparison_unavailable": True, "conversion_type": f"{ext.upper()} -> STEP"}
@@ -256,6 +178,22 @@ def convert_to_step(self, source_path=None):
         QMessageBox.critical(self, "Hata", f"STEP'e dönüştürme başarısız: {e}")
         return None
 
+def export_shape_to_step(self, shape, name):
+    """Sahnedeki bir şekli (ör. montaj parçasının B-rep'i) STEP dosyası olarak kaydeder."""
+    from OCC.Extend.DataExchange import write_step_file
+    if shape is None or shape.IsNull():
+        QMessageBox.warning(self, "Hata", "Seçili parçanın şekli bulunamadı.")
+        return None
+    save_path, _ = QFileDialog.getSaveFileName(self, "STEP Olarak Kaydet", f"{name}.step", "STEP Dosyası (*.step *.stp)")
+    if not save_path: return None
+    try:
+        write_step_file(shape, save_path)
+        QMessageBox.information(self, "Başarılı", f"Parça STEP formatına aktarıldı:\n{save_path}")
+        return {"comparison_unavailable": True, "conversion_type": "PARÇA -> STEP"}
+    except Exception as e:
+        QMessageBox.critical(self, "Hata", f"STEP'e aktarma başarısız: {e}")
+        return None
+
 def convert_to_ply(self, source_path=None):
     import trimesh
     if source_path is None: source_path = dosya_secici_ac(parent=self)
@@ -270,8 +208,7 @@ def convert_to_ply(self, source_path=None):
     if not save_path: return None
     try:
         original_props = get_mesh_properties(source_path)
-        mesh = trimesh.load(source_path, force='mesh')
-        mesh.export(save_path, file_type='ply')
+        convert_file(source_path, save_path, 'ply')
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya PLY formatına dönüştürüldü:\n{save_path}")
         return {"original": original_props, "new": new_props, "conversion_type": f"{ext.upper()} -> PLY"}
@@ -293,8 +230,7 @@ def convert_to_gltf(self, source_path=None):
     if not save_path: return None
     try:
         original_props = get_mesh_properties(source_path)
-        mesh = trimesh.load(source_path, force='mesh')
-        mesh.export(save_path, file_type='gltf')
+        convert_file(source_path, save_path, 'gltf')
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya GLTF formatına dönüştürüldü:\n{save_path}")
         return {"original": original_props, "new": new_props, "conversion_type": f"{ext.upper()} -> GLTF"}
@@ -316,8 +252,7 @@ def convert_to_3mf(self, source_path=None):
     if not save_path: return None
     try:
         original_props = get_mesh_properties(source_path)
-        mesh = trimesh.load(source_path, force='mesh')
-        mesh.export(save_path, file_type='3mf')
+        convert_file(source_path, save_path, '3mf')
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya 3MF formatına dönüştürüldü:\n{save_path}")
         return {"original": original_props, "new": new_props, "conversion_type": f"{ext.upper()} -> 3MF"}
@@ -339,7 +274,6 @@ def convert_to_dae(self, source_path=None):
     if not save_path: return None
     try:
         original_props = get_mesh_properties(source_path)
-        mesh = trimesh.load(source_path, force='mesh')
         # DAE export için pycollada gerekebilir, kontrol edelim
         try:
             import collada
@@ -347,7 +281,7 @@ def convert_to_dae(self, source_path=None):
             QMessageBox.warning(self, "Eksik Kütüphane", "DAE formatına dönüştürmek için 'pycollada' kütüphanesi gereklidir.\nLütfen 'pip install pycollada' komutu ile kurun.")
             return None
         
-        mesh.export(save_path, file_type='dae')
+        convert_file(source_path, save_path, 'dae')
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya DAE formatına dönüştürüldü:\n{save_path}")
         return {"original": original_props, "new": new_props, "conversion_type": f"{ext.upper()} -> DAE"}
@@ -356,9 +290,6 @@ def convert_to_dae(self, source_path=None):
         return None
 
 def convert_step_to_stl(self, source_path=None):
-    from OCC.Extend.DataExchange import read_step_file, read_iges_file
-    from OCC.Core.StlAPI import StlAPI_Writer
-    from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
     if source_path is None: source_path = dosya_secici_ac(parent=self)
     if not source_path: return None
     ext = os.path.splitext(source_path)[1].lower()
@@ -370,15 +301,8 @@ def convert_step_to_stl(self, source_path=None):
     save_path, _ = QFileDialog.getSaveFileName(self, "STL Olarak Kaydet", default_name, "STL Dosyası (*.stl)")
     if not save_path: return None
     try:
-        if ext in ['.step', '.stp']:
-            shape = read_step_file(source_path)
-        else:
-            shape = read_iges_file(source_path)
-        
-        mesh = BRepMesh_IncrementalMesh(shape, 0.1)
-        mesh.Perform()
-        writer = StlAPI_Writer()
-        writer.Write(shape, save_path)
+        # Tessellation sonucu dosya içeriğine göre önbelleklenir; tekrar dönüşümde CAD okunmaz
+        convert_file(source_path, save_path, 'stl')
         
         new_props = get_mesh_properties(save_path)
         # Orijinal STEP/IGES için Trimesh özellikleri alınamaz, bu yüzden None gönderiyoruz.
@@ -389,11 +313,6 @@ def convert_step_to_stl(self, source_path=None):
         return None
 
 def convert_step_to_obj(self, source_path=None):
-    from OCC.Extend.DataExchange import read_step_file, read_iges_file
-    import trimesh
-    from OCC.Core.StlAPI import StlAPI_Writer
-    from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
-    import tempfile, os
     if source_path is None: source_path = dosya_secici_ac(parent=self)
     if not source_path: return None
     ext = os.path.splitext(source_path)[1].lower()
@@ -405,20 +324,9 @@ def convert_step_to_obj(self, source_path=None):
     save_path, _ = QFileDialog.getSaveFileName(self, "OBJ Olarak Kaydet", default_name, "OBJ Dosyası (*.obj)")
     if not save_path: return None
     
-    temp_stl = tempfile.mktemp(suffix='.stl')
     try:
-        if ext in ['.step', '.stp']:
-            shape = read_step_file(source_path)
-        else:
-            shape = read_iges_file(source_path)
-
-        mesh = BRepMesh_IncrementalMesh(shape, 0.1)
-        mesh.Perform()
-        writer = StlAPI_Writer()
-        writer.Write(shape, temp_stl)
-        
-        mesh_trimesh = trimesh.load(temp_stl, force='mesh')
-        mesh_trimesh.export(save_path, file_type='obj')
+        # Tessellation sonucu dosya içeriğine göre önbelleklenir; ara STL dosyasına gerek yok
+        convert_file(source_path, save_path, 'obj')
         
         new_props = get_mesh_properties(save_path)
         QMessageBox.information(self, "Başarılı", f"Dosya OBJ formatına dönüştürüldü:\n{save_path}")
@@ -426,6 +334,3 @@ def convert_step_to_obj(self, source_path=None):
     except Exception as e:
         QMessageBox.critical(self, "Hata", f"OBJ'ye dönüştürme başarısız: {e}")
         return None
-    finally:
-        if os.path.exists(temp_stl):
-            os.remove(temp_stl)
@@ -0,0 +1,83 @@
+## \file mesh_adjacency.py
+## \brief Ölçüm sonuçları için önceden hesaplanmış, CSR biçiminde mesh komşuluk indeksi.
+##
+## Vertex, kenar ve yüzey ölçümleri seçilen elemana komşu kenar/yüzeyleri bulmak için eskiden
+## her tıklamada tüm kenar ve yüzey listesini Python döngüsüyle tarıyordu. MeshAdjacency bu
+## ilişkileri bir kez NumPy ile kurar; her sorgu elemanın derecesi kadar iş yapar.
+
+import numpy as np
+
+
+## \class CSRIndex
+#  \brief Satır başına değişken sayıda indeks tutan sıkıştırılmış satır (CSR) tablosu.
+class CSRIndex:
+    def __init__(self, rows, cols, row_count):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        order = np.argsort(rows, kind='stable')
+        self.indices = cols[order]
+        self.indptr = np.zeros(row_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=row_count), out=self.indptr[1:])
+
+    def __getitem__(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+
+## \class MeshAdjacency
+#  \brief Üçgen mesh için vertex→yüzey, vertex→kenar, kenar→yüzey ve yüzey→yüzey komşulukları.
+#
+#  Kenarlar yönsüz ve tekildir (unique_edges); face_edges her üçgenin (0,1), (1,2), (2,0)
+#  kenarlarının unique_edges içindeki indeksidir. Yapı sadece topolojiye bağlı olduğundan
+#  katmanın dönüşümü değiştiğinde yeniden kurulması gerekmez.
+class MeshAdjacency:
+    def __init__(self, faces, vertex_count):
+        faces = np.asarray(faces, dtype=np.int64)
+        face_count = len(faces)
+        face_ids = np.repeat(np.arange(face_count, dtype=np.int64), 3)
+
+        # Yönsüz kenarlar tek bir tamsayı koduna çevrilerek tekilleştirilir
+        directed = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+        low = directed.min(axis=1)
+        high = directed.max(axis=1)
+        codes, inverse = np.unique(low * vertex_count + high, return_inverse=True)
+        self.unique_edges = np.column_stack([codes // vertex_count, codes % vertex_count])
+        self.face_edges = inverse.reshape(-1, 3)
+        edge_count = len(self.unique_edges)
+
+        self.vertex_faces = CSRIndex(faces.ravel(), face_ids, vertex_count)
+        self.vertex_edges = CSRIndex(self.unique_edges.ravel(),
+                                     np.repeat(np.arange(edge_count, dtype=np.int64), 2), vertex_count)
+        self.edge_faces = CSRIndex(self.face_edges.ravel(), face_ids, edge_count)
+        self.face_faces = self._build_face_faces(face_count)
+
+    def _build_face_faces(self, face_count):
+        """Aynı kenarı paylaşan yüz çiftlerinden yüzey→yüzey tablosunu kurar."""
+        edge_faces = self.edge_faces
+        degree = edge_faces.degrees()
+        # Her (kenar, yüz) kaydı, aynı kenardaki tüm yüzlerle eşleştirilir
+        partners = np.repeat(degree, degree)
+        left = np.repeat(edge_faces.indices, partners)
+        starts = np.repeat(np.repeat(edge_faces.indptr[:-1], degree), partners)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(partners) - partners, partners)
+        right = edge_faces.indices[starts + offsets]
+        keep = left != right
+        pairs = np.unique(left[keep] * face_count + right[keep])
+        return CSRIndex(pairs // face_count, pairs % face_count, face_count)
+
+    ## \brief Yönlü kenar indeksini (trimesh mesh.edges sırası, yüz * 3 + k) tekil kenar indeksine çevirir.
+    def edge_from_face_edge(self, face_edge_index):
+        return int(self.face_edges.ravel()[face_edge_index])
+
+
+## \fn triangle_areas(vertices, faces)
+#  \brief Verilen üçgenlerin alanlarını vektörel olarak hesaplar.
+def triangle_areas(vertices, faces):
+    triangles = np.asarray(vertices)[np.asarray(faces, dtype=np.int64).reshape(-1, 3)]
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    return 0.5 * np.linalg.norm(cross, axis=1)
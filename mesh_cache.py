@@ -0,0 +1,123 @@
+## \file mesh_cache.py
+## \brief Dosya içerik özetine göre anahtarlanan, diskte kalıcı tessellation önbelleği.
+##
+## Her kayıt iki sıkıştırılmamış .npy dosyasından oluşur (float32 vertex, uint32 yüzey);
+## böylece okuma sırasında np.load(mmap_mode='r') ile belleğe eşlenebilir. Önbellek boyutu
+## sınırlandırılmıştır ve en uzun süredir kullanılmayan kayıtlar (LRU) silinir.
+
+import os
+import hashlib
+import logging
+import threading
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".boxr_cad_cache", "tessellation")
+MAX_CACHE_BYTES = 2 * 1024 ** 3  # 2 GB
+
+_VERTEX_SUFFIX = ".v.npy"
+_FACE_SUFFIX = ".f.npy"
+
+
+## \fn file_content_hash(file_path, chunk_size=1 << 20)
+#  \brief Dosya içeriğinin SHA-256 özetini parça parça okuyarak hesaplar.
+def file_content_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+## \class MeshCache
+#  \brief Üçgenlenmiş vertex/yüzey dizilerini diskte saklayan LRU önbellek.
+class MeshCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key(self, file_path, tolerance, content_hash=None):
+        """İçerik özeti + tessellation toleransından önbellek anahtarı üretir (özet önceden hesaplandıysa verilebilir)."""
+        tolerance_tag = str(tolerance).replace(os.sep, "_")
+        return f"{content_hash or file_content_hash(file_path)}_{tolerance_tag}"
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + _VERTEX_SUFFIX, base + _FACE_SUFFIX
+
+    def get(self, key):
+        """Kayıt varsa belleğe eşlenmiş (vertices, faces) dizilerini, yoksa None döndürür."""
+        vertex_path, face_path = self._paths(key)
+        if not (os.path.exists(vertex_path) and os.path.exists(face_path)):
+            return None
+        try:
+            vertices = np.load(vertex_path, mmap_mode='r')
+            faces = np.load(face_path, mmap_mode='r')
+            # LRU için son kullanım zamanını güncelle
+            os.utime(vertex_path)
+            os.utime(face_path)
+            return vertices, faces
+        except (OSError, ValueError) as e:
+            logging.warning(f"Tessellation önbelleği okunamadı, kayıt siliniyor: {key} - {e}")
+            self._remove(key)
+            return None
+
+    def put(self, key, vertices, faces):
+        """Dizileri atomik olarak yazar ve gerekirse eski kayıtları siler."""
+        vertex_path, face_path = self._paths(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for path, array in ((vertex_path, np.asarray(vertices, dtype=np.float32)),
+                                (face_path, np.asarray(faces, dtype=np.uint32))):
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Tessellation önbelleğe yazılamadı: {key} - {e}")
+            return
+        self.evict()
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def evict(self):
+        """Toplam boyut sınırı aşılırsa en eski kullanılan kayıtları siler."""
+        with self._lock:
+            entries = {}
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+            for name in names:
+                for suffix in (_VERTEX_SUFFIX, _FACE_SUFFIX):
+                    if name.endswith(suffix):
+                        key = name[:-len(suffix)]
+                        try:
+                            stat = os.stat(os.path.join(self.cache_dir, name))
+                        except OSError:
+                            continue
+                        size, last_used = entries.get(key, (0, 0.0))
+                        entries[key] = (size + stat.st_size, max(last_used, stat.st_mtime))
+            total = sum(size for size, _ in entries.values())
+            for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                total -= size
+
+
+_default_cache = None
+
+
+## \fn get_mesh_cache()
+#  \brief Uygulama genelinde paylaşılan MeshCache örneğini döndürür.
+def get_mesh_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MeshCache()
+    return _default_cache
@@ -0,0 +1,111 @@
+## \file mesh_store.py
+## \brief Katman dosyalarının geometrisini bir kez yükleyip tüm tüketicilerle paylaşan bellek içi depo.
+##
+## Model bilgisi, ölçüm, dönüştürme karşılaştırması ve yazıcıya gönderme aynı dosyayı
+## tekrar tekrar diskten okumak yerine buradaki trimesh nesnesini kullanır. Kayıt, dosyanın
+## değiştirilme zamanı veya boyutu değiştiğinde geçersiz sayılır ve yeniden yüklenir.
+##
+## Depo, vertex/yüzey dizilerinin toplam boyutuna göre sınırlıdır (LRU). Bilgi paneli, AR ve
+## önizleme için okunup hiç katman olmayan dosyalar bellekte birikmez; çıkarılan bir kaydın dosyası
+## tekrar istendiğinde diskten (STEP/IGES için tessellation önbelleğinden) yeniden okunur.
+
+import os
+import threading
+from collections import OrderedDict
+
+CAD_EXTS = ('.step', '.stp', '.iges', '.igs')
+MAX_STORE_BYTES = 2 * 1024 ** 3  # 2 GB
+
+
+def _mesh_bytes(mesh):
+    return mesh.vertices.nbytes + mesh.faces.nbytes
+
+
+## \class MeshStore
+#  \brief Dosya yolu -> trimesh.Trimesh eşlemesini tutan, iş parçacığı güvenli, boyut sınırlı LRU depo.
+class MeshStore:
+    def __init__(self, max_bytes=MAX_STORE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # mutlak yol -> (imza, trimesh.Trimesh, bayt); en son kullanılan sonda
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    @staticmethod
+    def _signature(file_path):
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _load(file_path):
+        import trimesh
+        if file_path.lower().endswith(CAD_EXTS):
+            from occ_mesh import load_cad_mesh_arrays
+            vertices, faces = load_cad_mesh_arrays(file_path, preset='display')
+            return trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        return trimesh.load(file_path, force='mesh')
+
+    def get(self, file_path):
+        """Dosyanın mesh'ini döndürür; sadece ilk çağrıda veya dosya değiştiyse diskten okur."""
+        key = self._key(file_path)
+        signature = self._signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1]
+        # Okuma kilit dışında yapılır; farklı dosyalar birbirini beklemez
+        mesh = self._load(key)
+        with self._lock:
+            self._insert(key, signature, mesh)
+        return mesh
+
+    def put(self, file_path, vertices, faces):
+        """Başka bir yoldan (ör. arka plan yükleyici) zaten okunmuş dizileri depoya ekler."""
+        import trimesh
+        key = self._key(file_path)
+        mesh = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        with self._lock:
+            self._insert(key, self._signature(key), mesh)
+        return mesh
+
+    def _insert(self, key, signature, mesh):
+        """Kaydı ekler ve sınır aşıldıysa en uzun süredir kullanılmayanları çıkarır (kilit tutulurken çağrılır).
+        Yeni kayıt tek başına sınırı aşsa bile tutulur."""
+        self._remove(key)
+        size = _mesh_bytes(mesh)
+        self._entries[key] = (signature, mesh, size)
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def discard(self, file_path):
+        """Dosyaya ait kaydı bellekten çıkarır."""
+        with self._lock:
+            self._remove(self._key(file_path))
+
+    def __contains__(self, file_path):
+        with self._lock:
+            return self._key(file_path) in self._entries
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+## \fn get_mesh_store()
+#  \brief Uygulama genelinde paylaşılan MeshStore örneğini döndürür.
+def get_mesh_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = MeshStore()
+        return _default_store
@@ -0,0 +1,225 @@
+## \file model_info.py
+## \brief Arayüzden bağımsız model ölçümleri ve 'python main.py info' komutu.
+##
+## Model bilgi paneli ve dönüştürme karşılaştırmasının hesapladığı değerler (vertex/yüzey sayısı,
+## boyutlar, hacim, alan) burada QApplication olmadan, süreç havuzunda paralel hesaplanır.
+## Komut her dosya için bir JSON nesnesini bitirdiği anda standart çıktıya tek satır olarak yazar
+## (JSON Lines); böylece büyük model kütüphaneleri gece boyunca akış halinde indekslenebilir.
+##
+## quick_stats() ise dosyayı hiç ayrıştırmadan, sadece biçimin başlığından sabit sürede sayıları
+## (ve biçim saklıyorsa sınırları) okur: ikili STL başlıkta üçgen sayısını, GLB ise JSON bölümünde
+## accessor sayılarını ve POSITION min/max değerlerini tutar. Bilgi paneli bunları anında gösterir.
+
+import os
+import sys
+import json
+import time
+import struct
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from conversion import QUALITY_PRESETS, collect_sources, load_source_mesh
+
+DEFAULT_INFO_QUALITY = 'display'  # Ölçümler için gösterimle aynı tessellation yeterlidir
+
+
+STL_HEADER_BYTES = 84
+STL_RECORD_BYTES = 50
+GLB_MAGIC = b"glTF"
+GLB_JSON_CHUNK = 0x4E4F534A
+GLTF_TRIANGLES = 4
+
+
+def _binary_stl_stats(file_path):
+    with open(file_path, "rb") as f:
+        header = f.read(STL_HEADER_BYTES)
+    if len(header) < STL_HEADER_BYTES:
+        return None
+    count = struct.unpack_from("<I", header, 80)[0]
+    # ASCII STL'de (veya bozuk dosyada) boyut başlıktaki sayıyla tutmaz
+    if os.path.getsize(file_path) != STL_HEADER_BYTES + STL_RECORD_BYTES * count:
+        return None
+    # Vertex sayısı ancak çakışan köşeler birleştirilince belli olur; başlıkta yoktur
+    return {"faces": count, "vertices": None, "bounds": None}
+
+
+def _node_matrix(node):
+    """glTF düğümünün yerel dönüşümünü 4x4 matris olarak döndürür (matrix veya TRS)."""
+    if "matrix" in node:
+        return np.asarray(node["matrix"], dtype=np.float64).reshape(4, 4).T  # glTF sütun sıralıdır
+    x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+    rotation = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation * np.asarray(node.get("scale", (1.0, 1.0, 1.0)), dtype=np.float64)
+    matrix[:3, 3] = node.get("translation", (0.0, 0.0, 0.0))
+    return matrix
+
+
+def _glb_stats(file_path):
+    with open(file_path, "rb") as f:
+        header = f.read(20)
+        if len(header) < 20 or header[:4] != GLB_MAGIC:
+            return None
+        json_length, chunk_type = struct.unpack_from("<II", header, 12)
+        if chunk_type != GLB_JSON_CHUNK:
+            return None
+        gltf = json.loads(f.read(json_length))
+
+    accessors = gltf.get("accessors", [])
+    nodes = gltf.get("nodes", [])
+    meshes = gltf.get("meshes", [])
+    stats = {"faces": 0, "vertices": 0}
+    corners = []
+
+    def visit(index, parent):
+        node = nodes[index]
+        matrix = parent @ _node_matrix(node)
+        if "mesh" in node:
+            for primitive in meshes[node["mesh"]].get("primitives", []):
+                if primitive.get("mode", GLTF_TRIANGLES) != GLTF_TRIANGLES:
+                    continue
+                position = accessors[primitive["attributes"]["POSITION"]]
+                stats["vertices"] += position["count"]
+                indices = accessors[primitive["indices"]]["count"] if "indices" in primitive else position["count"]
+                stats["faces"] += indices // 3
+                # POSITION accessor'ının min/max değerleri zorunludur; köşeler düğüm dönüşümüyle taşınır
+                if "min" in position and "max" in position:
+                    lower, upper = position["min"], position["max"]
+                    box = np.array([[x, y, z, 1.0] for x in (lower[0], upper[0])
+                                    for y in (lower[1], upper[1]) for z in (lower[2], upper[2])])
+                    corners.append((box @ matrix.T)[:, :3])
+        for child in node.get("children", []):
+            visit(child, matrix)
+
+    scenes = gltf.get("scenes", [])
+    if scenes:
+        roots = scenes[gltf.get("scene", 0)].get("nodes", [])
+    else:
+        roots = range(len(nodes))
+    for root in roots:
+        visit(root, np.eye(4))
+    if corners:
+        points = np.concatenate(corners)
+        stats["bounds"] = {"min": points.min(axis=0).tolist(), "max": points.max(axis=0).tolist()}
+    else:
+        stats["bounds"] = None
+    return stats
+
+
+## \fn quick_stats(file_path)
+#  \brief Dosyayı ayrıştırmadan, biçimin başlığından sabit sürede sayıları okur.
+#         İkili STL: üçgen sayısı. GLB: vertex ve üçgen sayıları ile (düğüm dönüşümleri uygulanmış)
+#         sınırlar. Bilinmeyen değerler None olur.
+#  \return {"faces", "vertices", "bounds", "extents"} veya biçim desteklenmiyorsa None
+def quick_stats(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == '.stl':
+            stats = _binary_stl_stats(file_path)
+        elif ext == '.glb':
+            stats = _glb_stats(file_path)
+        else:
+            return None
+    except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error) as e:
+        logging.warning(f"Hızlı model bilgisi okunamadı: {file_path} - {e}")
+        return None
+    if stats is not None:
+        bounds = stats["bounds"]
+        stats["extents"] = [hi - lo for lo, hi in zip(bounds["min"], bounds["max"])] if bounds else None
+    return stats
+
+
+## \fn mesh_metrics(mesh)
+#  \brief Mesh'in sayılarını, sınırlarını, alanını, kapalılığını ve (kapalıysa) hacmini hesaplar.
+#         Kapalılık, çakışan vertexler birleştirilmiş bir kopya üzerinde denetlenir; CAD
+#         tessellation'ında yüzler vertex paylaşmadığından ham mesh hiçbir zaman kapalı görünmez.
+#  \return JSON'a yazılabilir sözlük
+def mesh_metrics(mesh):
+    import trimesh
+    bounds = mesh.bounds
+    welded = trimesh.Trimesh(vertices=mesh.vertices, faces=mesh.faces, process=True)
+    watertight = bool(welded.is_watertight)
+    return {
+        "vertices": int(len(mesh.vertices)),
+        "faces": int(len(mesh.faces)),
+        "bounds": {"min": bounds[0].tolist(), "max": bounds[1].tolist()} if bounds is not None else None,
+        "extents": mesh.extents.tolist() if bounds is not None else None,
+        "area": float(mesh.area),
+        "watertight": watertight,
+        # Kapalı olmayan mesh'in hacmi anlamsızdır
+        "volume": float(abs(welded.volume)) if watertight else None,
+    }
+
+
+## \fn file_info(file_path, quality=DEFAULT_INFO_QUALITY)
+#  \brief Tek bir dosyanın ölçümlerini döndürür; hata fırlatmaz, hata durumu sonuçta raporlanır.
+def file_info(file_path, quality=DEFAULT_INFO_QUALITY):
+    started = time.perf_counter()
+    result = {
+        "file": file_path,
+        "format": os.path.splitext(file_path)[1].lstrip('.').lower(),
+    }
+    try:
+        result["size_bytes"] = os.path.getsize(file_path)
+        mesh = load_source_mesh(file_path, quality, use_store=False)
+        if len(mesh.faces) == 0:
+            raise ValueError("Dosya okunamadı veya boş.")
+        result.update(mesh_metrics(mesh))
+        result["status"] = "ok"
+    except Exception as e:
+        logging.error(f"Model bilgisi alınamadı: {file_path} - {e}")
+        result.update(status="failed", error=str(e))
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+## \fn iter_file_info(inputs, jobs=None, quality=DEFAULT_INFO_QUALITY)
+#  \brief Dosyaların ölçümlerini süreç havuzunda hesaplar ve biten sonuçları bitiş sırasıyla üretir.
+#  \param inputs Dosyalar, glob desenleri ve/veya dizinler
+#  \param jobs Eşzamanlı süreç sayısı (varsayılan: CPU sayısı)
+def iter_file_info(inputs, jobs=None, quality=DEFAULT_INFO_QUALITY):
+    sources = [source_path for source_path, _ in collect_sources(inputs)]
+    if not sources:
+        return
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(sources)))
+    if jobs == 1:
+        for source_path in sources:
+            yield file_info(source_path, quality)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(file_info, source_path, quality) for source_path in sources]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+## \fn info_main(argv)
+#  \brief 'python main.py info' komutu. Çıkış kodu: hata yoksa 0, en az bir dosya okunamadıysa 1.
+def info_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="main.py info",
+                                     description="3D model dosyalarının ölçümlerini satır başına bir JSON nesnesi olarak yazar.")
+    parser.add_argument("inputs", nargs="+", help="Dosyalar, glob desenleri ('kutuphane/**/*.stl') veya dizinler")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Eşzamanlı süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("-q", "--quality", choices=QUALITY_PRESETS, default=DEFAULT_INFO_QUALITY,
+                        help="STEP/IGES tessellation kalitesi (varsayılan: display)")
+    parser.add_argument("-o", "--output", help="JSON Lines çıktısının yazılacağı dosya (varsayılan: standart çıktı)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {"ok": 0, "failed": 0}
+    try:
+        for result in iter_file_info(args.inputs, args.jobs, args.quality):
+            counts[result["status"]] += 1
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    logging.info(f"Model bilgisi: {counts['ok']} dosya okundu, {counts['failed']} başarısız "
+                 f"({time.perf_counter() - started:.1f} sn)")
+    return 1 if counts["failed"] else 0
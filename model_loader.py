@@ -0,0 +1,329 @@
+## \file model_loader.py
+## \brief Model dosyalarını GUI iş parçacığı dışında okuyan ve tessellate eden arka plan işçileri.
+
+import os
+import logging
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from mesh_store import get_mesh_store
+
+MESH_EXTS = ('.obj', '.stl')
+CAD_EXTS = ('.step', '.stp', '.iges', '.igs')
+STEP_EXTS = ('.step', '.stp')
+SUPPORTED_EXTS = MESH_EXTS + CAD_EXTS
+
+
+## \class LoadCancelled
+#  \brief Yükleme kullanıcı tarafından iptal edildiğinde işçi içinde fırlatılır.
+class LoadCancelled(Exception):
+    pass
+
+
+# Görüntüleme için tessellation kalitesi (occ_mesh.TESSELLATION_PRESETS); sapma model boyutuna göre ölçeklenir
+DISPLAY_PRESET = 'display'
+
+
+## \fn parse_model_file(file_path, progress=None, is_cancelled=None)
+#  \brief Dosyayı okur ve gösterilmeye hazır, tessellate edilmiş bir TopoDS_Shape üretir.
+#         Qt'ye dokunmaz, bu yüzden herhangi bir iş parçacığından çağrılabilir.
+#  \param file_path Model dosya yolu (str)
+#  \param progress progress(yüzde, aşama) şeklinde çağrılan geri bildirim fonksiyonu (opsiyonel)
+#  \param is_cancelled İptal istendiyse True döndüren fonksiyon (opsiyonel)
+#  \return {"file_path", "shape", "kind"} sözlüğü; mesh için ayrıca "vertices" ve "faces".
+#          Önbellekten açılan STEP/IGES'te "brep_source" kesin B-rep'i okuyan fonksiyondur.
+#          Birden fazla parçalı STEP montajlarında kind 'assembly' olur ve "shape" yerine
+#          tessellate edilmemiş "parts" listesi döner (bkz. AssemblyPartWorker)
+def parse_model_file(file_path, progress=None, is_cancelled=None):
+    def report(value, stage):
+        if is_cancelled is not None and is_cancelled():
+            raise LoadCancelled(file_path)
+        if progress is not None:
+            progress(value, stage)
+
+    ext = os.path.splitext(file_path)[1].lower()
+    report(5, "Dosya okunuyor")
+    result = {"file_path": file_path}
+    if ext in MESH_EXTS:
+        from occ_mesh import load_mesh_arrays, mesh_to_shape, read_stl_shape
+        vertices, faces = load_mesh_arrays(file_path)
+        get_mesh_store().put(file_path, vertices, faces)
+        report(50, "Üçgenleme oluşturuluyor")
+        if ext == '.stl':
+            # STL, OCC'nin yerel okuyucusuyla doğrudan üçgenlemeye okunur (düğüm başına Python çağrısı yok)
+            shape = read_stl_shape(file_path)
+        else:
+            # Ara STL yazıp tekrar okumak yerine üçgenleme doğrudan dizilerden kurulur
+            shape = mesh_to_shape(vertices, faces)
+        result.update(kind='mesh', vertices=vertices, faces=faces)
+    elif ext in CAD_EXTS:
+        from mesh_cache import get_mesh_cache, file_content_hash
+        from occ_mesh import read_cad_file, shape_to_mesh_arrays, mesh_to_shape, preset_cache_tag, tessellate_shape
+        shape = None
+        content_hash = file_content_hash(file_path)
+        cache = get_mesh_cache()
+        cache_key = cache.key(file_path, preset_cache_tag(DISPLAY_PRESET), content_hash)
+        cached = cache.get(cache_key)
+        # Parça listesi sadece çok parçalı montajlar için yazılır: tessellation önbelleğinde kaydı olan
+        # tek parçalı bir STEP için XCAF okuması hiç yapılmaz
+        if ext in STEP_EXTS:
+            from step_assembly import has_assembly_manifest, open_step_assembly
+            if cached is None or has_assembly_manifest(file_path, content_hash):
+                parts = open_step_assembly(file_path, content_hash)
+                if len(parts) > 1:
+                    # Montaj: parçalar AssemblyPartWorker ile tek tek tessellate edilip gösterilir
+                    result.update(kind='assembly', parts=parts)
+                    report(85, "Montaj yapısı okundu")
+                    return result
+                if parts:
+                    shape = parts[0]["shape"]  # Tek parçalı dosya ikinci kez okunmaz
+        if cached is not None:
+            # Aynı içerik daha önce tessellate edildi: CAD ayrıştırması tamamen atlanır. Kesit gibi
+            # kesin B-rep gerektiren işlemler için dosya ilk istekte okunur (brep_source)
+            from functools import partial
+            vertices, faces = cached
+            get_mesh_store().put(file_path, vertices, faces)
+            report(50, "Önbellekten üçgenleme oluşturuluyor")
+            shape = mesh_to_shape(vertices, faces)
+            result.update(kind='mesh', vertices=vertices, faces=faces, brep_source=partial(read_cad_file, file_path))
+        else:
+            if shape is None:
+                shape = read_cad_file(file_path)
+            report(50, "Tessellation yapılıyor")
+            # AIS_Shape'in varsayılanından kaba olmayan, paralel tessellation; gösterimde yeniden mesh yapılmaz
+            tessellate_shape(shape, DISPLAY_PRESET)
+            report(75, "Önbelleğe yazılıyor")
+            try:
+                vertices, faces = shape_to_mesh_arrays(shape)
+                cache.put(cache_key, vertices, faces)
+                get_mesh_store().put(file_path, vertices, faces)
+            except ValueError as e:
+                logging.warning(f"Tessellation önbelleğe alınamadı: {file_path} - {e}")
+            result.update(kind='cad')
+    else:
+        raise ValueError(f"Desteklenmeyen dosya formatı: {ext}")
+
+    if shape is None:
+        raise ValueError("Model yüklenemedi veya desteklenmiyor.")
+    result["shape"] = shape
+    report(85, "Görüntülemeye hazır")
+    return result
+
+
+## \class ModelLoadSignals
+#  \brief ModelLoadWorker'ın ana iş parçacığına gönderdiği sinyaller.
+class ModelLoadSignals(QObject):
+    progress = pyqtSignal(str, int, str)  # dosya yolu, yüzde, aşama
+    finished = pyqtSignal(object)         # parse_model_file sonucu
+    failed = pyqtSignal(str, str)         # dosya yolu, hata mesajı
+    cancelled = pyqtSignal(str)           # dosya yolu
+
+
+## \class ModelLoadWorker
+#  \brief Tek bir model dosyasını QThreadPool üzerinde ayrıştıran işçi.
+#         Sadece AIS_Shape gösterimi ana iş parçacığında (finished sinyali ile) yapılır.
+class ModelLoadWorker(QRunnable):
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = ModelLoadSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """İptal ister. Çalışan OCC çağrısı bölünemez; iptal bir sonraki aşama sınırında uygulanır."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        try:
+            result = parse_model_file(
+                self.file_path,
+                progress=lambda value, stage: self.signals.progress.emit(self.file_path, value, stage),
+                is_cancelled=self.is_cancelled,
+            )
+            if self.is_cancelled():
+                raise LoadCancelled(self.file_path)
+            self.signals.finished.emit(result)
+        except LoadCancelled:
+            logging.info(f"Model yüklemesi iptal edildi: {self.file_path}")
+            self.signals.cancelled.emit(self.file_path)
+        except Exception as e:
+            logging.error(f"Model arka planda yüklenirken hata: {self.file_path} - {e}", exc_info=True)
+            self.signals.failed.emit(self.file_path, str(e))
+
+
+
+## \class AssemblyPartSignals
+#  \brief AssemblyPartWorker'ın ana iş parçacığına gönderdiği sinyaller.
+class AssemblyPartSignals(QObject):
+    definition_ready = pyqtSignal(object, list)  # step_assembly.load_step_definition sonucu, tanımın örnekleri
+    progress = pyqtSignal(int, int)              # hazır parça (örnek) sayısı, toplam parça sayısı
+    finished = pyqtSignal(list)                  # [(parça adı, hata mesajı)]
+
+
+## \class AssemblyPartWorker
+#  \brief Bir STEP montajının parça tanımlarını sırayla tessellate eder ve her tanımı örnekleriyle
+#         birlikte hazır olur olmaz yayınlar; böylece büyük montajlar tamamı beklenmeden parça parça
+#         ekrana gelir. Tekrar eden parçalar (aynı tanım) bir kez tessellate edilir; süre ve bellek
+#         toplam örnek sayısıyla değil benzersiz parça sayısıyla ölçeklenir.
+class AssemblyPartWorker(QRunnable):
+    def __init__(self, file_path, parts):
+        super().__init__()
+        self.file_path = file_path
+        self.parts = list(parts)
+        self.signals = AssemblyPartSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        from step_assembly import group_instances, load_step_definition
+        failures = []
+        done = 0
+        for first, instances in group_instances(self.parts):
+            if self.is_cancelled():
+                logging.info(f"Montaj yüklemesi iptal edildi: {self.file_path}")
+                break
+            try:
+                definition = load_step_definition(first)
+                self.signals.definition_ready.emit(definition, instances)
+            except Exception as e:
+                logging.error(f"Montaj parçası yüklenemedi: {self.file_path} / {first['name']} - {e}", exc_info=True)
+                failures.append((first["name"], str(e)))
+            done += len(instances)
+            self.signals.progress.emit(done, len(self.parts))
+        self.signals.finished.emit(failures)
+
+
+## \class DisplayLODSignals
+#  \brief DisplayLODWorker'ın ana iş parçacığına gönderdiği sinyaller.
+class DisplayLODSignals(QObject):
+    finished = pyqtSignal(object, list)  # model referansı, [(üçgen sayısı, TopoDS_Shape)] (inceden kabaya)
+
+
+## \class DisplayLODWorker
+#  \brief Büyük bir mesh katmanı için seyreltilmiş gösterim seviyelerini arka planda kurar.
+#         Seviyeler sadece kamera hareket ederken gösterilir; ölçümler her zaman tam çözünürlüklü
+#         veriyle (MeshStore) yapılır.
+class DisplayLODWorker(QRunnable):
+    def __init__(self, model_ref, vertices, faces):
+        super().__init__()
+        self.model_ref = model_ref
+        self.vertices = vertices
+        self.faces = faces
+        self.signals = DisplayLODSignals()
+
+    def run(self):
+        from occ_mesh import build_lod_pyramid, mesh_to_shape
+        try:
+            levels = [(len(faces), mesh_to_shape(vertices, faces))
+                      for vertices, faces in build_lod_pyramid(self.vertices, self.faces)]
+        except Exception as e:
+            logging.warning(f"Gösterim LOD seviyeleri kurulamadı: {e}")
+            levels = []
+        self.signals.finished.emit(self.model_ref, levels)
+
+
+## \class MeshPreloadSignals
+#  \brief MeshPreloadWorker'ın ana iş parçacığına gönderdiği sinyaller.
+class MeshPreloadSignals(QObject):
+    finished = pyqtSignal(str)       # dosya yolu
+    failed = pyqtSignal(str, str)    # dosya yolu, hata mesajı
+
+
+## \class MeshPreloadWorker
+#  \brief Dosyanın mesh'ini arka planda MeshStore'a yükler; bilgi paneli tam ölçümleri sonra gösterir.
+class MeshPreloadWorker(QRunnable):
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = MeshPreloadSignals()
+
+    def run(self):
+        try:
+            get_mesh_store().get(self.file_path)
+            self.signals.finished.emit(self.file_path)
+        except Exception as e:
+            logging.error(f"Model bilgisi için mesh yüklenemedi: {self.file_path} - {e}")
+            self.signals.failed.emit(self.file_path, str(e))
+
+
+## \fn create_load_pool(parent=None)
+#  \brief CPU sayısı kadar eşzamanlı işçi çalıştıran bir QThreadPool oluşturur.
+def create_load_pool(parent=None):
+    pool = QThreadPool(parent)
+    pool.setMaxThreadCount(max(1, os.cpu_count() or 1))
+    return pool
+
+
+## \class BatchModelLoader
+#  \brief Birden fazla dosyayı aynı havuzda eşzamanlı ayrıştırır, toplam ilerlemeyi
+#         tek bir değer olarak bildirir ve sonuçları dosyaların verildiği sırayla yayınlar.
+class BatchModelLoader(QObject):
+    progress = pyqtSignal(int, str)        # toplam yüzde, açıklama
+    model_ready = pyqtSignal(int, object)  # sıra, parse_model_file sonucu (sırayla)
+    finished = pyqtSignal(list)            # [(dosya yolu, hata mesajı)]
+
+    def __init__(self, file_paths, pool=None, parent=None):
+        super().__init__(parent)
+        self.file_paths = list(file_paths)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.failures = []
+        self._workers = []
+        self._file_progress = [0] * len(self.file_paths)
+        self._results = {}  # sıra -> sonuç (hata/iptal için None)
+        self._next_index = 0
+
+    def start(self):
+        if not self.file_paths:
+            self.finished.emit(self.failures)
+            return
+        for index, path in enumerate(self.file_paths):
+            worker = ModelLoadWorker(path)
+            worker.signals.progress.connect(lambda _path, value, _stage, i=index: self._on_progress(i, value))
+            worker.signals.finished.connect(lambda result, i=index: self._on_done(i, result))
+            worker.signals.failed.connect(lambda path, error, i=index: self._on_failed(i, path, error))
+            worker.signals.cancelled.connect(lambda _path, i=index: self._on_done(i, None))
+            self._workers.append(worker)
+            self.pool.start(worker)
+
+    def cancel(self):
+        for worker in self._workers:
+            worker.cancel()
+
+    def count(self):
+        return len(self.file_paths)
+
+    def percent(self):
+        if not self.file_paths:
+            return 100
+        return int(sum(self._file_progress) / len(self.file_paths))
+
+    def completed(self):
+        return sum(1 for value in self._file_progress if value >= 100)
+
+    def _on_progress(self, index, value):
+        self._file_progress[index] = max(self._file_progress[index], value)
+        self.progress.emit(self.percent(), f"{self.completed()}/{self.count()} dosya")
+
+    def _on_failed(self, index, path, error):
+        self.failures.append((path, error))
+        self._on_done(index, None)
+
+    def _on_done(self, index, result):
+        self._file_progress[index] = 100
+        self._results[index] = result
+        self.progress.emit(self.percent(), f"{self.completed()}/{self.count()} dosya")
+        # Katman sırası dosya sırasıyla aynı kalsın: sadece kesintisiz önek yayınlanır
+        while self._next_index in self._results:
+            ready = self._results.pop(self._next_index)
+            if ready is not None:
+                self.model_ready.emit(self._next_index, ready)
+            self._next_index += 1
+        if self._next_index == len(self.file_paths):
+            self.finished.emit(self.failures)
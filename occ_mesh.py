@@ -0,0 +1,299 @@
+## \file occ_mesh.py
+## \brief NumPy vertex/yüzey dizileri ile OpenCASCADE şekilleri arasında bellek içi dönüşümler.
+
+import numpy as np
+
+# Kalite ön ayarı -> (doğrusal sapma / sınır kutusu köşegeni, açısal sapma [radyan])
+# "display" AIS_Shape'in varsayılanlarından (en büyük boyutun %0.4'ü, 20°) daha kaba değildir;
+# böylece gösterim sırasında ana iş parçacığında yeniden mesh yapılmaz.
+TESSELLATION_PRESETS = {
+    'preview': (0.01, 0.8),
+    'display': (0.002, 0.35),
+    'export': (0.0005, 0.2),
+}
+MIN_DEFLECTION = 1e-4
+# Gösterim LOD piramidi: en uzun eksendeki kümeleme hücre sayıları (inceden kabaya)
+DISPLAY_LOD_RESOLUTIONS = (512, 192, 64)
+DISPLAY_LOD_MIN_REDUCTION = 0.5  # Bir seviye bir öncekinin en fazla bu oranı kadar üçgen içermiyorsa atlanır
+
+
+## \fn load_mesh_arrays(file_path)
+#  \brief Mesh dosyasını trimesh ile okur ve vertex/yüzey dizilerini döndürür.
+#  \return (vertices (N,3) float64, faces (M,3) int64)
+def load_mesh_arrays(file_path):
+    import trimesh
+    mesh = trimesh.load(file_path, force='mesh')
+    vertices = np.asarray(mesh.vertices, dtype=np.float64)
+    faces = np.asarray(mesh.faces, dtype=np.int64)
+    if len(vertices) == 0 or len(faces) == 0:
+        raise ValueError("Dosya okunamadı veya boş.")
+    return vertices, faces
+
+
+## \fn mesh_to_shape(vertices, faces)
+#  \brief Vertex/yüzey dizilerinden doğrudan bir Poly_Triangulation kurar ve onu taşıyan
+#         tek bir TopoDS_Face döndürür. Ara STL dosyası yazılmaz ve tekrar okunmaz.
+#  \param vertices (N,3) vertex koordinatları
+#  \param faces (M,3) sıfır tabanlı üçgen indeksleri
+#  \return Sadece üçgenleme içeren TopoDS_Face
+def mesh_to_shape(vertices, faces):
+    from OCC.Core.Poly import Poly_Triangulation, Poly_Triangle
+    from OCC.Core.gp import gp_Pnt
+
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    triangulation = Poly_Triangulation(len(vertices), len(faces), False)
+    # OCC düğüm ve üçgen indeksleri 1 tabanlıdır
+    for i, (x, y, z) in enumerate(vertices.tolist(), start=1):
+        triangulation.SetNode(i, gp_Pnt(x, y, z))
+    for i, (a, b, c) in enumerate((faces + 1).tolist(), start=1):
+        triangulation.SetTriangle(i, Poly_Triangle(a, b, c))
+    return _triangulation_face(triangulation)
+
+
+def _triangulation_face(triangulation):
+    from OCC.Core.BRep import BRep_Builder
+    from OCC.Core.TopoDS import TopoDS_Face
+    face = TopoDS_Face()
+    BRep_Builder().MakeFace(face, triangulation)
+    return face
+
+
+## \fn read_stl_shape(file_path)
+#  \brief STL dosyasını OCC'nin yerel okuyucusuyla (RWStl) doğrudan bir Poly_Triangulation'a okur.
+#         mesh_to_shape'in aksine düğüm ve üçgen başına Python çağrısı yapılmaz; süre sadece
+#         C++ ayrıştırmasıdır. Çakışan düğümler okuyucu tarafından birleştirilir.
+#  \return Sadece üçgenleme içeren TopoDS_Face
+def read_stl_shape(file_path):
+    from OCC.Core.RWStl import rwstl_ReadFile
+    triangulation = rwstl_ReadFile(file_path)
+    if triangulation is None or triangulation.NbTriangles() == 0:
+        raise ValueError("Dosya okunamadı veya boş.")
+    return _triangulation_face(triangulation)
+
+
+## \fn mesh_to_brep(vertices, faces)
+#  \brief Her üçgen için düzlemsel bir yüz oluşturarak Boolean işlemlerinde kullanılabilecek
+#         bir kabuk (shell) üretir. Yavaştır; sadece kesit gibi B-rep gerektiren işlemlerde çağrılır.
+#  \return TopoDS_Shape (kabuk)
+def mesh_to_brep(vertices, faces):
+    from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakePolygon, BRepBuilderAPI_MakeFace, BRepBuilderAPI_Sewing
+    from OCC.Core.gp import gp_Pnt
+
+    vertices = np.asarray(vertices, dtype=np.float64)
+    sewing = BRepBuilderAPI_Sewing()
+    for tri in np.asarray(faces, dtype=np.int64).tolist():
+        p1, p2, p3 = (gp_Pnt(*vertices[i].tolist()) for i in tri)
+        polygon = BRepBuilderAPI_MakePolygon(p1, p2, p3, True)
+        if not polygon.IsDone():
+            continue  # Dejenere üçgen
+        face = BRepBuilderAPI_MakeFace(polygon.Wire(), True)
+        if face.IsDone():
+            sewing.Add(face.Face())
+    sewing.Perform()
+    return sewing.SewedShape()
+
+
+## \fn read_cad_file(file_path)
+#  \brief STEP veya IGES dosyasını okur.
+#  \return TopoDS_Shape
+def read_cad_file(file_path):
+    from OCC.Extend.DataExchange import read_step_file, read_iges_file
+    if file_path.lower().endswith(('.step', '.stp')):
+        shape = read_step_file(file_path)
+    elif file_path.lower().endswith(('.iges', '.igs')):
+        shape = read_iges_file(file_path)
+    else:
+        raise ValueError(f"Desteklenmeyen CAD formatı: {file_path}")
+    if shape is None or shape.IsNull():
+        raise ValueError("Dosya okunamadı veya boş.")
+    return shape
+
+
+## \fn shape_to_mesh_arrays(shape)
+#  \brief Tessellate edilmiş bir şeklin yüz üçgenlemelerini (konumları uygulanmış olarak)
+#         tek bir vertex/yüzey dizisi çiftinde birleştirir.
+#  \return (vertices (N,3) float64, faces (M,3) int64)
+def shape_to_mesh_arrays(shape):
+    from OCC.Core.TopExp import TopExp_Explorer
+    from OCC.Core.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+    from OCC.Core.BRep import BRep_Tool
+    from OCC.Core.TopLoc import TopLoc_Location
+    from OCC.Core.TopoDS import topods
+
+    all_vertices = []
+    all_faces = []
+    offset = 0
+    explorer = TopExp_Explorer(shape, TopAbs_FACE)
+    while explorer.More():
+        face = topods.Face(explorer.Current())
+        explorer.Next()
+        location = TopLoc_Location()
+        triangulation = BRep_Tool.Triangulation(face, location)
+        if triangulation is None or triangulation.NbTriangles() == 0:
+            continue
+        trsf = location.Transformation()
+        nodes = []
+        for i in range(1, triangulation.NbNodes() + 1):
+            p = triangulation.Node(i).Transformed(trsf)
+            nodes.append((p.X(), p.Y(), p.Z()))
+        reversed_face = face.Orientation() == TopAbs_REVERSED
+        triangles = []
+        for i in range(1, triangulation.NbTriangles() + 1):
+            n1, n2, n3 = triangulation.Triangle(i).Get()
+            if reversed_face:
+                n2, n3 = n3, n2
+            triangles.append((n1, n2, n3))
+        all_vertices.append(np.asarray(nodes, dtype=np.float64))
+        all_faces.append(np.asarray(triangles, dtype=np.int64) - 1 + offset)
+        offset += len(nodes)
+
+    if not all_faces:
+        raise ValueError("Şekil üçgenlemesi bulunamadı.")
+    return np.concatenate(all_vertices), np.concatenate(all_faces)
+
+
+## \fn bounding_diagonal(shape)
+#  \brief Şeklin eksene hizalı sınır kutusunun köşegen uzunluğunu döndürür (boş şekil için 0).
+def bounding_diagonal(shape):
+    from OCC.Core.Bnd import Bnd_Box
+    from OCC.Core.BRepBndLib import brepbndlib_Add
+    bbox = Bnd_Box()
+    brepbndlib_Add(shape, bbox)
+    if bbox.IsVoid():
+        return 0.0
+    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
+    return float(np.linalg.norm([xmax - xmin, ymax - ymin, zmax - zmin]))
+
+
+## \fn preset_deflection(shape, preset)
+#  \brief Ön ayarın göreli sapmasını şeklin boyutuna ölçekler.
+#  \return (doğrusal sapma, açısal sapma)
+def preset_deflection(shape, preset):
+    relative, angular = TESSELLATION_PRESETS[preset]
+    return max(bounding_diagonal(shape) * relative, MIN_DEFLECTION), angular
+
+
+def _unique_solids(shape):
+    """Şeklin katılarını döndürür. Aynı parçanın farklı konumdaki kopyaları (aynı TShape) bir kez
+    listelenir; üçgenleme TShape'in yüzlerinde tutulduğundan tüm kopyalar için geçerli olur."""
+    from OCC.Core.TopAbs import TopAbs_SOLID
+    from OCC.Core.TopExp import TopExp_Explorer
+    from OCC.Core.TopLoc import TopLoc_Location
+    from OCC.Core.TopTools import TopTools_IndexedMapOfShape
+
+    solids = TopTools_IndexedMapOfShape()
+    explorer = TopExp_Explorer(shape, TopAbs_SOLID)
+    while explorer.More():
+        solids.Add(explorer.Current().Located(TopLoc_Location()))
+        explorer.Next()
+    return [solids.FindKey(i) for i in range(1, solids.Size() + 1)]
+
+
+def _mesh_part(part, preset):
+    from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+    linear, angular = preset_deflection(part, preset)
+    # isInParallel=True: OCC parçanın yüzlerini kendi iş parçacıklarında meshler (kurucu meshlemeyi yapar)
+    mesher = BRepMesh_IncrementalMesh(part, linear, False, angular, True)
+    return mesher.IsDone()
+
+
+## \fn tessellate_shape(shape, preset='display')
+#  \brief Şekli kalite ön ayarına göre tessellate eder. Sapma sabit bir mm değeri yerine
+#         parçanın sınır kutusu köşegenine göre ölçeklenir: büyük montajlar gereksiz yoğun,
+#         küçük parçalar kaba meshlenmez. Montajlardaki katılar kendi boyutlarına göre sırayla
+#         meshlenir; paralellik her katının içinde OCC'nin kendi iş parçacıklarıyla sağlanır.
+#         Katılar kenar ve yüz paylaşabildiğinden (BRepMesh paylaşılan kenarlara poligon yazar)
+#         ayrı katılar aynı anda meshlenmez.
+#  \param preset 'preview', 'display' veya 'export'
+#  \return Tessellate edilmiş şekil (aynı nesne)
+def tessellate_shape(shape, preset='display'):
+    if preset not in TESSELLATION_PRESETS:
+        raise ValueError(f"Bilinmeyen tessellation ön ayarı: {preset}")
+    solids = _unique_solids(shape)
+    if len(solids) > 1:
+        for solid in solids:
+            _mesh_part(solid, preset)
+    # Katı dışında kalan serbest yüzler / kabuklar (ve tek katılı şekiller) burada meshlenir;
+    # zaten meshlenmiş yüzler BRepMesh tarafından atlanır
+    if not _mesh_part(shape, preset):
+        raise ValueError("Şekil meshlenemedi.")
+    return shape
+
+
+## \fn preset_cache_tag(preset)
+#  \brief Ön ayarın tessellation önbelleği anahtarında kullanılan etiketi (değerler değişirse anahtar da değişir).
+def preset_cache_tag(preset):
+    relative, angular = TESSELLATION_PRESETS[preset]
+    return f"{preset}-rel{relative}-ang{angular}"
+
+
+## \fn load_cad_mesh_arrays(file_path, deflection=None, use_cache=True, preset='export')
+#  \brief STEP/IGES dosyasını tessellate eder ve vertex/yüzey dizilerini döndürür.
+#         Sonuç dosya içeriği + tolerans anahtarıyla diskte önbelleklenir.
+#  \param deflection Verilirse sabit doğrusal sapma kullanılır; verilmezse kalite ön ayarı
+#  \param preset 'preview', 'display' veya 'export' (boyuta göre ölçeklenen sapma)
+def load_cad_mesh_arrays(file_path, deflection=None, use_cache=True, preset='export'):
+    from mesh_cache import get_mesh_cache
+
+    tolerance_tag = f"abs{deflection}" if deflection is not None else preset_cache_tag(preset)
+    cache = get_mesh_cache() if use_cache else None
+    key = cache.key(file_path, tolerance_tag) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    shape = read_cad_file(file_path)
+    if deflection is not None:
+        from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+        BRepMesh_IncrementalMesh(shape, deflection, False, 0.5, True)  # Kurucu meshlemeyi yapar
+    else:
+        tessellate_shape(shape, preset)
+    vertices, faces = shape_to_mesh_arrays(shape)
+    if cache is not None:
+        cache.put(key, vertices, faces)
+    return vertices, faces
+
+
+## \fn cluster_decimate(vertices, faces, resolution)
+#  \brief Vertexleri düzgün bir ızgarada kümeleyerek mesh'i seyreltir (vertex clustering).
+#  \param resolution En uzun eksendeki hücre sayısı
+#  \return (vertices, faces) seyreltilmiş diziler
+def cluster_decimate(vertices, faces, resolution):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    lower = vertices.min(axis=0)
+    cell = max(float((vertices.max(axis=0) - lower).max()) / resolution, 1e-12)
+    cells = np.floor((vertices - lower) / cell).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    _, inverse = np.unique(keys, return_inverse=True)
+    # Her hücrenin vertexi, hücredeki vertexlerin ortalamasıdır
+    counts = np.bincount(inverse)
+    clustered = np.column_stack([np.bincount(inverse, weights=vertices[:, k]) for k in range(3)]) / counts[:, None]
+
+    remapped = inverse[faces]
+    keep = (remapped[:, 0] != remapped[:, 1]) & (remapped[:, 1] != remapped[:, 2]) & (remapped[:, 0] != remapped[:, 2])
+    remapped = remapped[keep]
+    # Aynı üç hücreye düşen üçgenlerden sadece ilki tutulur
+    _, first = np.unique(np.sort(remapped, axis=1), axis=0, return_index=True)
+    remapped = remapped[np.sort(first)]
+    used, compact = np.unique(remapped, return_inverse=True)
+    return clustered[used], compact.reshape(-1, 3)
+
+
+## \fn build_lod_pyramid(vertices, faces, resolutions=DISPLAY_LOD_RESOLUTIONS)
+#  \brief Mesh'in vertex kümelemeyle seyreltilmiş kaba kopyalarını inceden kabaya üretir.
+#         Bir öncekine göre yeterince küçülmeyen seviyeler atlanır.
+#  \return [(vertices, faces)] (tam çözünürlük dahil değildir)
+def build_lod_pyramid(vertices, faces, resolutions=DISPLAY_LOD_RESOLUTIONS):
+    levels = []
+    previous = len(faces)
+    for resolution in resolutions:
+        level_vertices, level_faces = cluster_decimate(vertices, faces, resolution)
+        if len(level_faces) == 0 or len(level_faces) > previous * DISPLAY_LOD_MIN_REDUCTION:
+            continue
+        levels.append((level_vertices, level_faces))
+        previous = len(level_faces)
+    return levels
@@ -0,0 +1,252 @@
+## \file picking.py
+## \brief Ölçüm araçları için vektörleştirilmiş seçim yardımcıları.
+##
+## Eskiden her vertex/kenar/yüzey için ayrı ayrı View.Project çağrılıyordu. Burada kameranın
+## görünüm ve izdüşüm matrisleri bir kez okunur ve tüm noktalar tek bir NumPy matris
+## çarpımıyla piksel koordinatlarına çevrilir. Asıl seçim ise MeshBVH ile pikselden geçen
+## ışının ilk çarptığı üçgen bulunarak yapılır; böylece arkada kalan vertexler seçilmez.
+
+import numpy as np
+
+
+def _mat4_to_numpy(mat):
+    """Graphic3d_Mat4d nesnesini 4x4 NumPy dizisine çevirir."""
+    return np.array([[mat.GetValue(row, col) for col in range(4)] for row in range(4)], dtype=np.float64)
+
+
+## \class ScreenProjector
+#  \brief Dünya koordinatlarındaki noktaları tek seferde ekran piksellerine izdüşürür.
+class ScreenProjector:
+    ## \brief Kameranın matrislerini bir kez okur.
+    #  \param view V3d_View nesnesi
+    #  \param width Görüntüleyici genişliği (piksel, fare olaylarıyla aynı birimde)
+    #  \param height Görüntüleyici yüksekliği (piksel)
+    def __init__(self, view, width, height):
+        self.view = view
+        self.width = float(width)
+        self.height = float(height)
+        self.matrix = None
+        try:
+            camera = view.Camera()
+            self.matrix = _mat4_to_numpy(camera.ProjectionMatrix()) @ _mat4_to_numpy(camera.OrientationMatrix())
+        except Exception:
+            # Matrisler okunamazsa nokta başına V3d_View.Convert kullanılır (yavaş yol)
+            self.matrix = None
+
+    ## \brief Noktaları piksel koordinatlarına izdüşürür.
+    #  \param points (N,3) dünya koordinatları
+    #  \return ((N,2) piksel koordinatları, (N,) kameranın önünde olup olmadığı maskesi)
+    def project(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if self.matrix is None:
+            pixels = np.array([self.view.Convert(float(x), float(y), float(z))[:2] for x, y, z in points],
+                              dtype=np.float64).reshape(-1, 2)
+            return pixels, np.ones(len(points), dtype=bool)
+        homogeneous = np.hstack([points, np.ones((len(points), 1))])
+        clip = homogeneous @ self.matrix.T
+        w = clip[:, 3]
+        visible = w > 1e-12
+        safe_w = np.where(visible, w, 1.0)
+        ndc_x = clip[:, 0] / safe_w
+        ndc_y = clip[:, 1] / safe_w
+        pixels = np.empty((len(points), 2), dtype=np.float64)
+        pixels[:, 0] = (ndc_x + 1.0) * 0.5 * self.width
+        pixels[:, 1] = (1.0 - ndc_y) * 0.5 * self.height
+        return pixels, visible
+
+    ## \brief Pikselden geçen kamera ışınını dünya koordinatlarında döndürür.
+    #  \return (başlangıç noktası (3,), yön (3,)); başlangıç yakın kesme düzlemindedir
+    def ray(self, x, y):
+        if self.matrix is None:
+            px, py, pz, vx, vy, vz = self.view.ConvertWithProj(int(x), int(y))
+            return np.array([px, py, pz], dtype=np.float64), np.array([vx, vy, vz], dtype=np.float64)
+        ndc_x = 2.0 * x / self.width - 1.0
+        ndc_y = 1.0 - 2.0 * y / self.height
+        inverse = np.linalg.inv(self.matrix)
+        near = inverse @ np.array([ndc_x, ndc_y, -1.0, 1.0])
+        far = inverse @ np.array([ndc_x, ndc_y, 1.0, 1.0])
+        near = near[:3] / near[3]
+        far = far[:3] / far[3]
+        return near, far - near
+
+    ## \brief Tıklanan piksele ekranda en yakın noktayı bulur.
+    #  \param points (N,3) dünya koordinatları
+    #  \param x Tıklama x pikseli
+    #  \param y Tıklama y pikseli
+    #  \return (en yakın noktanın indeksi, piksel cinsinden kare uzaklık) veya (None, inf)
+    def nearest(self, points, x, y):
+        if len(points) == 0:
+            return None, float('inf')
+        pixels, visible = self.project(points)
+        dist2 = (pixels[:, 0] - x) ** 2 + (pixels[:, 1] - y) ** 2
+        dist2[~visible] = np.inf
+        idx = int(np.argmin(dist2))
+        if not np.isfinite(dist2[idx]):
+            return None, float('inf')
+        return idx, float(dist2[idx])
+
+
+## \fn edge_midpoints(vertices, edges)
+#  \brief Kenar orta noktalarını vektörel olarak hesaplar.
+def edge_midpoints(vertices, edges):
+    edges = np.asarray(edges)
+    return (vertices[edges[:, 0]] + vertices[edges[:, 1]]) * 0.5
+
+
+## \fn face_centroids(vertices, faces)
+#  \brief Üçgen ağırlık merkezlerini vektörel olarak hesaplar.
+def face_centroids(vertices, faces):
+    return vertices[np.asarray(faces)].mean(axis=1)
+
+
+## \fn trsf_to_matrix(trsf)
+#  \brief gp_Trsf dönüşümünü (ölçek dahil) 4x4 NumPy matrisine çevirir.
+def trsf_to_matrix(trsf):
+    matrix = np.eye(4, dtype=np.float64)
+    for row in range(3):
+        for col in range(4):
+            matrix[row, col] = trsf.Value(row + 1, col + 1)
+    return matrix
+
+
+## \fn transform_points(points, matrix)
+#  \brief (N,3) noktalara 4x4 dönüşüm matrisini tek bir matris çarpımıyla uygular.
+def transform_points(points, matrix):
+    points = np.asarray(points, dtype=np.float64)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def _spread_bits(values):
+    """10 bitlik tamsayıların bitlerini 3D Morton kodu için ikişer bit aralıkla yayar."""
+    values = values & 0x3ff
+    values = (values | (values << 16)) & 0x30000ff
+    values = (values | (values << 8)) & 0x300f00f
+    values = (values | (values << 4)) & 0x30c30c3
+    values = (values | (values << 2)) & 0x9249249
+    return values
+
+
+## \class MeshBVH
+#  \brief Üçgenler üzerinde sınırlayıcı hacim hiyerarşisi (BVH) ve ışın-üçgen kesişimi.
+#
+#  Üçgenler ağırlık merkezlerinin Morton koduna göre sıralanır, LEAF_SIZE'lık yapraklara
+#  bölünür ve yapraklar ikişer ikişer birleştirilerek tam bir ikili ağaç kurulur. Kurulum
+#  tamamen vektörleştirilmiştir; gezinme her seviyede sadece ışının kestiği düğümleri tutar.
+#  Ağaç modelin yerel koordinatlarında kurulur; katmanın dönüşümü ışına uygulandığından
+#  model taşındığında veya döndürüldüğünde yeniden kurulması gerekmez.
+class MeshBVH:
+    LEAF_SIZE = 8
+
+    def __init__(self, vertices, faces, leaf_size=LEAF_SIZE):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        faces = np.asarray(faces, dtype=np.int64)
+        self.leaf_size = leaf_size
+        self.face_count = len(faces)
+        if self.face_count == 0:
+            raise ValueError("BVH için üçgen bulunamadı.")
+
+        triangles = self.vertices[faces]
+        tri_min = triangles.min(axis=1)
+        tri_max = triangles.max(axis=1)
+        centers = (tri_min + tri_max) * 0.5
+        low = centers.min(axis=0)
+        span = np.maximum(centers.max(axis=0) - low, 1e-12)
+        grid = ((centers - low) / span * 1023).astype(np.int64)
+        codes = (_spread_bits(grid[:, 0]) << 2) | (_spread_bits(grid[:, 1]) << 1) | _spread_bits(grid[:, 2])
+        self.order = np.argsort(codes, kind='stable')
+        self.sorted_faces = faces[self.order]
+
+        # Yaprak kutuları; yaprak sayısı ikinin kuvvetine boş kutularla tamamlanır
+        starts = np.arange(0, self.face_count, leaf_size)
+        leaf_min = np.minimum.reduceat(tri_min[self.order], starts, axis=0)
+        leaf_max = np.maximum.reduceat(tri_max[self.order], starts, axis=0)
+        padded = 1 << int(np.ceil(np.log2(len(starts)))) if len(starts) > 1 else 1
+        if padded > len(starts):
+            pad = padded - len(starts)
+            leaf_min = np.vstack([leaf_min, np.full((pad, 3), np.inf)])
+            leaf_max = np.vstack([leaf_max, np.full((pad, 3), -np.inf)])
+
+        # levels[0] kök, levels[-1] yapraklar; i. düğümün çocukları 2i ve 2i+1'dir
+        self.levels = [(leaf_min, leaf_max)]
+        while len(self.levels[0][0]) > 1:
+            child_min, child_max = self.levels[0]
+            self.levels.insert(0, (np.minimum(child_min[0::2], child_min[1::2]),
+                                   np.maximum(child_max[0::2], child_max[1::2])))
+
+    @staticmethod
+    def _slab_hits(box_min, box_max, origin, inv_direction):
+        t1 = (box_min - origin) * inv_direction
+        t2 = (box_max - origin) * inv_direction
+        t_near = np.minimum(t1, t2).max(axis=1)
+        t_far = np.maximum(t1, t2).min(axis=1)
+        return (t_near <= t_far) & (t_far >= 0) & np.all(box_min <= box_max, axis=1)
+
+    ## \brief Işının çarptığı ilk üçgeni bulur.
+    #  \param origin Işının başlangıcı (dünya koordinatları)
+    #  \param direction Işının yönü (dünya koordinatları)
+    #  \param transform Modelin yerelden dünyaya 4x4 dönüşüm matrisi (opsiyonel)
+    #  \return (üçgen indeksi, yerel koordinatlarda çarpma noktası) veya None
+    def intersect(self, origin, direction, transform=None):
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        if transform is not None:
+            inverse = np.linalg.inv(transform)
+            origin = inverse[:3, :3] @ origin + inverse[:3, 3]
+            direction = inverse[:3, :3] @ direction
+        safe_direction = np.where(np.abs(direction) > 1e-30, direction, np.copysign(1e-30, direction))
+        inv_direction = 1.0 / safe_direction
+
+        nodes = np.zeros(1, dtype=np.int64)
+        for depth, (box_min, box_max) in enumerate(self.levels):
+            if depth > 0:
+                nodes = np.concatenate([nodes * 2, nodes * 2 + 1])
+            nodes = nodes[self._slab_hits(box_min[nodes], box_max[nodes], origin, inv_direction)]
+            if len(nodes) == 0:
+                return None
+
+        candidates = (nodes[:, None] * self.leaf_size + np.arange(self.leaf_size)).ravel()
+        candidates = candidates[candidates < self.face_count]
+        if len(candidates) == 0:
+            return None
+        t = self._intersect_triangles(self.sorted_faces[candidates], origin, direction)
+        best = int(np.argmin(t))
+        if not np.isfinite(t[best]):
+            return None
+        return int(self.order[candidates[best]]), origin + t[best] * direction
+
+    def _intersect_triangles(self, faces, origin, direction):
+        """Möller-Trumbore; kesişmeyen üçgenler için inf döndürür (iki yüz de seçilebilir)."""
+        v0 = self.vertices[faces[:, 0]]
+        edge1 = self.vertices[faces[:, 1]] - v0
+        edge2 = self.vertices[faces[:, 2]] - v0
+        p = np.cross(direction, edge2)
+        det = np.einsum('ij,ij->i', edge1, p)
+        valid = det != 0
+        inv_det = 1.0 / np.where(valid, det, 1.0)
+        s = origin - v0
+        u = np.einsum('ij,ij->i', s, p) * inv_det
+        q = np.cross(s, edge1)
+        v = (q @ direction) * inv_det
+        t = np.einsum('ij,ij->i', edge2, q) * inv_det
+        tolerance = 1e-9
+        valid &= (u >= -tolerance) & (v >= -tolerance) & (u + v <= 1 + tolerance) & (t >= 0)
+        return np.where(valid, t, np.inf)
+
+
+## \fn nearest_corner(vertices, face, point)
+#  \brief Üçgenin çarpma noktasına en yakın köşesinin vertex indeksini döndürür.
+def nearest_corner(vertices, face, point):
+    corners = vertices[np.asarray(face)]
+    return int(face[int(np.argmin(np.linalg.norm(corners - point, axis=1)))])
+
+
+## \fn nearest_face_edge(vertices, face, point)
+#  \brief Üçgenin çarpma noktasına en yakın kenarının yerel sırasını (0: v0-v1, 1: v1-v2, 2: v2-v0) döndürür.
+def nearest_face_edge(vertices, face, point):
+    start = vertices[np.asarray(face)]
+    end = np.roll(start, -1, axis=0)
+    segment = end - start
+    length2 = np.maximum(np.einsum('ij,ij->i', segment, segment), 1e-30)
+    along = np.clip(np.einsum('ij,ij->i', point - start, segment) / length2, 0.0, 1.0)
+    closest = start + along[:, None] * segment
+    return int(np.argmin(np.linalg.norm(closest - point, axis=1)))
@@ -0,0 +1,308 @@
+## \file step_assembly.py
+## \brief STEP montajlarını XCAF belgesi üzerinden parça parça okuyan yardımcılar.
+##
+## `read_step_file` tüm montajı tek bir birleşik şekil olarak döndürür; parça adları, renkleri ve
+## montaj yapısı kaybolur. Burada STEPCAFControl_Reader ile montaj ağacı gezilir ve her yaprak parça
+## konumuyla ayrı bir örnek olarak listelenir. Aynı parça tanımına (ör. tekrar eden cıvatalar) bağlı
+## örnekler bir kez tessellate edilir ve arayüzde aynı sunumu paylaşan dönüşümlü referanslar olarak
+## gösterilir. Her tanımın mesh'i önbellek dizininde ayrı bir STL olarak tutulur, böylece ölçüm,
+## dönüştürme ve model bilgisi parçalar için de dosya yolu üzerinden aynı şekilde çalışır.
+
+import os
+import re
+import json
+import logging
+import threading
+import numpy as np
+
+STEP_EXTS = ('.step', '.stp')
+PARTS_DIR = os.path.join(os.path.expanduser("~"), ".boxr_cad_cache", "parts")
+MANIFEST_NAME = "parts.json"
+PART_TESSELLATION_PRESET = 'display'
+
+_breps = {}  # (dosya yolu, imza) -> {tanım: konumsuz B-rep}; sadece son okunan montaj tutulur
+_breps_lock = threading.Lock()
+
+
+def _label_name(label):
+    try:
+        name = label.GetLabelName()
+    except Exception:
+        return ""
+    # Adsız bileşenler bazı dosyalarda "=>[0:1:1:2]" gibi referans metniyle gelir
+    return "" if not name or name.startswith("=>") else name
+
+
+def _label_color(color_tool, label):
+    from OCC.Core.Quantity import Quantity_Color
+    from OCC.Core.XCAFDoc import XCAFDoc_ColorSurf, XCAFDoc_ColorGen
+    color = Quantity_Color()
+    for color_type in (XCAFDoc_ColorSurf, XCAFDoc_ColorGen):
+        if color_tool.GetColor(label, color_type, color):
+            return (color.Red(), color.Green(), color.Blue())
+    return None
+
+
+def _label_entry(label):
+    from OCC.Core.TDF import TDF_Tool
+    from OCC.Core.TCollection import TCollection_AsciiString
+    entry = TCollection_AsciiString()
+    TDF_Tool.Entry(label, entry)
+    return entry.ToCString()
+
+
+## \fn location_matrix(location)
+#  \brief TopLoc_Location'ı satır sıralı 3x4 matrisin 12 değerine çevirir (JSON'a yazılabilir).
+def location_matrix(location):
+    trsf = location.Transformation()
+    return [trsf.Value(row, col) for row in range(1, 4) for col in range(1, 5)]
+
+
+## \fn matrix_to_trsf(matrix)
+#  \brief location_matrix çıktısından gp_Trsf kurar.
+def matrix_to_trsf(matrix):
+    from OCC.Core.gp import gp_Trsf
+    trsf = gp_Trsf()
+    trsf.SetValues(*matrix)
+    return trsf
+
+
+## \fn transform_vertices(vertices, matrix)
+#  \brief Vertex dizisine 3x4 dönüşüm matrisini uygular.
+def transform_vertices(vertices, matrix):
+    m = np.asarray(matrix, dtype=np.float64).reshape(3, 4)
+    return np.asarray(vertices, dtype=np.float64) @ m[:, :3].T + m[:, 3]
+
+
+## \fn read_step_parts(file_path)
+#  \brief STEP dosyasını XCAF belgesine okur ve montaj ağacının yaprak parçalarını (örneklerini) döndürür.
+#         Bileşen (örnek) adı ve rengi, tanımın ad ve renginden önceliklidir; rengi olmayan
+#         parçalar üst montajın rengini alır. Aynı parça tanımına bağlı örnekler aynı "definition"
+#         anahtarını ve aynı "prototype" şeklini (konumsuz) paylaşır.
+#  \return [{"index", "name", "color" ((r, g, b) veya None), "definition", "prototype",
+#            "matrix" (örneğin 3x4 konumu), "shape" (konumlu TopoDS_Shape)}]
+def read_step_parts(file_path):
+    from OCC.Core.STEPCAFControl import STEPCAFControl_Reader
+    from OCC.Core.IFSelect import IFSelect_RetDone
+    from OCC.Core.TDocStd import TDocStd_Document
+    from OCC.Core.TCollection import TCollection_ExtendedString
+    from OCC.Core.XCAFDoc import XCAFDoc_DocumentTool
+    from OCC.Core.TDF import TDF_LabelSequence, TDF_Label
+    from OCC.Core.TopLoc import TopLoc_Location
+
+    document = TDocStd_Document(TCollection_ExtendedString("boxr-step"))
+    shape_tool = XCAFDoc_DocumentTool.ShapeTool(document.Main())
+    color_tool = XCAFDoc_DocumentTool.ColorTool(document.Main())
+
+    reader = STEPCAFControl_Reader()
+    reader.SetNameMode(True)
+    reader.SetColorMode(True)
+    if reader.ReadFile(file_path) != IFSelect_RetDone:
+        raise ValueError("STEP dosyası okunamadı.")
+    if not reader.Transfer(document):
+        raise ValueError("STEP montajı aktarılamadı.")
+
+    parts = []
+    prototypes = {}  # tanım etiketi -> konumsuz şekil (örnekler aynı TShape'i paylaşır)
+
+    def walk(label, location, name, color):
+        if shape_tool.IsAssembly(label):
+            components = TDF_LabelSequence()
+            shape_tool.GetComponents(label, components)
+            for i in range(1, components.Length() + 1):
+                component = components.Value(i)
+                referred = TDF_Label()
+                if not shape_tool.GetReferredShape(component, referred):
+                    continue
+                walk(referred,
+                     location.Multiplied(shape_tool.GetLocation(component)),
+                     _label_name(component) or _label_name(referred) or name,
+                     _label_color(color_tool, component) or _label_color(color_tool, referred) or color)
+            return
+        shape = shape_tool.GetShape(label)
+        if shape is None or shape.IsNull():
+            return
+        definition = _label_entry(label)
+        if definition not in prototypes:
+            prototypes[definition] = shape.Located(TopLoc_Location())
+        located = shape.Moved(location)
+        parts.append({
+            "index": len(parts),
+            "name": name or f"Parça {len(parts) + 1}",
+            "color": color,
+            "definition": definition,
+            "prototype": prototypes[definition],
+            "matrix": location_matrix(located.Location()),
+            "shape": located,
+        })
+
+    free_labels = TDF_LabelSequence()
+    shape_tool.GetFreeShapes(free_labels)
+    for i in range(1, free_labels.Length() + 1):
+        label = free_labels.Value(i)
+        walk(label, TopLoc_Location(), _label_name(label), _label_color(color_tool, label))
+    return parts
+
+
+## \fn assembly_cache_dir(file_path, content_hash=None)
+#  \brief Dosya içeriğine göre parça tanımı STL'lerinin ve parça listesinin tutulduğu dizin.
+def assembly_cache_dir(file_path, content_hash=None):
+    from mesh_cache import file_content_hash
+    return os.path.join(PARTS_DIR, (content_hash or file_content_hash(file_path))[:32])
+
+
+## \fn has_assembly_manifest(file_path, content_hash=None)
+#  \brief Dosyanın çok parçalı bir montaj olarak önbelleğe alınıp alınmadığını (XCAF okumadan) söyler.
+#         Parça listesi sadece birden fazla parçalı dosyalar için yazılır.
+def has_assembly_manifest(file_path, content_hash=None):
+    return os.path.exists(os.path.join(assembly_cache_dir(file_path, content_hash), MANIFEST_NAME))
+
+
+def _definition_file_name(number, name):
+    safe = re.sub(r"[^\w.-]+", "_", name).strip("_")[:40] or "part"
+    return f"{number:04d}_{safe}.stl"
+
+
+def _read_manifest(part_dir):
+    """Önbellekteki parça listesini döndürür; liste yoksa, eski biçimdeyse veya bir tanımın STL'i eksikse None."""
+    try:
+        with open(os.path.join(part_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            parts = json.load(f)["parts"]
+        for part in parts:
+            part["file_path"] = os.path.join(part_dir, part.pop("file"))
+            if "definition" not in part or len(part["matrix"]) != 12 or not os.path.exists(part["file_path"]):
+                return None
+            part["color"] = tuple(part["color"]) if part.get("color") else None
+            part.update(prototype=None, shape=None)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return parts
+
+
+def _write_manifest(part_dir, parts):
+    entries = [{"index": p["index"], "name": p["name"], "color": p["color"], "definition": p["definition"],
+                "matrix": p["matrix"], "file": os.path.basename(p["file_path"])}
+               for p in parts]
+    tmp_path = os.path.join(part_dir, f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"parts": entries}, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(part_dir, MANIFEST_NAME))
+
+
+## \fn open_step_assembly(file_path, content_hash=None)
+#  \brief Montajın parça listesini döndürür. Aynı montaj daha önce açıldıysa ve tüm tanım STL'leri
+#         önbellekteyse XCAF ayrıştırması tamamen atlanır ("prototype" ve "shape" None olur).
+#         Tek parçalı dosyalar için parça listesi yazılmaz; onlar tessellation önbelleğinden açılır.
+#  \return Parça sözlükleri; her birinde ayrıca "file_path" (parça tanımının STL yolu) bulunur.
+#          Aynı tanımın örnekleri aynı dosyayı paylaşır
+def open_step_assembly(file_path, content_hash=None):
+    part_dir = assembly_cache_dir(file_path, content_hash)
+    cached = _read_manifest(part_dir)
+    if cached is not None:
+        return cached
+    parts = read_step_parts(file_path)
+    if len(parts) <= 1:
+        return parts
+    os.makedirs(part_dir, exist_ok=True)
+    files = {}
+    for part in parts:
+        if part["definition"] not in files:
+            files[part["definition"]] = os.path.join(part_dir, _definition_file_name(len(files), part["name"]))
+        part["file_path"] = files[part["definition"]]
+    try:
+        _write_manifest(part_dir, parts)
+    except OSError as e:
+        logging.warning(f"Montaj parça listesi önbelleğe yazılamadı: {file_path} - {e}")
+    return parts
+
+
+## \fn load_definition_brep(file_path, definition)
+#  \brief Önbellekten açılmış (B-rep'i olmayan) bir parça tanımının kesin B-rep şeklini döndürür.
+#         Kesit ve STEP'e aktarma gibi B-rep gerektiren işlemler için STEP dosyası ilk istekte
+#         XCAF ile yeniden okunur; aynı montajın diğer parçaları bu okumayı paylaşır.
+#  \return Konumsuz TopoDS_Shape veya tanım dosyada bulunamazsa None
+def load_definition_brep(file_path, definition):
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _breps_lock:
+        if key not in _breps:
+            _breps.clear()
+            _breps[key] = {part["definition"]: part["prototype"] for part in read_step_parts(file_path)}
+        return _breps[key].get(definition)
+
+
+## \fn group_instances(parts)
+#  \brief Parçaları tanıma göre gruplar; her tanım bir kez tessellate edilip tek sunumla gösterilir.
+#         Örneklerin farklı renkleri tanımı bölmez, renk örnek başına uygulanır.
+#  \return [(ilk örnek, [örnekler])] (gruplar ilk örneklerinin sırasıyla)
+def group_instances(parts):
+    groups = {}
+    for part in parts:
+        groups.setdefault(part["definition"], []).append(part)
+    return [(instances[0], instances) for instances in groups.values()]
+
+
+## \fn load_step_definition(part)
+#  \brief Bir parça tanımını gösterime hazırlar: prototip şekil varsa tessellate eder ve mesh'ini
+#         (tanımın kendi koordinatlarında) STL'ine yazar, yoksa önbellekteki STL'den üçgenlemeyi kurar.
+#         Tanımın tüm örnekleri bu tek üçgenlemeyi paylaşır. Qt'ye dokunmaz.
+#  \return {"file_path", "shape" (konumsuz), "kind" ('cad' veya 'mesh'), "vertices", "faces"}
+def load_step_definition(part):
+    from occ_mesh import load_mesh_arrays, read_stl_shape, shape_to_mesh_arrays, tessellate_shape
+    from stl_writer import write_stl
+    from mesh_store import get_mesh_store
+
+    file_path = part["file_path"]
+    prototype = part.get("prototype")
+    if prototype is None or os.path.exists(file_path):
+        vertices, faces = load_mesh_arrays(file_path)
+        prototype, kind = read_stl_shape(file_path), 'mesh'
+    else:
+        tessellate_shape(prototype, PART_TESSELLATION_PRESET)
+        vertices, faces = shape_to_mesh_arrays(prototype)
+        write_stl(file_path, vertices, faces, name=part["name"])
+        kind = 'cad'
+    get_mesh_store().put(file_path, vertices, faces)
+    return {"file_path": file_path, "shape": prototype, "kind": kind, "vertices": vertices, "faces": faces}
+
+
+## \fn instance_stats(groups)
+#  \brief Birleşik mesh kurmadan montajın vertex/yüzey sayılarını ve sınırlarını hesaplar. Her tanımın
+#         sınır kutusunun köşeleri örneklerin konumlarıyla taşınır; döndürülmüş örneklerde sonuç
+#         gerçek sınırları kapsayan (biraz büyük olabilen) kutudur.
+#  \param groups [(tanım vertexleri, tanım yüzleri, [örnek matrisleri])]
+#  \return {"vertices", "faces", "bounds" ((min, max) veya None), "extents" (veya None)}
+def instance_stats(groups):
+    stats = {"vertices": 0, "faces": 0, "bounds": None, "extents": None}
+    corners = []
+    for vertices, faces, matrices in groups:
+        stats["vertices"] += len(vertices) * len(matrices)
+        stats["faces"] += len(faces) * len(matrices)
+        if len(vertices) == 0:
+            continue
+        lower, upper = np.min(vertices, axis=0), np.max(vertices, axis=0)
+        box = np.array([[x, y, z] for x in (lower[0], upper[0]) for y in (lower[1], upper[1])
+                        for z in (lower[2], upper[2])])
+        corners.extend(transform_vertices(box, matrix) for matrix in matrices)
+    if corners:
+        points = np.concatenate(corners)
+        stats["bounds"] = (points.min(axis=0), points.max(axis=0))
+        stats["extents"] = stats["bounds"][1] - stats["bounds"][0]
+    return stats
+
+
+## \fn merge_instance_meshes(groups)
+#  \brief Tanım mesh'lerini örneklerin konumlarıyla dünya koordinatlarında tek bir vertex/yüzey dizisinde
+#         birleştirir. Bellek toplam örnek sayısıyla büyüdüğünden sadece dışa aktarmada kurulur ve
+#         saklanmaz; ölçüm örnek başına yapılır.
+#  \param groups [(tanım vertexleri, tanım yüzleri, [örnek matrisleri])]
+def merge_instance_meshes(groups):
+    all_vertices, all_faces = [], []
+    offset = 0
+    for vertices, faces, matrices in groups:
+        faces = np.asarray(faces, dtype=np.int64)
+        for matrix in matrices:
+            all_vertices.append(transform_vertices(vertices, matrix))
+            all_faces.append(faces + offset)
+            offset += len(all_vertices[-1])
+    return np.concatenate(all_vertices), np.concatenate(all_faces)
@@ -0,0 +1,82 @@
+## \file stl_writer.py
+## \brief Üçgen dizilerinden doğrudan, parça parça STL yazan ortak yazıcı.
+##
+## Kesit kaydetme, yazıcıya gönderme ve dönüştürücünün STL çıktıları bu modülü kullanır.
+## Varsayılan biçim ikilidir (üçgen başına 50 bayt); ASCII sadece açıkça istendiğinde yazılır.
+
+import os
+import numpy as np
+
+STL_CHUNK_TRIANGLES = 1 << 16  # Bellekte aynı anda tutulan en fazla üçgen sayısı
+
+_BINARY_RECORD = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+_ASCII_FACET = (
+    "  facet normal %e %e %e\n"
+    "    outer loop\n"
+    "      vertex %e %e %e\n"
+    "      vertex %e %e %e\n"
+    "      vertex %e %e %e\n"
+    "    endloop\n"
+    "  endfacet\n"
+)
+
+
+def _facet_chunks(vertices, faces, chunk_size):
+    """(normaller, üçgen köşeleri) çiftlerini chunk_size'lık parçalar halinde üretir."""
+    for start in range(0, len(faces), chunk_size):
+        triangles = vertices[faces[start:start + chunk_size]]
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+        yield normals, triangles
+
+
+## \fn write_stl(file_path, vertices, faces, ascii=False, name="boxr_cad", chunk_size=STL_CHUNK_TRIANGLES)
+#  \brief Vertex/yüzey dizilerini STL dosyasına yazar.
+#  \param file_path Hedef dosya yolu
+#  \param vertices (N,3) vertex koordinatları
+#  \param faces (M,3) sıfır tabanlı üçgen indeksleri
+#  \param ascii True ise ASCII STL yazılır (büyük ve yavaş; sadece gerektiğinde)
+#  \param name ASCII 'solid' adı / ikili başlık metni
+#  \return Yazılan üçgen sayısı
+def write_stl(file_path, vertices, faces, ascii=False, name="boxr_cad", chunk_size=STL_CHUNK_TRIANGLES):
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        if ascii:
+            with open(tmp_path, "w", encoding="ascii") as f:
+                f.write(f"solid {name}\n")
+                for normals, triangles in _facet_chunks(vertices, faces, chunk_size):
+                    values = np.hstack([normals, triangles.reshape(-1, 9)])
+                    f.write((_ASCII_FACET * len(values)) % tuple(values.ravel()))
+                f.write(f"endsolid {name}\n")
+        else:
+            with open(tmp_path, "wb") as f:
+                f.write(name.encode("ascii", "replace")[:80].ljust(80, b"\0"))
+                f.write(np.uint32(len(faces)).tobytes())
+                for normals, triangles in _facet_chunks(vertices, faces, chunk_size):
+                    records = np.zeros(len(triangles), dtype=_BINARY_RECORD)
+                    records['normal'] = normals
+                    records['vertices'] = triangles
+                    f.write(records.tobytes())
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(faces)
+
+
+## \fn write_shape_stl(shape, file_path, ascii=False)
+#  \brief Tessellate edilmiş bir TopoDS_Shape'i STL olarak yazar.
+#  \return Yazılan (vertices, faces) dizileri; böylece çağıran taraf dosyayı tekrar okumadan kullanabilir
+def write_shape_stl(shape, file_path, ascii=False):
+    from occ_mesh import shape_to_mesh_arrays
+    vertices, faces = shape_to_mesh_arrays(shape)
+    write_stl(file_path, vertices, faces, ascii=ascii)
+    return vertices, faces